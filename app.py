@@ -1,23 +1,25 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import date
-from typing import Optional
+from itertools import islice
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Optional
 
-from eclipse_app import eclipse_matcher
-from eclipse_app.location_resolver import LocationQuery, parse_location_input
+from eclipse_app import batch, eclipse_data, eclipse_matcher
+from eclipse_app.location_resolver import LocationQuery, location_cache_info, parse_location_input
 
 
 def _parse_reference_date(value: Optional[str]) -> Optional[date]:
-    if not value:
-        return None
     try:
-        year, month, day = (int(part) for part in value.split("-"))
-        return date(year, month, day)
+        return batch.parse_date(value)
     except ValueError as exc:
-        raise argparse.ArgumentTypeError(
-            f"Expected YYYY-MM-DD for reference date, got {value!r}"
-        ) from exc
+        raise argparse.ArgumentTypeError(str(exc)) from exc
 
 
 def describe_event(event, location: LocationQuery) -> str:
@@ -26,6 +28,9 @@ def describe_event(event, location: LocationQuery) -> str:
         eclipse_matcher.event_summary(event),
         f"    Peak details: {event.peak_description}",
     ]
+    local = eclipse_matcher.local_summary(event, location)
+    if local:
+        lines.append(f"    Local circumstances: {local}")
     if window and window.notes:
         lines.append(f"    Visibility note: {window.notes}")
     elif window and window.regions:
@@ -36,6 +41,153 @@ def describe_event(event, location: LocationQuery) -> str:
     return "\n".join(lines)
 
 
+def _list_upcoming(location: LocationQuery, start: date, limit: Optional[int], years: Optional[int]) -> None:
+    end = None
+    if years is not None:
+        year = start.year + years
+        if year > date.max.year:
+            # The window runs past the last representable date: no upper bound.
+            end = date.max
+        else:
+            try:
+                end = start.replace(year=year)
+            except ValueError:  # 29 February in a non-leap target year
+                end = start.replace(year=year, day=28)
+    count = 0
+    for event in eclipse_matcher.iter_visible_events(location, start, end, limit=limit):
+        print()
+        print(describe_event(event, location))
+        count += 1
+    if not count:
+        print("\nNo upcoming eclipses match your location in the current catalog.")
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+
+def _file_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _open_stream(path: str, mode: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def _read_records(handle: IO[str], file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield input records as dicts with at least a "location" key. JSONL lines
+    may be plain strings or objects; CSV files need a "location" column.
+    Optional "id" and "reference_date" fields are passed through.
+    """
+
+    if file_format == "csv":
+        reader = csv.DictReader(handle)
+        if not reader.fieldnames or "location" not in reader.fieldnames:
+            raise SystemExit("CSV input must have a 'location' column.")
+        for row in reader:
+            yield dict(row)
+        return
+
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield {"location": None, "error": f"Line {line_number}: invalid JSON ({exc.msg})"}
+            continue
+        if isinstance(value, str):
+            yield {"location": value}
+        elif isinstance(value, dict):
+            yield value
+        else:
+            yield {"location": None, "error": f"Line {line_number}: expected a string or object"}
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+_CSV_FIELDS = ("id", "location", "resolved", "solar_date", "solar_title", "lunar_date", "lunar_title", "error")
+
+
+class _ResultWriter:
+    def __init__(self, handle: IO[str], file_format: str) -> None:
+        self._handle = handle
+        self._csv: Optional[csv.DictWriter] = None
+        if file_format == "csv":
+            self._csv = csv.DictWriter(handle, fieldnames=_CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        for result in results:
+            if self._csv is None:
+                self._handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+                continue
+            row = {key: result.get(key) for key in ("id", "location", "resolved", "error")}
+            for kind in ("solar", "lunar"):
+                event = result.get(kind) or {}
+                row[f"{kind}_date"] = event.get("date")
+                row[f"{kind}_title"] = event.get("title")
+            self._csv.writerow(row)
+        self._handle.flush()
+
+
+def _run_batch(args: argparse.Namespace) -> None:
+    input_format = _file_format(args.input, args.input_format)
+    output_format = _file_format(args.output, args.output_format)
+    started = time.perf_counter()
+    processed = 0
+
+    with _open_stream(args.input, "r") as source, _open_stream(args.output, "w") as sink:
+        writer = _ResultWriter(sink, output_format)
+        chunks = _chunks(_read_records(source, input_format), args.chunk_size)
+
+        if args.workers <= 1:
+            for chunk in chunks:
+                results = batch.resolve_records(chunk, args.batch_reference_date)
+                writer.write(results)
+                processed += len(results)
+        else:
+            # Keep a bounded number of chunks in flight and write them in input
+            # order, so memory stays flat however large the input is.
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                in_flight: Deque[Future] = deque()
+                for chunk in chunks:
+                    in_flight.append(executor.submit(batch.resolve_records, chunk, args.batch_reference_date))
+                    if len(in_flight) >= args.workers * 2:
+                        results = in_flight.popleft().result()
+                        writer.write(results)
+                        processed += len(results)
+                while in_flight:
+                    results = in_flight.popleft().result()
+                    writer.write(results)
+                    processed += len(results)
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"Processed {processed} location(s) in {elapsed:.2f}s ({rate:,.0f} locations/s).",
+        file=sys.stderr,
+    )
+    if args.workers <= 1:
+        # Worker processes keep their own caches, so only report a single-process run.
+        cache = location_cache_info()
+        print(f"Location cache: {cache.hits} hit(s), {cache.misses} miss(es).", file=sys.stderr)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Discover the next solar and lunar eclipses visible from your location."
@@ -43,7 +195,7 @@ def main() -> None:
     parser.add_argument(
         "-l",
         "--location",
-        help="Location as 'City, State, Country' or a ZIP/postal code. If omitted you will be prompted.",
+        help="Location as 'City, State, Country', a ZIP/postal code or 'latitude, longitude'. If omitted you will be prompted.",
     )
     parser.add_argument(
         "-d",
@@ -51,9 +203,98 @@ def main() -> None:
         type=_parse_reference_date,
         help="Override today's date (YYYY-MM-DD) for forecasting in the future.",
     )
+    parser.add_argument(
+        "-n",
+        "--upcoming",
+        type=int,
+        help="List up to this many visible eclipses of either kind instead of the next of each.",
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        help="List every visible eclipse within this many years of the reference date.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser(
+        "compile-catalog",
+        help="Precompile the CSV catalogs, the city gazetteer and the postal code tables into binary artifacts for faster start-up.",
+    )
+    rasters_parser = subparsers.add_parser(
+        "build-rasters",
+        help="Precompute per-event visibility rasters for fast coordinate lookups.",
+    )
+    rasters_parser.add_argument(
+        "--resolution",
+        type=float,
+        default=0.25,
+        help="Grid cell size in degrees; must divide 180 (default 0.25).",
+    )
+    rasters_parser.add_argument(
+        "-w", "--workers", type=int, help="Worker processes, one event each (default: CPU count)."
+    )
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Resolve every location in a JSONL or CSV file, streaming results to another file.",
+    )
+    batch_parser.add_argument(
+        "-i", "--input", required=True, help="Input JSONL/CSV file with locations, or '-' for stdin."
+    )
+    batch_parser.add_argument(
+        "-o", "--output", required=True, help="Output JSONL/CSV file, or '-' for stdout."
+    )
+    batch_parser.add_argument(
+        "--input-format", choices=("jsonl", "csv"), help="Defaults to the input file extension."
+    )
+    batch_parser.add_argument(
+        "--output-format", choices=("jsonl", "csv"), help="Defaults to the output file extension."
+    )
+    batch_parser.add_argument(
+        "-d",
+        "--reference-date",
+        dest="batch_reference_date",
+        type=_parse_reference_date,
+        help="Default reference date (YYYY-MM-DD) for records without their own.",
+    )
+    batch_parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="Worker processes to fan out over (default 1)."
+    )
+    batch_parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="Records resolved per chunk (default 1000)."
+    )
     args = parser.parse_args()
 
+    if args.command == "compile-catalog":
+        from eclipse_app.gazetteer import compile_gazetteer
+        from eclipse_app.postal_codes import compile_postal_codes
+
+        path = eclipse_data.compile_catalog()
+        print(f"Compiled eclipse catalog written to {path}")
+        print(f"Compiled city gazetteer written to {compile_gazetteer()}")
+        print(f"Compiled postal code tables written to {compile_postal_codes()}")
+        return
+
+    if args.command == "build-rasters":
+        # NumPy and the geometry engine are only needed for this build step.
+        from eclipse_app import visibility_raster
+
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers must be positive")
+        try:
+            path = visibility_raster.build_rasters(args.resolution, args.workers)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"Visibility rasters written to {path}")
+        return
+
+    if args.command == "batch":
+        if args.chunk_size < 1 or args.workers < 1:
+            parser.error("--chunk-size and --workers must be positive")
+        _run_batch(args)
+        return
+
     reference_date = args.reference_date
+    if (args.upcoming is not None and args.upcoming < 1) or (args.years is not None and args.years < 1):
+        parser.error("--upcoming and --years must be positive")
 
     if args.location:
         location_input = args.location
@@ -70,11 +311,15 @@ def main() -> None:
     except ValueError as exc:
         raise SystemExit(str(exc))
 
-    if not any([location.city, location.region, location.country, location.postal_code]):
+    if not any([location.city, location.region, location.country, location.postal_code, location.coordinates]):
         raise SystemExit("Could not interpret the provided location.")
 
     print(f"Searching eclipse catalog for: {location.formatted() or location.raw}")
 
+    if args.upcoming is not None or args.years is not None:
+        _list_upcoming(location, reference_date or date.today(), args.upcoming, args.years)
+        return
+
     solar, lunar = eclipse_matcher.find_next_eclipses(location, reference_date)
 
     if solar:
@@ -89,6 +334,13 @@ def main() -> None:
     else:
         print("\nNo upcoming lunar eclipses match your location in the current catalog.")
 
+    central = eclipse_matcher.next_central_eclipse(location, reference_date)
+    if central:
+        print(
+            "\nNext path of totality or annularity over these coordinates: "
+            + eclipse_matcher.event_summary(central)
+        )
+
     if not (solar and lunar):
         print(
             "\nTip: try expanding your search (e.g. provide only state and country) "
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the eclipse finder. Run with
+`python -m benchmarks.run_benchmarks` from the project root.
+"""
@@ -0,0 +1,298 @@
+"""
+Time the main eclipse finder workloads against synthetic catalogs of several
+sizes and compare the results with a stored baseline.
+
+    python -m benchmarks.run_benchmarks --scales 1,10,100,1000
+    python -m benchmarks.run_benchmarks --save-baseline
+
+Results are written as JSON (`benchmarks/results.json` by default). Each entry
+records the best and median wall time over the repeats for one workload at
+one catalog scale; entries are compared with the baseline by name and scale.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from eclipse_app import eclipse_data, eclipse_matcher
+from eclipse_app.location_resolver import parse_location_input
+
+from .synthetic_catalog import generate
+
+_BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_RESULTS = _BENCHMARK_DIR / "results.json"
+DEFAULT_BASELINE = _BENCHMARK_DIR / "baseline.json"
+
+LOCATION_INPUTS = (
+    "Austin, TX, USA",
+    "78701",
+    "Toronto, ON, Canada",
+    "M5V 2T6",
+    "Madrid, Spain",
+    "Sydney, NSW, Australia",
+    "Cairo, Egypt",
+    "Tokyo, Japan",
+    "Lima, Peru",
+    "Nairobi, Kenya",
+    "New York, NY",
+    "Europe",
+    "South Asia",
+    "Wellington, New Zealand",
+    "Reykjavik, Iceland",
+    "Unknownville",
+)
+
+
+def _measure(
+    name: str,
+    scale: int,
+    operation: Callable[[], Any],
+    operations: int,
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "name": name,
+        "scale": scale,
+        "operations": operations,
+        "best_seconds": best,
+        "median_seconds": statistics.median(timings),
+        "best_per_operation": best / operations,
+    }
+
+
+def _run_scale(scale: int, repeat: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="eclipse-bench-") as directory:
+        generate(Path(directory), scale, seed)
+        os.environ[eclipse_data.DATA_DIR_ENV] = directory
+        eclipse_data.reload_catalogs()
+        try:
+            rows = len(eclipse_data._load_catalog(eclipse_data._SOLAR_CSV, "solar")) + len(
+                eclipse_data._load_catalog(eclipse_data._LUNAR_CSV, "lunar")
+            )
+
+            def load_csv() -> None:
+                eclipse_data._load_catalog(eclipse_data._SOLAR_CSV, "solar")
+                eclipse_data._load_catalog(eclipse_data._LUNAR_CSV, "lunar")
+
+            results.append(_measure("load_catalog_csv", scale, load_csv, rows, repeat))
+            results.append(
+                _measure("compile_catalog", scale, eclipse_data.compile_catalog, rows, repeat)
+            )
+
+            def load_compiled() -> None:
+                eclipse_data.solar_events()
+                eclipse_data.lunar_events()
+
+            results.append(
+                _measure(
+                    "load_catalog_compiled",
+                    scale,
+                    load_compiled,
+                    rows,
+                    repeat,
+                    setup=eclipse_data.reload_catalogs,
+                )
+            )
+
+            def clear_merged() -> None:
+                eclipse_data._all_events.cache_clear()
+                eclipse_data.solar_events()
+                eclipse_data.lunar_events()
+
+            results.append(
+                _measure("all_events_merge", scale, eclipse_data.all_events, rows, repeat, clear_merged)
+            )
+            results.append(
+                _measure(
+                    "all_events_cached",
+                    scale,
+                    lambda: [eclipse_data.all_events() for _ in range(1000)],
+                    1000,
+                    repeat,
+                )
+            )
+
+            first = eclipse_data.all_events()[0].occurs_on
+            last = eclipse_data.all_events()[-1].occurs_on
+            span = last.toordinal() - first.toordinal()
+
+            def random_date() -> date:
+                return date.fromordinal(first.toordinal() + rng.randint(0, max(span, 0)))
+
+            starts = [random_date() for _ in range(100)]
+
+            def iter_first_five() -> None:
+                for start in starts:
+                    iterator = eclipse_data.iter_events(start)
+                    for _ in range(5):
+                        next(iterator, None)
+
+            results.append(
+                _measure("iter_events_first_5", scale, iter_first_five, len(starts), repeat)
+            )
+
+            inputs = list(LOCATION_INPUTS) * 50
+            results.append(
+                _measure(
+                    "parse_location_input",
+                    scale,
+                    lambda: [parse_location_input(value) for value in inputs],
+                    len(inputs),
+                    repeat,
+                )
+            )
+
+            locations = [parse_location_input(value) for value in LOCATION_INPUTS]
+            queries = [(rng.choice(locations), random_date()) for _ in range(200)]
+            results.append(
+                _measure(
+                    "find_next_eclipses",
+                    scale,
+                    lambda: [eclipse_matcher.find_next_eclipses(loc, day) for loc, day in queries],
+                    len(queries),
+                    repeat,
+                )
+            )
+
+            batch = [rng.choice(locations) for _ in range(10_000)]
+            reference_date = random_date()
+            results.append(
+                _measure(
+                    "find_next_eclipses_batch",
+                    scale,
+                    lambda: eclipse_matcher.find_next_eclipses_batch(batch, reference_date),
+                    len(batch),
+                    repeat,
+                )
+            )
+        finally:
+            os.environ.pop(eclipse_data.DATA_DIR_ENV, None)
+            eclipse_data.reload_catalogs()
+
+    return results
+
+
+def _compare(
+    results: Sequence[Dict[str, Any]],
+    baseline: Sequence[Dict[str, Any]],
+    threshold: float,
+    min_seconds: float,
+) -> List[str]:
+    previous = {(entry["name"], entry["scale"]): entry for entry in baseline}
+    regressions = []
+    print(f"{'benchmark':<28}{'scale':>7}{'best (s)':>12}{'baseline':>12}{'ratio':>8}")
+    for entry in results:
+        key = (entry["name"], entry["scale"])
+        before = previous.get(key)
+        if before is None or not before["best_seconds"]:
+            print(f"{entry['name']:<28}{entry['scale']:>7}{entry['best_seconds']:>12.6f}{'-':>12}{'-':>8}")
+            continue
+        ratio = entry["best_seconds"] / before["best_seconds"]
+        # Sub-millisecond timings are dominated by noise; never flag those.
+        regressed = ratio > threshold and entry["best_seconds"] >= min_seconds
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{entry['name']:<28}{entry['scale']:>7}{entry['best_seconds']:>12.6f}"
+            f"{before['best_seconds']:>12.6f}{ratio:>8.2f}{flag}"
+        )
+        if regressed:
+            regressions.append(f"{entry['name']}@{entry['scale']}: {ratio:.2f}x slower")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark eclipse finder workloads.")
+    parser.add_argument(
+        "--scales",
+        default="1,10,100,1000",
+        help="Comma-separated multiples of the bundled catalog size (default 1,10,100,1000).",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per workload (default 5).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0).")
+    parser.add_argument("--output", type=Path, default=DEFAULT_RESULTS, help="Results JSON path.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON path.")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Also store these results as the new baseline."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio against the baseline reported as a regression (default 1.25).",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.001,
+        help="Timings below this many seconds are never reported as regressions (default 0.001).",
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Exit non-zero when a regression is found."
+    )
+    args = parser.parse_args()
+
+    scales = [int(value) for value in args.scales.split(",") if value.strip()]
+    results: List[Dict[str, Any]] = []
+    for scale in scales:
+        print(f"Running scale {scale}x ...", file=sys.stderr)
+        results.extend(_run_scale(scale, args.repeat, args.seed))
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "scales": scales,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    regressions: List[str] = []
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = _compare(
+            results, baseline.get("results", []), args.threshold, args.min_seconds
+        )
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.", file=sys.stderr)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    if regressions and args.fail_on_regression:
+        raise SystemExit("Regressions found:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Generate synthetic solar and lunar catalogs that follow the bundled CSV schema
+(see `catalog_key.csv`) at a multiple of the bundled catalog size, so slow
+paths show up long before real multi-millennium catalogs are loaded.
+
+    python -m benchmarks.synthetic_catalog --scale 100 --output /tmp/catalog
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from datetime import date
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from eclipse_app import eclipse_data
+
+FIELDS = ("Date", "Type", "Saros", "Magnitude", "Latitude", "Longitude", "Duration")
+
+# Spread synthetic events over the whole range `datetime.date` supports.
+_FIRST_ORDINAL = date(1, 1, 1).toordinal()
+_LAST_ORDINAL = date(9999, 12, 31).toordinal()
+
+
+def bundled_row_count(filename: str) -> int:
+    with (eclipse_data._PROJECT_ROOT / filename).open(newline="", encoding="utf-8") as handle:
+        return sum(1 for _ in csv.DictReader(handle))
+
+
+def _solar_row(rng: random.Random) -> List[str]:
+    seconds = rng.randint(10, 450)
+    return [
+        rng.choice(("Total", "Annular", "Hybrid", "Partial")),
+        str(rng.randint(100, 160)),
+        f"{rng.uniform(0.90, 1.08):.3f}",
+        f"{rng.uniform(-75.0, 75.0):.1f}",
+        f"{rng.uniform(-180.0, 180.0):.1f}",
+        f"{seconds // 60:02d}m{seconds % 60:02d}s",
+    ]
+
+
+def _lunar_row(rng: random.Random) -> List[str]:
+    minutes = rng.randint(20, 107)
+    return [
+        rng.choice(("Total", "Partial", "Penumbral")),
+        str(rng.randint(100, 160)),
+        f"{rng.uniform(0.5, 1.8):.2f}",
+        f"{rng.uniform(-28.0, 28.0):.1f}",
+        f"{rng.uniform(-180.0, 180.0):.1f}",
+        f"{minutes // 60:02d}h{minutes % 60:02d}m",
+    ]
+
+
+def _write_catalog(
+    path: Path, rows: int, make_row: Callable[[random.Random], List[str]], rng: random.Random
+) -> Path:
+    span = _LAST_ORDINAL - _FIRST_ORDINAL
+    ordinals = sorted(rng.randint(0, span) + _FIRST_ORDINAL for _ in range(rows))
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(FIELDS)
+        for ordinal in ordinals:
+            writer.writerow([date.fromordinal(ordinal).isoformat()] + make_row(rng))
+    return path
+
+
+def generate(directory: Path, scale: int, seed: int = 0) -> Tuple[Path, Path]:
+    """
+    Write solar and lunar catalogs `scale` times the size of the bundled ones
+    into `directory`, under the file names `eclipse_data` loads. Point
+    `ECLIPSE_FINDER_DATA_DIR` at `directory` to use them.
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    solar = _write_catalog(
+        directory / eclipse_data._SOLAR_CSV,
+        bundled_row_count(eclipse_data._SOLAR_CSV) * scale,
+        _solar_row,
+        rng,
+    )
+    lunar = _write_catalog(
+        directory / eclipse_data._LUNAR_CSV,
+        bundled_row_count(eclipse_data._LUNAR_CSV) * scale,
+        _lunar_row,
+        rng,
+    )
+    return solar, lunar
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic eclipse catalogs.")
+    parser.add_argument("--scale", type=int, default=10, help="Multiple of the bundled catalog size.")
+    parser.add_argument("--output", type=Path, required=True, help="Directory to write the CSVs to.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0).")
+    args = parser.parse_args()
+    for path in generate(args.output, args.scale, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,24 @@ callers can import them directly from `eclipse_app`.
 """
 
 from .eclipse_data import (
+    EclipseCatalog,
     EclipseEvent,
     VisibilityWindow,
     all_events,
+    iter_events,
     lunar_events,
+    reload_catalogs,
     solar_events,
 )
 from .eclipse_matcher import (
     event_summary,
     find_next_eclipses,
+    find_next_eclipses_batch,
     is_visible_from,
+    iter_visible_events,
     matching_window,
     next_visible_event,
+    visibility_timeline,
 )
 from .location_resolver import (
     LocationQuery,
@@ -27,16 +33,22 @@ from .location_resolver import (
 )
 
 __all__ = [
+    "EclipseCatalog",
     "EclipseEvent",
     "VisibilityWindow",
     "all_events",
+    "iter_events",
     "lunar_events",
+    "reload_catalogs",
     "solar_events",
     "event_summary",
     "find_next_eclipses",
+    "find_next_eclipses_batch",
     "is_visible_from",
+    "iter_visible_events",
     "matching_window",
     "next_visible_event",
+    "visibility_timeline",
     "LocationQuery",
     "normalize_country",
     "normalize_region",
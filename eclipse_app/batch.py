@@ -0,0 +1,116 @@
+"""
+Resolution of many location records at once, shared by the CLI batch mode and
+the HTTP service. Each record is a dict with a "location" string and optional
+"id" and "reference_date" fields; each result echoes the id and location and
+carries either the matched events or an "error" message.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import eclipse_matcher
+from .eclipse_data import EclipseEvent
+from .location_resolver import LocationQuery, parse_location_input, parse_postal_codes
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """
+    Parse a YYYY-MM-DD string (zero padding optional). Empty values give None;
+    malformed ones raise ValueError.
+    """
+
+    if not value:
+        return None
+    try:
+        year, month, day = (int(part) for part in str(value).split("-"))
+        return date(year, month, day)
+    except ValueError as exc:
+        raise ValueError(f"Expected YYYY-MM-DD for reference date, got {value!r}") from exc
+
+
+def _start_result(
+    record: Dict[str, Any], default_date: Optional[date], location: Optional[LocationQuery] = None
+) -> Tuple[Dict[str, Any], Optional[Tuple[Optional[date], LocationQuery]]]:
+    """
+    The result for `record` with its id, location and resolved name, plus
+    its reference date and parsed location (`location` if already parsed), or
+    the result with an "error" and None when the record cannot be matched.
+    """
+
+    result: Dict[str, Any] = {}
+    if "id" in record:
+        result["id"] = record["id"]
+    result["location"] = record.get("location")
+    if record.get("error"):
+        result["error"] = record["error"]
+        return result, None
+    try:
+        reference_date = parse_date(record.get("reference_date")) or default_date
+        location = location or parse_location_input(str(record.get("location") or ""))
+    except ValueError as exc:
+        result["error"] = str(exc)
+        return result, None
+    if not any([location.city, location.region, location.country, location.postal_code, location.coordinates]):
+        result["error"] = "Could not interpret the provided location."
+        return result, None
+    result["resolved"] = location.formatted() or location.raw
+    return result, (reference_date, location)
+
+
+def _add_events(
+    result: Dict[str, Any],
+    location: LocationQuery,
+    solar: Optional[EclipseEvent],
+    lunar: Optional[EclipseEvent],
+) -> None:
+    result["solar"] = eclipse_matcher.event_record(solar, location) if solar else None
+    result["lunar"] = eclipse_matcher.event_record(lunar, location) if lunar else None
+
+
+def resolve_record(record: Dict[str, Any], default_date: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Resolve a single record with `find_next_eclipses`, whose per-span cache
+    and jump tables make one-off lookups cheaper than a batch of one.
+    """
+
+    result, resolved = _start_result(record, default_date)
+    if resolved is not None:
+        reference_date, location = resolved
+        _add_events(result, location, *eclipse_matcher.find_next_eclipses(location, reference_date))
+    return result
+
+
+def resolve_records(
+    records: Sequence[Dict[str, Any]], default_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """
+    Resolve `records` in order. Records are grouped by reference date so each
+    group is a single `find_next_eclipses_batch` call.
+    """
+
+    results: List[Dict[str, Any]] = []
+    pending: Dict[Optional[date], List[int]] = {}
+    locations: Dict[int, LocationQuery] = {}
+    # Bare postal codes are resolved together, ZIPs in one table search.
+    postal_codes = parse_postal_codes(
+        ["" if record.get("error") else str(record.get("location") or "") for record in records]
+    )
+
+    for index, record in enumerate(records):
+        result, resolved = _start_result(record, default_date, postal_codes.get(index))
+        results.append(result)
+        if resolved is None:
+            continue
+        reference_date, locations[index] = resolved
+        pending.setdefault(reference_date, []).append(index)
+
+    for reference_date, indices in pending.items():
+        matches = eclipse_matcher.find_next_eclipses_batch(
+            (locations[index] for index in indices), reference_date
+        )
+        for index, (solar, lunar) in zip(indices, matches):
+            _add_events(results[index], locations[index], solar, lunar)
+
+    return results
@@ -0,0 +1,632 @@
+"""
+Besselian elements for solar eclipses and a vectorized local-circumstances
+engine on top of them.
+
+The elements describe the Moon's shadow on the fundamental plane (through the
+Earth's centre, perpendicular to the shadow axis) as polynomials in hours of TT
+from a reference instant `t0`. `local_circumstances` evaluates them for arrays
+of observers at once, following the method of the *Explanatory Supplement to
+the Astronomical Almanac*: the time of maximum and the four contacts are found
+by Newton iteration on every observer simultaneously. `event_circumstances`
+stacks the elements of many eclipses instead, to evaluate all of them for one
+observer in the same pass.
+
+The bundled elements in `solar_besselian_1900_2100.csv` are derived from the
+low-precision ephemeris in `ephemeris` by running
+
+    python -m eclipse_app.besselian
+
+which skips catalog dates on which the Moon's penumbra misses the Earth. Events
+without elements fall back to region matching.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.polynomial import polynomial
+
+from . import eclipse_data, ephemeris
+from .eclipse_data import EclipseEvent
+
+BESSELIAN_CSV = "solar_besselian_1900_2100.csv"
+
+# Shadow geometry constants, in Earth equatorial radii (Espenak's values for
+# the lunar radius, separately for the penumbra and the umbra).
+_SUN_RADIUS = 696000.0 / ephemeris.EARTH_RADIUS_KM
+_MOON_RADIUS_PENUMBRA = 0.2724880
+_MOON_RADIUS_UMBRA = 0.2722810
+# Ratio of the Earth's polar to equatorial radius and its squared eccentricity.
+_POLAR_RATIO = 0.99664719
+_ECCENTRICITY_SQUARED = 0.00669438
+
+# Elements are fitted over t0 +/- _FIT_HOURS; results outside it are rejected.
+_FIT_HOURS = 4.0
+_ITERATIONS = 5
+# Contacts start from the time of maximum and converge to about a second in three steps.
+_CONTACT_ITERATIONS = 3
+
+_POLYNOMIALS = (("x", 3), ("y", 3), ("d", 2), ("mu", 2), ("l1", 2), ("l2", 2))
+
+
+@dataclass(frozen=True)
+class BesselianElements:
+    """
+    Polynomial elements of one solar eclipse. Each polynomial is a tuple of
+    coefficients, lowest order first, in hours of TT from `t0` (hours of TT
+    after 0h on `occurs_on`). `d` and `mu` are in degrees, `mu` already
+    referred to UT so observer longitudes need no Delta T correction.
+    """
+
+    occurs_on: date
+    t0: float
+    delta_t: float  # TT - UT, seconds
+    x: Tuple[float, ...]
+    y: Tuple[float, ...]
+    d: Tuple[float, ...]
+    mu: Tuple[float, ...]
+    l1: Tuple[float, ...]
+    l2: Tuple[float, ...]
+    tan_f1: float
+    tan_f2: float
+
+    @cached_property
+    def _derivatives(self) -> Tuple[np.ndarray, ...]:
+        return tuple(polynomial.polyder(getattr(self, name)) for name in ("x", "y", "d", "mu"))
+
+    def timestamps(self, hours: np.ndarray) -> np.ndarray:
+        """UT instants (datetime64[s]) of times given in hours from `t0`; NaN gives NaT."""
+
+        return _timestamps(np.datetime64(self.occurs_on, "s"), self.t0, self.delta_t, hours)
+
+    def _take(self, rows: np.ndarray) -> "BesselianElements":
+        # The same elements apply to every observer.
+        return self
+
+
+@dataclass(frozen=True, eq=False)
+class _ElementStack:
+    """
+    Elements of several eclipses, one column each, evaluated for one observer
+    per eclipse. Polynomials have shape (degree + 1, eclipses).
+    """
+
+    midnight: np.ndarray  # datetime64[s], 0h UT on each eclipse date
+    t0: np.ndarray
+    delta_t: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    d: np.ndarray
+    mu: np.ndarray
+    l1: np.ndarray
+    l2: np.ndarray
+    tan_f1: np.ndarray
+    tan_f2: np.ndarray
+
+    @classmethod
+    def of(cls, elements: Sequence[BesselianElements]) -> "_ElementStack":
+        def column(name: str) -> np.ndarray:
+            return np.array([getattr(item, name) for item in elements], dtype=np.float64)
+
+        return cls(
+            midnight=np.array([item.occurs_on for item in elements], dtype="datetime64[s]"),
+            t0=column("t0"),
+            delta_t=column("delta_t"),
+            tan_f1=column("tan_f1"),
+            tan_f2=column("tan_f2"),
+            **{name: column(name).T for name, _ in _POLYNOMIALS},
+        )
+
+    @cached_property
+    def _derivatives(self) -> Tuple[np.ndarray, ...]:
+        return tuple(polynomial.polyder(getattr(self, name)) for name in ("x", "y", "d", "mu"))
+
+    def timestamps(self, hours: np.ndarray) -> np.ndarray:
+        return _timestamps(self.midnight, self.t0, self.delta_t, hours)
+
+    def _take(self, rows: np.ndarray) -> "_ElementStack":
+        return _ElementStack(
+            midnight=self.midnight[rows],
+            t0=self.t0[rows],
+            delta_t=self.delta_t[rows],
+            tan_f1=self.tan_f1[rows],
+            tan_f2=self.tan_f2[rows],
+            **{name: getattr(self, name)[:, rows] for name, _ in _POLYNOMIALS},
+        )
+
+
+def _timestamps(midnight, t0, delta_t, hours) -> np.ndarray:
+    hours = np.asarray(hours, dtype=np.float64)
+    midnight, t0, delta_t = np.broadcast_arrays(midnight, t0, delta_t, hours)[:3]
+    result = np.full(hours.shape, np.datetime64("NaT"), dtype="datetime64[s]")
+    finite = np.isfinite(hours)
+    seconds = (t0[finite] + hours[finite]) * 3600.0 - delta_t[finite]
+    result[finite] = midnight[finite] + np.rint(seconds).astype("timedelta64[s]")
+    return result
+
+
+class _Shadow(NamedTuple):
+    u: np.ndarray
+    v: np.ndarray
+    a: np.ndarray
+    b: np.ndarray
+    l1: np.ndarray
+    l2: np.ndarray
+    zeta: np.ndarray
+
+
+class _Observers(NamedTuple):
+    rho_sin: np.ndarray
+    rho_cos: np.ndarray
+    longitude: np.ndarray  # radians, east positive
+
+
+def _observers(latitude, longitude) -> _Observers:
+    latitude = np.radians(np.asarray(latitude, dtype=np.float64))
+    reduced = np.arctan(_POLAR_RATIO * np.tan(latitude))
+    return _Observers(
+        rho_sin=_POLAR_RATIO * np.sin(reduced),
+        rho_cos=np.cos(reduced),
+        longitude=np.radians(np.asarray(longitude, dtype=np.float64)),
+    )
+
+
+def _polyval(t: np.ndarray, coefficients) -> np.ndarray:
+    # Column-wise for stacked elements: column j is evaluated at t[j].
+    return polynomial.polyval(t, coefficients, tensor=False)
+
+
+def _shadow(
+    elements: Union[BesselianElements, _ElementStack], observers: _Observers, t: np.ndarray
+) -> _Shadow:
+    """Observer-relative shadow coordinates and their hourly rates at times `t`."""
+
+    dx, dy, dd, dmu = elements._derivatives
+    x = _polyval(t, elements.x)
+    y = _polyval(t, elements.y)
+    d = np.radians(_polyval(t, elements.d))
+    hour_angle = np.radians(_polyval(t, elements.mu)) + observers.longitude
+    d_rate = np.radians(_polyval(t, dd))
+    mu_rate = np.radians(_polyval(t, dmu))
+
+    sin_d, cos_d = np.sin(d), np.cos(d)
+    sin_h, cos_h = np.sin(hour_angle), np.cos(hour_angle)
+    xi = observers.rho_cos * sin_h
+    eta = observers.rho_sin * cos_d - observers.rho_cos * cos_h * sin_d
+    zeta = observers.rho_sin * sin_d + observers.rho_cos * cos_h * cos_d
+    xi_rate = mu_rate * observers.rho_cos * cos_h
+    eta_rate = mu_rate * xi * sin_d - zeta * d_rate
+
+    return _Shadow(
+        u=x - xi,
+        v=y - eta,
+        a=_polyval(t, dx) - xi_rate,
+        b=_polyval(t, dy) - eta_rate,
+        l1=_polyval(t, elements.l1) - zeta * elements.tan_f1,
+        l2=_polyval(t, elements.l2) - zeta * elements.tan_f2,
+        zeta=zeta,
+    )
+
+
+def _contact(
+    elements: Union[BesselianElements, _ElementStack],
+    observers: _Observers,
+    start: np.ndarray,
+    umbral: bool,
+    sign: float,
+) -> np.ndarray:
+    """
+    Time at which the observer crosses the penumbral (or umbral) shadow edge,
+    before (`sign` -1) or after (+1) `start`; NaN where it never does.
+    """
+
+    t = start
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(_CONTACT_ITERATIONS):
+            shadow = _shadow(elements, observers, t)
+            radius = np.abs(shadow.l2) if umbral else shadow.l1
+            speed = np.hypot(shadow.a, shadow.b)
+            sine = (shadow.a * shadow.v - shadow.u * shadow.b) / (speed * radius)
+            t = t - (shadow.u * shadow.a + shadow.v * shadow.b) / speed**2 + sign * radius / speed * np.sqrt(
+                1.0 - sine**2
+            )
+    return t
+
+
+def _obscuration(separation: np.ndarray, radius: np.ndarray) -> np.ndarray:
+    """Covered fraction of a unit disc by a disc of `radius` at `separation`."""
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s, r = separation, radius
+        lens = (
+            r**2 * np.arccos(np.clip((s**2 + r**2 - 1) / (2 * s * r), -1, 1))
+            + np.arccos(np.clip((s**2 + 1 - r**2) / (2 * s), -1, 1))
+            - 0.5 * np.sqrt(np.clip((-s + r + 1) * (s + r - 1) * (s - r + 1) * (s + r + 1), 0, None))
+        ) / np.pi
+    inside = np.minimum(r, 1.0) ** 2
+    return np.where(s >= 1 + r, 0.0, np.where(s <= np.abs(1 - r), inside, lens))
+
+
+@dataclass(frozen=True, eq=False)
+class LocalCircumstances:
+    """
+    Per-observer circumstances of one eclipse, one array entry per observer.
+    Magnitude and obscuration are geometric values at maximum; `visible` also
+    requires the Sun to be above the horizon during some part of the eclipse,
+    and `central` at the maximum of the total or annular phase.
+    """
+
+    magnitude: np.ndarray
+    obscuration: np.ndarray
+    sun_altitude: np.ndarray  # degrees, at maximum
+    maximum: np.ndarray  # datetime64[s] UT, NaT where there is no eclipse
+    first_contact: np.ndarray
+    second_contact: np.ndarray  # NaT outside the path of totality/annularity
+    third_contact: np.ndarray
+    fourth_contact: np.ndarray
+    visible: np.ndarray
+    central: np.ndarray
+
+
+def local_circumstances(
+    elements: Union[BesselianElements, _ElementStack], latitude, longitude
+) -> LocalCircumstances:
+    """
+    Local circumstances of the eclipse for observers at `latitude` and
+    `longitude` (degrees, east positive; scalars or equal-length arrays) at
+    sea level. Stacked elements pair each observer with its own eclipse.
+    """
+
+    latitude, longitude = np.broadcast_arrays(np.atleast_1d(latitude), np.atleast_1d(longitude))
+    observers = _observers(latitude, longitude)
+    t = np.zeros(latitude.shape)
+    for _ in range(2):
+        shadow = _shadow(elements, observers, t)
+        t = t - (shadow.u * shadow.a + shadow.v * shadow.b) / (shadow.a**2 + shadow.b**2)
+    # Two steps put every observer near its closest approach to the axis;
+    # only those that may reach the penumbra need the remaining refinement.
+    shadow = _shadow(elements, observers, t)
+    near = np.flatnonzero(np.hypot(shadow.u, shadow.v) < 1.5 * shadow.l1 + 0.1)
+    candidates = _Observers(*(field[near] for field in observers))
+    candidate_elements = elements._take(near)
+    refined = t[near]
+    for _ in range(_ITERATIONS - 2):
+        nearby = _shadow(candidate_elements, candidates, refined)
+        refined = refined - (nearby.u * nearby.a + nearby.v * nearby.b) / (nearby.a**2 + nearby.b**2)
+    t[near] = refined
+    shadow = _shadow(elements, observers, t)
+
+    distance = np.hypot(shadow.u, shadow.v)
+    in_range = np.abs(t) <= _FIT_HOURS
+    partial = in_range & (distance < shadow.l1)
+    umbral = partial & (distance < np.abs(shadow.l2))
+    span = shadow.l1 + shadow.l2
+    # Inside the central path the magnitude is the ratio of the apparent
+    # diameters of the Moon and the Sun, as in the catalog.
+    magnitude = np.where(
+        umbral, (shadow.l1 - shadow.l2) / span, np.where(partial, (shadow.l1 - distance) / span, 0.0)
+    )
+    # In units of the Sun's radius: Moon radius and centre separation.
+    obscuration = np.where(
+        partial, _obscuration(2 * distance / span, (shadow.l1 - shadow.l2) / span), 0.0
+    )
+
+    # Contacts only exist inside the penumbra, so iterate on those observers.
+    contacts = np.full((4,) + latitude.shape, np.nan)
+    rows = np.flatnonzero(partial)
+    eclipsed = _Observers(*(field[rows] for field in observers))
+    eclipsed_elements = elements._take(rows)
+    start = t[rows]
+    contacts[0, rows] = _contact(eclipsed_elements, eclipsed, start, False, -1.0)
+    contacts[3, rows] = _contact(eclipsed_elements, eclipsed, start, False, 1.0)
+    central_rows = np.flatnonzero(umbral[rows])
+    if central_rows.size:
+        central = _Observers(*(field[central_rows] for field in eclipsed))
+        central_elements = eclipsed_elements._take(central_rows)
+        contacts[1, rows[central_rows]] = _contact(central_elements, central, start[central_rows], True, -1.0)
+        contacts[2, rows[central_rows]] = _contact(central_elements, central, start[central_rows], True, 1.0)
+
+    # The Sun is above the horizon where zeta > 0; sample the partial phase so
+    # eclipses in progress at sunrise or sunset still count.
+    sun_up = shadow.zeta > 0
+    night = np.flatnonzero(~sun_up[rows])
+    below = _Observers(*(field[night] for field in eclipsed))
+    below_elements = eclipsed_elements._take(night)
+    for edge in (contacts[0, rows[night]], contacts[3, rows[night]]):
+        for fraction in (0.0, 0.5):
+            sample = edge + fraction * (start[night] - edge)
+            sun_up[rows[night]] |= _shadow(below_elements, below, sample).zeta > 0
+
+    return LocalCircumstances(
+        magnitude=magnitude,
+        obscuration=obscuration,
+        sun_altitude=np.degrees(np.arcsin(np.clip(shadow.zeta, -1.0, 1.0))),
+        maximum=elements.timestamps(np.where(partial, t, np.nan)),
+        first_contact=elements.timestamps(contacts[0]),
+        second_contact=elements.timestamps(contacts[1]),
+        third_contact=elements.timestamps(contacts[2]),
+        fourth_contact=elements.timestamps(contacts[3]),
+        visible=partial & sun_up,
+        central=umbral & (shadow.zeta > 0),
+    )
+
+
+def event_circumstances(
+    elements: Sequence[BesselianElements], latitude: float, longitude: float
+) -> LocalCircumstances:
+    """
+    Local circumstances of every eclipse in `elements` for one observer, one
+    array entry per eclipse, evaluated for all of them at once.
+    """
+
+    stack = _ElementStack.of(elements)
+    size = len(elements)
+    return local_circumstances(stack, np.full(size, float(latitude)), np.full(size, float(longitude)))
+
+
+def _closest_approach(elements: BesselianElements) -> float:
+    """Hours from `t0` at which the shadow axis passes closest to the Earth's centre."""
+
+    t = 0.0
+    dx, dy = elements._derivatives[:2]
+    for _ in range(_ITERATIONS):
+        x, y = polynomial.polyval(t, elements.x), polynomial.polyval(t, elements.y)
+        rate_x, rate_y = polynomial.polyval(t, dx), polynomial.polyval(t, dy)
+        t -= (x * rate_x + y * rate_y) / (rate_x**2 + rate_y**2)
+    return float(t)
+
+
+def surface_point(elements: BesselianElements, t, xi, eta) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Geodetic latitude and longitude (degrees, east positive) of the point on
+    the sunward side of the Earth whose fundamental-plane coordinates at
+    hours `t` are `xi`, `eta`; NaN where that point misses the Earth.
+    """
+
+    t, xi, eta = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (t, xi, eta)))
+    d = np.radians(polynomial.polyval(t, elements.d))
+    omega = 1.0 / np.sqrt(1.0 - _ECCENTRICITY_SQUARED * np.cos(d) ** 2)
+    y1 = omega * eta
+    b1 = omega * np.sin(d)
+    b2 = _POLAR_RATIO * omega * np.cos(d)
+    with np.errstate(invalid="ignore"):
+        depth = np.sqrt(1.0 - xi**2 - y1**2)
+        latitude = np.degrees(np.arctan(np.tan(np.arcsin(depth * b1 + y1 * b2)) / _POLAR_RATIO))
+    hour_angle = np.degrees(np.arctan2(xi, depth * b2 - y1 * b1))
+    longitude = (hour_angle - polynomial.polyval(t, elements.mu) + 180.0) % 360.0 - 180.0
+    return latitude, longitude
+
+
+def greatest_eclipse(elements: BesselianElements) -> Optional[Tuple[datetime, float, float]]:
+    """
+    UT instant and geodetic latitude/longitude of greatest eclipse, or None
+    when the shadow axis misses the Earth (a partial eclipse).
+    """
+
+    t = _closest_approach(elements)
+    x, y = polynomial.polyval(t, elements.x), polynomial.polyval(t, elements.y)
+    latitude, longitude = surface_point(elements, t, x, y)
+    if np.isnan(latitude):
+        return None
+    moment = datetime.combine(elements.occurs_on, datetime.min.time()) + timedelta(
+        hours=elements.t0 + t, seconds=-elements.delta_t
+    )
+    return moment, float(latitude), float(longitude)
+
+
+def reaches_earth(elements: BesselianElements) -> bool:
+    """Whether the penumbra touches the Earth within the fitted interval."""
+
+    t = _closest_approach(elements)
+    gamma = np.hypot(polynomial.polyval(t, elements.x), polynomial.polyval(t, elements.y))
+    return abs(t) <= _FIT_HOURS and gamma < 1.0 + polynomial.polyval(t, elements.l1)
+
+
+# ---------------------------------------------------------------------------
+# Derivation from the ephemeris
+# ---------------------------------------------------------------------------
+
+
+def _instantaneous_elements(jde: np.ndarray, delta_t: float) -> Dict[str, np.ndarray]:
+    sun_ra, sun_dec, sun_distance = ephemeris.sun_position(jde)
+    moon_ra, moon_dec, moon_distance = ephemeris.moon_position(jde)
+    sun_distance = sun_distance / ephemeris.EARTH_RADIUS_KM
+    moon_distance = moon_distance / ephemeris.EARTH_RADIUS_KM
+
+    def vector(ra, dec, distance):
+        return distance[..., None] * np.stack(
+            (np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)), axis=-1
+        )
+
+    axis = vector(sun_ra, sun_dec, sun_distance) - vector(moon_ra, moon_dec, moon_distance)
+    separation = np.linalg.norm(axis, axis=-1)
+    axis_ra = np.arctan2(axis[..., 1], axis[..., 0])
+    axis_dec = np.arcsin(axis[..., 2] / separation)
+
+    offset = moon_ra - axis_ra
+    x = moon_distance * np.cos(moon_dec) * np.sin(offset)
+    y = moon_distance * (
+        np.sin(moon_dec) * np.cos(axis_dec) - np.cos(moon_dec) * np.sin(axis_dec) * np.cos(offset)
+    )
+    z = moon_distance * (
+        np.sin(moon_dec) * np.sin(axis_dec) + np.cos(moon_dec) * np.cos(axis_dec) * np.cos(offset)
+    )
+
+    f1 = np.arcsin((_SUN_RADIUS + _MOON_RADIUS_PENUMBRA) / separation)
+    f2 = np.arcsin((_SUN_RADIUS - _MOON_RADIUS_UMBRA) / separation)
+    sidereal = ephemeris.greenwich_sidereal_time(jde - delta_t / 86400.0)
+    return {
+        "x": x,
+        "y": y,
+        "z": z,
+        "d": np.degrees(axis_dec),
+        "mu": np.degrees(np.unwrap(sidereal - axis_ra)),
+        "l1": z * np.tan(f1) + _MOON_RADIUS_PENUMBRA / np.cos(f1),
+        "l2": z * np.tan(f2) - _MOON_RADIUS_UMBRA / np.cos(f2),
+        "tan_f1": np.tan(f1),
+        "tan_f2": np.tan(f2),
+    }
+
+
+def derive_elements(occurs_on: date) -> BesselianElements:
+    """
+    Fit Besselian elements for the solar eclipse on `occurs_on` (UT date of
+    greatest eclipse) from the low-precision ephemeris. `t0` is the whole TT
+    hour nearest to conjunction of the shadow axis with the Earth's centre.
+    """
+
+    delta_t = ephemeris.delta_t(occurs_on.year + (occurs_on.timetuple().tm_yday - 0.5) / 365.25)
+    midnight = ephemeris.julian_day_of(occurs_on)
+    hours = np.arange(-2.0, 26.0, 1.0 / 60.0)
+    scan = _instantaneous_elements(midnight + hours / 24.0, delta_t)
+    closest = hours[np.argmin(np.hypot(scan["x"], scan["y"]) - 1e3 * (scan["z"] < 0))]
+    t0 = float(np.round(closest))
+
+    offsets = np.linspace(-_FIT_HOURS, _FIT_HOURS, 97)
+    samples = _instantaneous_elements(midnight + (t0 + offsets) / 24.0, delta_t)
+    fitted = {
+        name: tuple(float(value) for value in polynomial.polyfit(offsets, samples[name], degree))
+        for name, degree in _POLYNOMIALS
+    }
+    mu = list(fitted["mu"])
+    mu[0] %= 360.0
+    fitted["mu"] = tuple(mu)
+    return BesselianElements(
+        occurs_on=occurs_on,
+        t0=t0,
+        delta_t=round(delta_t, 1),
+        tan_f1=float(samples["tan_f1"].mean()),
+        tan_f2=float(samples["tan_f2"].mean()),
+        **fitted,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Bundled elements
+# ---------------------------------------------------------------------------
+
+
+def _columns() -> List[str]:
+    columns = ["Date", "T0", "DeltaT"]
+    for name, degree in _POLYNOMIALS:
+        columns.extend(f"{name.upper()}{power}" for power in range(degree + 1))
+    return columns + ["TanF1", "TanF2"]
+
+
+def _elements_row(elements: BesselianElements) -> List[str]:
+    row = [elements.occurs_on.isoformat(), f"{elements.t0:g}", f"{elements.delta_t:g}"]
+    for name, _ in _POLYNOMIALS:
+        row.extend(f"{value:.9g}" for value in getattr(elements, name))
+    return row + [f"{elements.tan_f1:.9g}", f"{elements.tan_f2:.9g}"]
+
+
+def _parse_row(row: Dict[str, str]) -> BesselianElements:
+    fields = {
+        name: tuple(float(row[f"{name.upper()}{power}"]) for power in range(degree + 1))
+        for name, degree in _POLYNOMIALS
+    }
+    return BesselianElements(
+        occurs_on=date.fromisoformat(row["Date"]),
+        t0=float(row["T0"]),
+        delta_t=float(row["DeltaT"]),
+        tan_f1=float(row["TanF1"]),
+        tan_f2=float(row["TanF2"]),
+        **fields,
+    )
+
+
+@lru_cache(maxsize=None)
+def solar_elements() -> Dict[date, BesselianElements]:
+    """Bundled elements keyed by date; empty when the data directory has none."""
+
+    path = eclipse_data._data_dir() / BESSELIAN_CSV
+    if not path.exists():
+        return {}
+    with path.open(newline="", encoding="utf-8") as handle:
+        return {elements.occurs_on: elements for elements in map(_parse_row, csv.DictReader(handle))}
+
+
+eclipse_data.register_catalog_cache(solar_elements.cache_clear)
+
+
+def elements_for(event: EclipseEvent) -> Optional[BesselianElements]:
+    if event.kind != "solar":
+        return None
+    return solar_elements().get(event.occurs_on)
+
+
+def _angular_error(latitude: float, longitude: float, event: EclipseEvent) -> float:
+    delta_lon = (longitude - event.longitude + 180.0) % 360.0 - 180.0
+    return float(np.hypot(latitude - event.latitude, delta_lon * np.cos(np.radians(latitude))))
+
+
+def build_elements(
+    events: Sequence[EclipseEvent], tolerance: float = 1.0
+) -> Tuple[List[BesselianElements], List[str]]:
+    """
+    Derive elements for `events`, skipping dates on which the Moon's penumbra
+    does not reach the Earth. Returns the elements and messages for skipped
+    events and for greatest-eclipse points more than `tolerance` degrees from
+    the catalog's.
+    """
+
+    kept: List[BesselianElements] = []
+    messages: List[str] = []
+    for event in events:
+        elements = derive_elements(event.occurs_on)
+        if not reaches_earth(elements):
+            messages.append(f"Skipped {event.occurs_on}: no solar eclipse on this date")
+            continue
+        kept.append(elements)
+        greatest = greatest_eclipse(elements)
+        if greatest is None:
+            messages.append(f"Note {event.occurs_on}: partial eclipse, the shadow axis misses the Earth")
+        elif event.latitude is not None and event.longitude is not None:
+            _, latitude, longitude = greatest
+            error = _angular_error(latitude, longitude, event)
+            if error > tolerance:
+                messages.append(
+                    f"Note {event.occurs_on}: greatest eclipse at {latitude:.1f}, {longitude:.1f} "
+                    f"is {error:.1f} degrees from the catalog's {event.latitude}, {event.longitude}"
+                )
+    return kept, messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Derive Besselian elements for the solar catalog from the built-in ephemeris."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=eclipse_data._data_dir() / BESSELIAN_CSV,
+        help=f"CSV file to write (default: {BESSELIAN_CSV} in the data directory).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="Report greatest-eclipse points further than this many degrees from the catalog's (default 1).",
+    )
+    args = parser.parse_args()
+
+    kept, messages = build_elements(eclipse_data.solar_events(), args.tolerance)
+    with args.output.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(_columns())
+        writer.writerows(_elements_row(elements) for elements in kept)
+    for message in messages:
+        print(message, file=sys.stderr)
+    print(f"Wrote elements for {len(kept)} eclipse(s) to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
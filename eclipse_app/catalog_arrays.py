@@ -0,0 +1,197 @@
+"""
+Struct-of-arrays view over the eclipse catalog.
+
+`EclipseCatalogArrays` keeps one NumPy column per numeric attribute of the
+events so filters can run over the whole catalog at once. Callers only go
+back to the `EclipseEvent` objects for the rows a filter selects.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import eclipse_data, eclipse_matcher
+from .eclipse_data import KIND_CODES, EclipseCatalog, EclipseEvent, VisibilityWindow, subtype_code
+from .location_resolver import TOKEN_VOCABULARY_SIZE, LocationQuery, RegionSignature
+
+_MASK_WORDS = max(1, (TOKEN_VOCABULARY_SIZE + 63) // 64)
+_WORD = (1 << 64) - 1
+
+
+def mask_words(mask: int) -> np.ndarray:
+    """Split a vocabulary bitmask into little-endian uint64 words."""
+    return np.array([(mask >> (64 * word)) & _WORD for word in range(_MASK_WORDS)], dtype=np.uint64)
+
+
+@dataclass(frozen=True, eq=False)
+class EclipseCatalogArrays:
+    """
+    Parallel columns for a date-sorted sequence of events. Row `i` of every
+    column describes `events[i]`; missing integers are -1 and missing floats
+    are NaN.
+    """
+
+    events: Tuple[EclipseEvent, ...]
+    ordinals: np.ndarray  # int32 proleptic Gregorian ordinal of the date
+    kinds: np.ndarray  # uint8 index into KIND_CODES
+    subtypes: np.ndarray  # uint8 index into SUBTYPE_CODES
+    saros: np.ndarray  # int16
+    magnitude: np.ndarray  # float32
+    latitude: np.ndarray  # float32, greatest eclipse point
+    longitude: np.ndarray  # float32, greatest eclipse point
+    duration_seconds: np.ndarray  # int32
+    # One row per visibility window, see `eclipse_matcher.window_masks`.
+    windows: Tuple[VisibilityWindow, ...]
+    window_events: np.ndarray  # int32 row of the owning event
+    window_countries: np.ndarray  # uint64 (windows, mask words)
+    window_regions: np.ndarray  # uint64 (windows, mask words)
+    window_exact: np.ndarray  # bool, False when the masks cannot be used
+
+    @classmethod
+    def from_events(cls, events: Sequence[EclipseEvent]) -> "EclipseCatalogArrays":
+        if not isinstance(events, tuple):
+            events = tuple(events)
+
+        def column(values, dtype) -> np.ndarray:
+            array = np.fromiter(values, dtype=dtype, count=len(events))
+            array.setflags(write=False)
+            return array
+
+        def number(value, missing):
+            return missing if value is None else value
+
+        windows: List[VisibilityWindow] = []
+        owners: List[int] = []
+        for row, event in enumerate(events):
+            windows.extend(event.visibility)
+            owners.extend([row] * len(event.visibility))
+        window_countries = np.zeros((len(windows), _MASK_WORDS), dtype=np.uint64)
+        window_regions = np.zeros((len(windows), _MASK_WORDS), dtype=np.uint64)
+        window_exact = np.zeros(len(windows), dtype=np.bool_)
+        for index, window in enumerate(windows):
+            masks = eclipse_matcher.window_masks(window)
+            if masks is not None:
+                window_countries[index] = mask_words(masks[0])
+                window_regions[index] = mask_words(masks[1])
+                window_exact[index] = True
+        window_rows = np.array(owners, dtype=np.int32)
+        for array in (window_rows, window_countries, window_regions, window_exact):
+            array.setflags(write=False)
+
+        if isinstance(events, EclipseCatalog):
+            ordinals = column(events.date_index, np.int32)
+        else:
+            ordinals = column((event.occurs_on.toordinal() for event in events), np.int32)
+
+        return cls(
+            events=events,
+            ordinals=ordinals,
+            kinds=column((KIND_CODES.index(event.kind) for event in events), np.uint8),
+            subtypes=column((subtype_code(event.subtype) for event in events), np.uint8),
+            saros=column((number(event.saros, -1) for event in events), np.int16),
+            magnitude=column((number(event.magnitude, np.nan) for event in events), np.float32),
+            latitude=column((number(event.latitude, np.nan) for event in events), np.float32),
+            longitude=column((number(event.longitude, np.nan) for event in events), np.float32),
+            duration_seconds=column(
+                (number(event.duration_seconds, -1) for event in events), np.int32
+            ),
+            windows=tuple(windows),
+            window_events=window_rows,
+            window_countries=window_countries,
+            window_regions=window_regions,
+            window_exact=window_exact,
+        )
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def date_range(self, start: Optional[date] = None, end: Optional[date] = None) -> slice:
+        """
+        Rows whose date falls within [start, end] (either bound may be open),
+        found by binary search over the sorted ordinal column.
+        """
+
+        lower = 0 if start is None else int(np.searchsorted(self.ordinals, start.toordinal(), "left"))
+        upper = (
+            len(self.events)
+            if end is None
+            else int(np.searchsorted(self.ordinals, end.toordinal(), "right"))
+        )
+        return slice(lower, max(lower, upper))
+
+    def visible_mask(
+        self,
+        location: LocationQuery,
+        signature: Optional[RegionSignature] = None,
+        rows: slice = slice(None),
+    ) -> np.ndarray:
+        """
+        Boolean mask over `rows` of the events visible from `location`,
+        evaluated for every window at once with `eclipse_matcher.masks_match`
+        in vectorized form. Windows without exact masks fall back to the
+        token-set matcher.
+        """
+
+        if signature is None:
+            signature = location.region_signature()
+        start, stop, _ = rows.indices(len(self.events))
+        stop = max(start, stop)
+        first, last = np.searchsorted(self.window_events, (start, stop), "left")
+
+        countries = self.window_countries[first:last]
+        regions = self.window_regions[first:last]
+        tokens = mask_words(signature.tokens)
+
+        has_countries = countries.any(axis=1)
+        matches = ~has_countries | (countries & tokens).any(axis=1)
+        region_match = ~regions.any(axis=1) | (regions & tokens).any(axis=1)
+        if not signature.has_region:
+            region_match |= has_countries & (countries & mask_words(signature.country)).any(axis=1)
+        matches &= region_match
+
+        exact = self.window_exact[first:last]
+        for offset in np.flatnonzero(~exact).tolist():
+            matches[offset] = eclipse_matcher.window_matches_location(
+                self.windows[first + offset], location
+            )
+
+        visible = np.zeros(stop - start, dtype=np.bool_)
+        visible[self.window_events[first:last][matches] - start] = True
+        return visible
+
+    def take(self, selection: Union[np.ndarray, Sequence[int], slice]) -> Tuple[EclipseEvent, ...]:
+        """
+        Materialise the events selected by a boolean mask, an index array or a
+        slice over the rows.
+        """
+
+        if isinstance(selection, slice):
+            return self.events[selection]
+        indices = np.asarray(selection)
+        if indices.dtype == np.bool_:
+            indices = np.flatnonzero(indices)
+        return tuple(self.events[index] for index in indices.tolist())
+
+
+@lru_cache(maxsize=None)
+def solar_arrays() -> EclipseCatalogArrays:
+    return EclipseCatalogArrays.from_events(eclipse_data.solar_events())
+
+
+@lru_cache(maxsize=None)
+def lunar_arrays() -> EclipseCatalogArrays:
+    return EclipseCatalogArrays.from_events(eclipse_data.lunar_events())
+
+
+@lru_cache(maxsize=None)
+def all_arrays() -> EclipseCatalogArrays:
+    return EclipseCatalogArrays.from_events(eclipse_data.all_events())
+
+
+for _cached in (solar_arrays, lunar_arrays, all_arrays):
+    eclipse_data.register_catalog_cache(_cached.cache_clear)
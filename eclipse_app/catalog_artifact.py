@@ -0,0 +1,220 @@
+"""
+Container format for the precompiled eclipse catalog and other build outputs.
+
+An artifact is a single binary file holding named sections (for example the
+packed solar and lunar records) together with fingerprints of the CSV files it
+was compiled from. Readers verify a checksum of the source and section tables,
+the source fingerprints and the section bounds before trusting any section, so
+a stale or truncated artifact is rejected and callers can fall back to parsing
+the CSVs. The header also records a checksum of the whole payload, which
+`read_artifact` checks as well. `map_artifact` skips it, since hashing would
+read every page of the mapped file; mapped artifacts can be checked in full
+with
+
+    python -m eclipse_app.catalog_artifact gazetteer.bin ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Mapping, Sequence, Tuple, Union
+
+ARTIFACT_FILENAME = "eclipse_catalog.bin"
+FORMAT_VERSION = 2
+
+_MAGIC = b"ECLIPSEC"
+# magic, format version, source count, section count, sha256 of the source
+# and section tables, sha256 of the whole payload
+_HEADER = struct.Struct("<8sHHH32s32s")
+# source file name, size in bytes, sha256 of contents
+_SOURCE_ENTRY = struct.Struct("<64sQ32s")
+# section name, offset from start of payload, length
+_SECTION_ENTRY = struct.Struct("<16sQQ")
+
+
+class CatalogArtifactError(ValueError):
+    """
+    Raised when an artifact is missing, damaged, from another format version,
+    or out of date with respect to its source CSVs.
+    """
+
+
+def _fingerprint(path: Path) -> Tuple[int, bytes]:
+    data = path.read_bytes()
+    return len(data), hashlib.sha256(data).digest()
+
+
+def _encode_name(value: str, width: int) -> bytes:
+    encoded = value.encode("utf-8")
+    if len(encoded) > width:
+        raise ValueError(f"Name {value!r} does not fit in {width} bytes")
+    return encoded
+
+
+def write_artifact(
+    path: Path, sections: Mapping[str, bytes], sources: Sequence[Path]
+) -> Path:
+    """
+    Write `sections` to `path`, recording fingerprints of `sources` so that
+    readers can detect when the artifact no longer matches its inputs.
+    """
+
+    source_table = bytearray()
+    for source in sources:
+        size, digest = _fingerprint(source)
+        source_table += _SOURCE_ENTRY.pack(_encode_name(source.name, 64), size, digest)
+
+    section_table = bytearray()
+    body = bytearray()
+    for name, data in sections.items():
+        section_table += _SECTION_ENTRY.pack(_encode_name(name, 16), len(body), len(data))
+        body += data
+
+    tables = bytes(source_table + section_table)
+    payload = tables + body
+    header = _HEADER.pack(
+        _MAGIC,
+        FORMAT_VERSION,
+        len(sources),
+        len(sections),
+        hashlib.sha256(tables).digest(),
+        hashlib.sha256(payload).digest(),
+    )
+
+    # Write to a sibling file first so readers never observe a partial artifact.
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_bytes(header + payload)
+    temporary.replace(path)
+    return path
+
+
+def read_artifact(path: Path, sources: Sequence[Path]) -> Dict[str, memoryview]:
+    """
+    Read every section of the artifact at `path` with a single file read.
+
+    Raises `CatalogArtifactError` when the file is missing or unreadable, when
+    its checksums or format version do not match, when a section runs
+    past the end of the file, or when any of `sources` differs from the file
+    the artifact was compiled from.
+    """
+
+    try:
+        data = path.read_bytes()
+    except OSError as exc:
+        raise CatalogArtifactError(f"Cannot read catalog artifact {path}: {exc}") from exc
+    return _parse_artifact(data, path, sources, check_payload=True)
+
+
+def map_artifact(path: Path, sources: Sequence[Path]) -> Dict[str, memoryview]:
+    """
+    Like `read_artifact`, but memory-maps the file instead of reading it, so
+    large sections are paged in on demand and shared by every process that
+    maps the same file. Only the tables are checksummed; the payload checksum
+    is left to `verify_artifact`.
+    """
+
+    try:
+        with path.open("rb") as handle:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as exc:
+        raise CatalogArtifactError(f"Cannot map catalog artifact {path}: {exc}") from exc
+    return _parse_artifact(memoryview(data), path, sources)
+
+
+def verify_artifact(path: Path) -> None:
+    """
+    Check the checksum of the whole payload of the artifact at `path`, which
+    `map_artifact` skips. Raises `CatalogArtifactError` when it does not match.
+    """
+
+    # The sources are not checked here: only their owner knows where they live.
+    read_artifact(path, ())
+
+
+def _split_header(
+    data: Union[bytes, memoryview], path: Path, check_payload: bool
+) -> Tuple[memoryview, int, int]:
+    """
+    Payload, source count and section count of an artifact with a valid header
+    and tables, and a valid payload when `check_payload` is set.
+    """
+
+    if len(data) < _HEADER.size:
+        raise CatalogArtifactError(f"Catalog artifact {path} is truncated")
+
+    magic, version, source_count, section_count, tables_digest, payload_digest = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise CatalogArtifactError(f"{path} is not an eclipse catalog artifact")
+    if version != FORMAT_VERSION:
+        raise CatalogArtifactError(
+            f"Catalog artifact {path} has format version {version}, expected {FORMAT_VERSION}"
+        )
+
+    payload = memoryview(data)[_HEADER.size :]
+    tables_size = source_count * _SOURCE_ENTRY.size + section_count * _SECTION_ENTRY.size
+    if len(payload) < tables_size or hashlib.sha256(payload[:tables_size]).digest() != tables_digest:
+        raise CatalogArtifactError(f"Catalog artifact {path} failed its checksum")
+    if check_payload and hashlib.sha256(payload).digest() != payload_digest:
+        raise CatalogArtifactError(f"Catalog artifact {path} failed its checksum")
+    return payload, source_count, section_count
+
+
+def _parse_artifact(
+    data: Union[bytes, memoryview], path: Path, sources: Sequence[Path], check_payload: bool = False
+) -> Dict[str, memoryview]:
+    payload, source_count, section_count = _split_header(data, path, check_payload)
+
+    offset = 0
+    recorded: Dict[str, Tuple[int, bytes]] = {}
+    for _ in range(source_count):
+        name, size, source_digest = _SOURCE_ENTRY.unpack_from(payload, offset)
+        recorded[name.rstrip(b"\0").decode("utf-8")] = (size, source_digest)
+        offset += _SOURCE_ENTRY.size
+
+    for source in sources:
+        try:
+            current = _fingerprint(source)
+        except OSError as exc:
+            raise CatalogArtifactError(f"Cannot fingerprint catalog source {source}: {exc}") from exc
+        if recorded.get(source.name) != current:
+            raise CatalogArtifactError(f"Catalog artifact {path} is stale for {source.name}")
+
+    entries = []
+    for _ in range(section_count):
+        entries.append(_SECTION_ENTRY.unpack_from(payload, offset))
+        offset += _SECTION_ENTRY.size
+
+    body = payload[offset:]
+    sections: Dict[str, memoryview] = {}
+    for name, start, length in entries:
+        if start + length > len(body):
+            raise CatalogArtifactError(f"Catalog artifact {path} has a truncated section")
+        sections[name.rstrip(b"\0").decode("utf-8")] = body[start : start + length]
+    return sections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify the full checksum of compiled artifacts.")
+    parser.add_argument("artifacts", nargs="+", type=Path, help="Artifact files, e.g. eclipse_catalog.bin.")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.artifacts:
+        try:
+            verify_artifact(path)
+        except CatalogArtifactError as exc:
+            print(exc, file=sys.stderr)
+            failed = True
+        else:
+            print(f"{path}: OK")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,20 @@ with the application so lookups stay offline.
 from __future__ import annotations
 
 import csv
+import heapq
+import math
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from datetime import date
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .catalog_artifact import ARTIFACT_FILENAME, CatalogArtifactError, read_artifact, write_artifact
 
 
 @dataclass(frozen=True)
@@ -50,6 +59,11 @@ class EclipseEvent:
     title: str
     visibility: Sequence[VisibilityWindow]
     peak_description: str
+    saros: Optional[int] = None
+    magnitude: Optional[float] = None
+    latitude: Optional[float] = None  # greatest eclipse point
+    longitude: Optional[float] = None
+    duration_seconds: Optional[int] = None
 
     def __post_init__(self) -> None:
         normalised_kind = self.kind.lower()
@@ -57,13 +71,81 @@ class EclipseEvent:
             raise ValueError(f"Unsupported eclipse kind: {self.kind!r}")
 
 
+class EclipseCatalog(tuple):
+    """
+    Immutable, date-sorted sequence of events carrying a parallel index of
+    date ordinals, so date lookups bisect instead of scanning from the start.
+    """
+
+    date_index: Sequence[int]
+
+    def __new__(cls, events: Iterable[EclipseEvent]) -> "EclipseCatalog":
+        catalog = super().__new__(cls, events)
+        catalog.date_index = array("i", (event.occurs_on.toordinal() for event in catalog))
+        return catalog
+
+    def start_index(self, start_date: date) -> int:
+        """Position of the first event on or after `start_date`."""
+        return bisect_left(self.date_index, start_date.toordinal())
+
+    def stop_index(self, end_date: date) -> int:
+        """Position just past the last event on or before `end_date`."""
+        return bisect_right(self.date_index, end_date.toordinal())
+
+    def token_events(self, tokens: Iterable[str], start: int, stop: int) -> Iterator[int]:
+        """
+        Positions in [start, stop), in order, of the events with a visibility
+        window naming one of the lowercase `tokens` or naming no place at all:
+        the only events a location with those tokens can match by window.
+        """
+
+        postings, unrestricted = self._token_index
+        lists = [unrestricted]
+        for token in tokens:
+            posting = postings.get(token)
+            if posting is not None:
+                lists.append(posting)
+        slices = [memoryview(posting)[bisect_left(posting, start) : bisect_left(posting, stop)] for posting in lists]
+        previous = -1
+        for position in heapq.merge(*slices):
+            if position != previous:
+                yield position
+                previous = position
+
+    @cached_property
+    def _token_index(self) -> Tuple[Dict[str, array], array]:
+        # Inverted index: each country or region token to the sorted positions
+        # of the events with a window naming it, plus the events with a window
+        # that names nothing and so matches everywhere.
+        postings: Dict[str, array] = {}
+        unrestricted = array("I")
+        for position, event in enumerate(self):
+            tokens = set()
+            for window in event.visibility:
+                named = set(window.normalized_countries()) | set(window.normalized_regions())
+                if not named and (not unrestricted or unrestricted[-1] != position):
+                    unrestricted.append(position)
+                tokens |= named
+            for token in tokens:
+                postings.setdefault(token, array("I")).append(position)
+        return postings, unrestricted
+
+
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Directory holding the catalog CSVs and compiled artifacts; overridable so
+# alternative catalogs (e.g. synthetic benchmark data) can be loaded.
+DATA_DIR_ENV = "ECLIPSE_FINDER_DATA_DIR"
 _SOLAR_CSV = "solar_eclipses_1900_2100.csv"
 _LUNAR_CSV = "lunar_eclipses_1900_2100.csv"
 
 
+def _data_dir() -> Path:
+    override = os.environ.get(DATA_DIR_ENV)
+    return Path(override) if override else _PROJECT_ROOT
+
+
 def _catalog_path(filename: str) -> Path:
-    path = _PROJECT_ROOT / filename
+    path = _data_dir() / filename
     if not path.exists():
         raise FileNotFoundError(f"Catalog file not found: {path}")
     return path
@@ -81,6 +163,28 @@ def _parse_float(value: Optional[str]) -> Optional[float]:
         return None
 
 
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value.strip())
+    except ValueError:
+        return None
+
+
+_DURATION_PATTERN = re.compile(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?")
+
+
+def _duration_seconds(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    match = _DURATION_PATTERN.fullmatch(value.strip())
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds = (int(part) if part else 0 for part in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
 def _format_coordinate(value: Optional[float], kind: str) -> str:
     if value is None:
         return "unknown"
@@ -207,7 +311,7 @@ def _compose_title(occurs_on: date, subtype: str, kind: str) -> str:
     return f"{occurs_on:%B %d, %Y} {subtype} {kind.title()} Eclipse"
 
 
-def _load_catalog(filename: str, kind: str) -> Tuple[EclipseEvent, ...]:
+def _load_catalog(filename: str, kind: str) -> EclipseCatalog:
     path = _catalog_path(filename)
     events: List[EclipseEvent] = []
 
@@ -243,20 +347,237 @@ def _load_catalog(filename: str, kind: str) -> Tuple[EclipseEvent, ...]:
                     longitude=longitude,
                     saros=saros,
                 ),
+                saros=_parse_int(saros),
+                magnitude=_parse_float(magnitude),
+                latitude=latitude,
+                longitude=longitude,
+                duration_seconds=_duration_seconds(duration),
             )
             events.append(event)
 
-    return tuple(sorted(events, key=lambda event: event.occurs_on))
+    return EclipseCatalog(sorted(events, key=lambda event: event.occurs_on))
+
+
+# ---------------------------------------------------------------------------
+# Precompiled catalog records
+# ---------------------------------------------------------------------------
+
+# date ordinal, kind code, subtype code, saros, magnitude, latitude, longitude,
+# duration seconds, text offset, text length. Missing numbers are stored as -1
+# (integers) or NaN (floats).
+_RECORD = struct.Struct("<iBBhdddiII")
+KIND_CODES = ("solar", "lunar")
+SUBTYPE_CODES = ("Unknown", "Total", "Annular", "Hybrid", "Partial", "Penumbral")
+
+# Separators for the per-record text block: fields, windows, window parts and
+# list items. ASCII unit/record separators never appear in catalog text.
+_FIELD_SEPARATOR = "\x1f"
+_WINDOW_SEPARATOR = "\x1e"
+_PART_SEPARATOR = "\x1d"
+_ITEM_SEPARATOR = "\x1c"
+
+
+def subtype_code(subtype: str) -> int:
+    """Index of `subtype` in `SUBTYPE_CODES`, or 0 ("Unknown") if it is not listed."""
+    try:
+        return SUBTYPE_CODES.index(subtype)
+    except ValueError:
+        return 0
+
+
+def _optional_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _optional_int(value: int) -> Optional[int]:
+    return None if value < 0 else value
+
+
+def _encode_text(event: EclipseEvent) -> bytes:
+    windows = _WINDOW_SEPARATOR.join(
+        _PART_SEPARATOR.join(
+            (
+                window.notes,
+                _ITEM_SEPARATOR.join(window.countries),
+                _ITEM_SEPARATOR.join(window.regions),
+            )
+        )
+        for window in event.visibility
+    )
+    fields = (event.subtype, event.title, event.peak_description, windows)
+    return _FIELD_SEPARATOR.join(fields).encode("utf-8")
+
+
+def _decode_items(value: str) -> Tuple[str, ...]:
+    return tuple(value.split(_ITEM_SEPARATOR)) if value else ()
+
+
+def _decode_windows(value: str) -> Tuple[VisibilityWindow, ...]:
+    windows: List[VisibilityWindow] = []
+    for window_text in value.split(_WINDOW_SEPARATOR) if value else ():
+        notes, countries, regions = window_text.split(_PART_SEPARATOR)
+        windows.append(
+            VisibilityWindow(
+                countries=_decode_items(countries),
+                regions=_decode_items(regions),
+                notes=notes,
+            )
+        )
+    return tuple(windows)
+
+
+def _pack_catalog(events: Sequence[EclipseEvent]) -> bytes:
+    records = bytearray()
+    text = bytearray()
+    for event in events:
+        encoded = _encode_text(event)
+        records += _RECORD.pack(
+            event.occurs_on.toordinal(),
+            KIND_CODES.index(event.kind),
+            subtype_code(event.subtype),
+            -1 if event.saros is None else event.saros,
+            math.nan if event.magnitude is None else event.magnitude,
+            math.nan if event.latitude is None else event.latitude,
+            math.nan if event.longitude is None else event.longitude,
+            -1 if event.duration_seconds is None else event.duration_seconds,
+            len(text),
+            len(encoded),
+        )
+        text += encoded
+    return struct.pack("<I", len(events)) + bytes(records) + bytes(text)
+
+
+def _unpack_catalog(payload: memoryview) -> EclipseCatalog:
+    (count,) = struct.unpack_from("<I", payload)
+    records_end = 4 + count * _RECORD.size
+    text = bytes(payload[records_end:])
+    events: List[EclipseEvent] = []
+    for (
+        ordinal,
+        kind_code,
+        _subtype,
+        saros,
+        magnitude,
+        latitude,
+        longitude,
+        duration_seconds,
+        text_offset,
+        text_length,
+    ) in _RECORD.iter_unpack(payload[4:records_end]):
+        subtype, title, peak_description, windows = (
+            text[text_offset : text_offset + text_length].decode("utf-8").split(_FIELD_SEPARATOR)
+        )
+        events.append(
+            EclipseEvent(
+                occurs_on=date.fromordinal(ordinal),
+                kind=KIND_CODES[kind_code],
+                subtype=subtype,
+                title=title,
+                visibility=_decode_windows(windows),
+                peak_description=peak_description,
+                saros=_optional_int(saros),
+                magnitude=_optional_float(magnitude),
+                latitude=_optional_float(latitude),
+                longitude=_optional_float(longitude),
+                duration_seconds=_optional_int(duration_seconds),
+            )
+        )
+    return EclipseCatalog(events)
+
+
+_CATALOG_FILES = {"solar": _SOLAR_CSV, "lunar": _LUNAR_CSV}
+
+
+def _artifact_path() -> Path:
+    return _data_dir() / ARTIFACT_FILENAME
+
+
+def _catalog_sources() -> List[Path]:
+    return [_catalog_path(filename) for filename in _CATALOG_FILES.values()]
+
+
+@lru_cache(maxsize=None)
+def _compiled_sections() -> Optional[Dict[str, memoryview]]:
+    try:
+        return read_artifact(_artifact_path(), _catalog_sources())
+    except CatalogArtifactError:
+        return None
+
+
+def _load_events(kind: str) -> EclipseCatalog:
+    sections = _compiled_sections()
+    if sections is not None and kind in sections:
+        try:
+            return _unpack_catalog(sections[kind])
+        except (struct.error, UnicodeDecodeError, ValueError, IndexError):
+            # A section that passed its checksums but still does not decode
+            # (written by a buggy build, say) is treated like a missing one.
+            pass
+    return _load_catalog(_CATALOG_FILES[kind], kind)
+
+
+def compile_catalog() -> Path:
+    """
+    Parse the CSV catalogs and write them as a precompiled binary artifact that
+    later processes load with a single read, together with the per-region
+    "next event" tables of `jump_tables`. The artifact records fingerprints
+    of the CSVs and is ignored once either file changes.
+    """
+
+    catalogs = {kind: _load_catalog(filename, kind) for kind, filename in _CATALOG_FILES.items()}
+    sections = {kind: _pack_catalog(events) for kind, events in catalogs.items()}
+    # Imported here: the tables are built with the matcher, which imports this module.
+    from .jump_tables import pack_jump_tables
+
+    sections.update(pack_jump_tables(catalogs["solar"], catalogs["lunar"]))
+    path = write_artifact(_artifact_path(), sections, _catalog_sources())
+    _compiled_sections.cache_clear()
+    return path
+
+
+def _event_date(event: EclipseEvent) -> date:
+    return event.occurs_on
+
+
+@lru_cache(maxsize=None)
+def _solar_events() -> EclipseCatalog:
+    return _load_events("solar")
 
 
 @lru_cache(maxsize=None)
-def _solar_events() -> Tuple[EclipseEvent, ...]:
-    return _load_catalog(_SOLAR_CSV, "solar")
+def _lunar_events() -> EclipseCatalog:
+    return _load_events("lunar")
 
 
 @lru_cache(maxsize=None)
-def _lunar_events() -> Tuple[EclipseEvent, ...]:
-    return _load_catalog(_LUNAR_CSV, "lunar")
+def _all_events() -> EclipseCatalog:
+    # Both catalogs are already date-sorted, so a linear merge is enough. The
+    # merge is stable: on equal dates solar events precede lunar ones.
+    return EclipseCatalog(heapq.merge(_solar_events(), _lunar_events(), key=_event_date))
+
+
+_DERIVED_CACHE_CLEARERS: List[Callable[[], None]] = []
+
+
+def register_catalog_cache(clear: Callable[[], None]) -> None:
+    """
+    Register `clear` to be called by `reload_catalogs`, for modules that cache
+    values derived from the catalogs.
+    """
+
+    _DERIVED_CACHE_CLEARERS.append(clear)
+
+
+def reload_catalogs() -> None:
+    """
+    Drop the cached catalogs, the merged timeline and every registered derived
+    cache so that the next access reads the catalog files again.
+    """
+
+    for cached in (_compiled_sections, _solar_events, _lunar_events, _all_events):
+        cached.cache_clear()
+    for clear in _DERIVED_CACHE_CLEARERS:
+        clear()
 
 
 def solar_events() -> Sequence[EclipseEvent]:
@@ -268,4 +589,33 @@ def lunar_events() -> Sequence[EclipseEvent]:
 
 
 def all_events() -> Sequence[EclipseEvent]:
-    return tuple(sorted(_solar_events() + _lunar_events(), key=lambda event: event.occurs_on))
+    return _all_events()
+
+
+def compiled_sections() -> Optional[Mapping[str, memoryview]]:
+    """
+    Sections of the compiled catalog artifact, or None when there is none or
+    it is out of date with the CSVs. Read once and cached until
+    `reload_catalogs`.
+    """
+
+    return _compiled_sections()
+
+
+def iter_events(start_date: Optional[date] = None) -> Iterator[EclipseEvent]:
+    """
+    Lazily yield solar and lunar events in date order, beginning with the
+    first event on or after `start_date`. Only the events actually consumed
+    are visited, so reading the next few events is cheap.
+    """
+
+    solar = _solar_events()
+    lunar = _lunar_events()
+    solar_start = solar.start_index(start_date) if start_date else 0
+    lunar_start = lunar.start_index(start_date) if start_date else 0
+    # Indexed rather than islice'd: islice would step through the skipped events.
+    return heapq.merge(
+        (solar[index] for index in range(solar_start, len(solar))),
+        (lunar[index] for index in range(lunar_start, len(lunar))),
+        key=_event_date,
+    )
@@ -5,15 +5,82 @@ visible solar and lunar eclipses.
 
 from __future__ import annotations
 
+from dataclasses import dataclass, replace
 from datetime import date
-from typing import Optional, Sequence, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from . import eclipse_data
-from .eclipse_data import EclipseEvent, VisibilityWindow
-from .location_resolver import LocationQuery
+from .eclipse_data import EclipseCatalog, EclipseEvent, VisibilityWindow
+from .jump_tables import jump_tables
+from .location_resolver import LocationQuery, RegionSignature, token_mask
 
+if TYPE_CHECKING:
+    import numpy as np
 
-def _window_matches_location(window: VisibilityWindow, location: LocationQuery) -> bool:
+    from .besselian import BesselianElements, LocalCircumstances
+    from .catalog_arrays import EclipseCatalogArrays
+    from .lunar import LunarElements, LunarVisibility
+
+
+@lru_cache(maxsize=None)
+def window_masks(window: VisibilityWindow) -> Optional[Tuple[int, int]]:
+    """
+    Country and region bitmasks of `window`, or None when the window names a
+    token outside the resolver vocabulary and must be matched by token sets.
+    """
+
+    countries, countries_complete = token_mask(window.normalized_countries())
+    regions, regions_complete = token_mask(window.normalized_regions())
+    if not (countries_complete and regions_complete):
+        return None
+    return countries, regions
+
+
+eclipse_data.register_catalog_cache(window_masks.cache_clear)
+
+
+def masks_match(countries: int, regions: int, signature: RegionSignature) -> bool:
+    """
+    Bitmask form of `_window_tokens_match_location`, valid for windows whose
+    tokens all belong to the vocabulary. A location's own country and region
+    are always among its tokens, so every membership test becomes an AND.
+    """
+
+    if countries and not (signature.tokens & countries):
+        return False
+    if not regions or signature.tokens & regions:
+        return True
+    return not signature.has_region and bool(signature.country & countries)
+
+
+def window_matches_location(
+    window: VisibilityWindow,
+    location: LocationQuery,
+    signature: Optional[RegionSignature] = None,
+) -> bool:
+    masks = window_masks(window)
+    if masks is None:
+        return _window_tokens_match_location(window, location)
+    if signature is None:
+        signature = location.region_signature()
+    return masks_match(masks[0], masks[1], signature)
+
+
+def _window_tokens_match_location(window: VisibilityWindow, location: LocationQuery) -> bool:
     location_tokens = location.tokens()
 
     country_tokens = {country.lower() for country in window.countries}
@@ -50,43 +117,695 @@ def _window_matches_location(window: VisibilityWindow, location: LocationQuery)
     return False
 
 
-def is_visible_from(event: EclipseEvent, location: LocationQuery) -> bool:
+def _visible_with_signature(
+    event: EclipseEvent, location: LocationQuery, signature: RegionSignature
+) -> bool:
     for window in event.visibility:
-        if _window_matches_location(window, location):
+        if window_matches_location(window, location, signature):
             return True
     return False
 
 
+def _circumstances(event: EclipseEvent, location: LocationQuery) -> Optional["LocalCircumstances"]:
+    """
+    Local circumstances of `event` at the location's coordinates, or None when
+    the location has no coordinates or the event has no Besselian elements.
+    """
+
+    coordinates = location.coordinates
+    if coordinates is None or event.kind != "solar":
+        return None
+    # The geometry engine needs NumPy; only load it for located queries.
+    from . import besselian
+
+    elements = besselian.elements_for(event)
+    if elements is None:
+        return None
+    return besselian.local_circumstances(elements, *coordinates)
+
+
+def _lunar_visibility(event: EclipseEvent, location: LocationQuery) -> Optional["LunarVisibility"]:
+    """
+    Phase visibility of a lunar `event` at the location's coordinates, or None
+    when the location has no coordinates or the event has no elements.
+    """
+
+    coordinates = location.coordinates
+    if coordinates is None or event.kind != "lunar":
+        return None
+    from . import lunar
+
+    elements = lunar.elements_for(event)
+    if elements is None:
+        return None
+    return lunar.local_visibility(elements, *coordinates)
+
+
+def _geometry_visible(event: EclipseEvent, latitude: Any, longitude: Any) -> Optional["np.ndarray"]:
+    """
+    Visibility of `event` from arrays of coordinates according to the solar
+    or lunar engine, or None when the event has no elements.
+    """
+
+    if event.kind == "solar":
+        from . import besselian
+
+        solar_elements = besselian.elements_for(event)
+        if solar_elements is None:
+            return None
+        return besselian.local_circumstances(solar_elements, latitude, longitude).visible
+
+    from . import lunar
+
+    lunar_elements = lunar.elements_for(event)
+    if lunar_elements is None:
+        return None
+    return lunar.local_visibility(lunar_elements, latitude, longitude).visible
+
+
+def _raster_class(event: EclipseEvent, location: LocationQuery) -> Optional[int]:
+    """
+    Precomputed visibility class of `event` at the location's coordinates, or
+    None when there are no coordinates or no raster for the event.
+    """
+
+    coordinates = location.coordinates
+    if coordinates is None:
+        return None
+    from .visibility_raster import load_rasters
+
+    rasters = load_rasters()
+    if rasters is None:
+        return None
+    return rasters.lookup(event, *coordinates)
+
+
+def _event_visible(event: EclipseEvent, location: LocationQuery, signature: RegionSignature) -> bool:
+    raster_class = _raster_class(event, location)
+    if raster_class is not None:
+        return bool(raster_class)
+    coordinates = location.coordinates
+    if coordinates is not None:
+        visible = _geometry_visible(event, *coordinates)
+        if visible is not None:
+            return bool(visible[0])
+    return _visible_with_signature(event, location, signature)
+
+
+def is_visible_from(event: EclipseEvent, location: LocationQuery) -> bool:
+    """
+    Whether `event` can be seen from `location`: from the eclipse geometry
+    when the location has coordinates and the event has solar or lunar
+    elements (a precomputed raster lookup when one is built), otherwise by
+    matching its visibility windows.
+    """
+
+    return _event_visible(event, location, location.region_signature())
+
+
 def matching_window(
     event: EclipseEvent, location: LocationQuery
 ) -> Optional[VisibilityWindow]:
     for window in event.visibility:
-        if _window_matches_location(window, location):
+        if window_matches_location(window, location):
             return window
     return None
 
 
+def _date_bounds(
+    events: Sequence[EclipseEvent], start_date: date, end_date: Optional[date]
+) -> Tuple[int, int]:
+    if isinstance(events, EclipseCatalog):
+        lower = events.start_index(start_date)
+        upper = len(events) if end_date is None else events.stop_index(end_date)
+        return lower, max(lower, upper)
+
+    # Plain sequences have no date index; fall back to scanning them in order.
+    lower = 0
+    while lower < len(events) and events[lower].occurs_on < start_date:
+        lower += 1
+    upper = lower
+    while upper < len(events) and (end_date is None or events[upper].occurs_on <= end_date):
+        upper += 1
+    return lower, upper
+
+
 def next_visible_event(
     events: Sequence[EclipseEvent],
     location: LocationQuery,
     start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
 ) -> Optional[EclipseEvent]:
+    """
+    First event in the date-sorted `events` on or after `start_date` (today by
+    default) and, if given, on or before `end_date` that is visible from
+    `location`.
+    """
+
     reference_date = start_date or date.today()
-    for event in events:
-        if event.occurs_on < reference_date:
+    return next(_visible_events(events, location, reference_date, end_date), None)
+
+
+def _visible_events(
+    events: Sequence[EclipseEvent],
+    location: LocationQuery,
+    start_date: date,
+    end_date: Optional[date],
+    kinds: Optional[FrozenSet[str]] = None,
+) -> Iterator[EclipseEvent]:
+    lower, upper = _date_bounds(events, start_date, end_date)
+    signature = location.region_signature()
+    positions: Iterable[int] = range(lower, upper)
+    if location.coordinates is None and isinstance(events, EclipseCatalog):
+        # Without coordinates only the visibility windows decide, and a window
+        # can only match by naming one of the location's tokens (or nothing).
+        positions = events.token_events(location.tokens(), lower, upper)
+    for index in positions:
+        event = events[index]
+        if (kinds is None or event.kind in kinds) and _event_visible(event, location, signature):
+            yield event
+
+
+def iter_visible_events(
+    location: LocationQuery,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    kinds: Iterable[str] = eclipse_data.KIND_CODES,
+    limit: Optional[int] = None,
+) -> Iterator[EclipseEvent]:
+    """
+    Events of the given `kinds` visible from `location`, in date order over
+    the merged solar and lunar catalog, from `start_date` (today by default)
+    to `end_date` inclusive when given, at most `limit` of them. `kinds` may
+    also be a single kind such as "solar".
+
+    Matches are produced lazily, so stopping early (or a small `limit`) only
+    examines the events up to the last one returned.
+    """
+
+    if isinstance(kinds, str):
+        kinds = (kinds,)
+    wanted = frozenset(kind.lower() for kind in kinds)
+    unknown = wanted.difference(eclipse_data.KIND_CODES)
+    if unknown:
+        raise ValueError(f"Unsupported eclipse kind(s): {', '.join(sorted(unknown))}")
+    if limit is not None and limit < 0:
+        raise ValueError("limit must not be negative")
+    matches = _visible_events(
+        eclipse_data.all_events(), location, start_date or date.today(), end_date, wanted
+    )
+    return matches if limit is None else islice(matches, limit)
+
+
+def next_central_eclipse(
+    location: LocationQuery, start_date: Optional[date] = None
+) -> Optional[EclipseEvent]:
+    """
+    First solar event on or after `start_date` (today by default) whose path
+    of totality or annularity covers the location's coordinates, found with
+    the path polygon index; None when the location has no coordinates.
+    """
+
+    coordinates = location.coordinates
+    if coordinates is None:
+        return None
+    from .eclipse_paths import central_paths_containing
+
+    reference_date = start_date or date.today()
+    events = eclipse_data.solar_events()
+    for path in central_paths_containing(*coordinates):
+        if path.occurs_on < reference_date:
             continue
-        if is_visible_from(event, location):
-            return event
+        lower, upper = _date_bounds(events, path.occurs_on, path.occurs_on)
+        if lower < upper:
+            return events[lower]
     return None
 
 
 def find_next_eclipses(
-    location: LocationQuery, reference_date: Optional[date] = None
+    location: LocationQuery,
+    reference_date: Optional[date] = None,
+    end_date: Optional[date] = None,
 ) -> Tuple[Optional[EclipseEvent], Optional[EclipseEvent]]:
-    solar = next_visible_event(eclipse_data.solar_events(), location, reference_date)
-    lunar = next_visible_event(eclipse_data.lunar_events(), location, reference_date)
+    """
+    Next solar and lunar events visible from `location` on or after
+    `reference_date` (today by default) and, if given, on or before `end_date`.
+
+    Locations without coordinates whose region signature has a precomputed
+    jump table are answered with one bisect. Otherwise the answer only changes
+    when a date crosses an event date, so results are cached per span of the
+    merged catalog: every reference date between two consecutive events
+    shares one entry.
+    """
+
+    reference_date = reference_date or date.today()
+    if location.coordinates is None:
+        tables = jump_tables()
+        if tables is not None:
+            found = tables.next_events(location.region_signature(), reference_date, end_date)
+            if found is not None:
+                return found
+    lower, upper = _date_bounds(eclipse_data.all_events(), reference_date, end_date)
+    # Matching never looks at the raw input or the postal code, so locations
+    # that resolve alike share entries.
+    resolved = replace(location, raw="", postal_code=None)
+    return _next_eclipses_in_span(resolved, lower, None if end_date is None else upper)
+
+
+@lru_cache(maxsize=4096)
+def _next_eclipses_in_span(
+    location: LocationQuery, lower: int, upper: Optional[int]
+) -> Tuple[Optional[EclipseEvent], Optional[EclipseEvent]]:
+    # Any date in the span gives the same answer; use the event ending it.
+    events = eclipse_data.all_events()
+    if lower >= len(events) or (upper is not None and upper <= lower):
+        return None, None
+    start_date = events[lower].occurs_on
+    end_date = None if upper is None else events[upper - 1].occurs_on
+    solar = next_visible_event(eclipse_data.solar_events(), location, start_date, end_date)
+    lunar = next_visible_event(eclipse_data.lunar_events(), location, start_date, end_date)
     return solar, lunar
 
 
+eclipse_data.register_catalog_cache(_next_eclipses_in_span.cache_clear)
+
+
+def _first_visible_row(
+    arrays: "EclipseCatalogArrays",
+    location: LocationQuery,
+    start_date: date,
+    end_date: Optional[date],
+) -> Optional[EclipseEvent]:
+    rows = arrays.date_range(start_date, end_date)
+    visible = arrays.visible_mask(location, location.region_signature(), rows)
+    if not visible.any():
+        return None
+    return arrays.events[rows.start + int(visible.argmax())]
+
+
+def _first_visible_by_geometry(
+    arrays: "EclipseCatalogArrays",
+    locations: Sequence[LocationQuery],
+    start_date: date,
+    end_date: Optional[date],
+) -> List[Optional[EclipseEvent]]:
+    """
+    First event visible from each of `locations` (all with coordinates). Events
+    are visited in date order and each one is evaluated for every location
+    still unresolved in one vectorized pass, from its raster when one is built;
+    events without elements fall back to the visibility windows.
+    """
+
+    import numpy as np
+
+    from .visibility_raster import load_rasters
+
+    latitude = np.array([location.latitude for location in locations], dtype=np.float64)
+    longitude = np.array([location.longitude for location in locations], dtype=np.float64)
+    rasters = load_rasters()
+    cells = rasters.cell_index(latitude, longitude) if rasters is not None else None
+    found: List[Optional[EclipseEvent]] = [None] * len(locations)
+    pending = np.arange(len(locations))
+    rows = arrays.date_range(start_date, end_date)
+    for row in range(rows.start, rows.stop):
+        if not pending.size:
+            break
+        event = arrays.events[row]
+        slot = rasters.slot(event) if rasters is not None else None
+        if slot is not None:
+            visible = rasters.classes(slot, cells[pending]) != 0
+        else:
+            visible = _geometry_visible(event, latitude[pending], longitude[pending])
+        if visible is None:
+            visible = np.fromiter(
+                (
+                    _visible_with_signature(event, locations[index], locations[index].region_signature())
+                    for index in pending.tolist()
+                ),
+                dtype=np.bool_,
+                count=pending.size,
+            )
+        for index in pending[visible].tolist():
+            found[index] = event
+        pending = pending[~visible]
+    return found
+
+
+def find_next_eclipses_batch(
+    locations: Iterable[LocationQuery],
+    reference_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> List[Tuple[Optional[EclipseEvent], Optional[EclipseEvent]]]:
+    """
+    `find_next_eclipses` for many locations at once, returned in input order.
+
+    Locations are grouped by region signature, since two locations with the
+    same signature match exactly the same windows, and each group is resolved
+    once with vectorized scans over the NumPy catalog view. Locations with
+    coordinates are resolved from the eclipse geometry instead, all such
+    locations at once per event.
+    """
+
+    # NumPy is only needed for batch lookups; keep it off the single-lookup path.
+    from .catalog_arrays import lunar_arrays, solar_arrays
+
+    reference_date = reference_date or date.today()
+    solar = solar_arrays()
+    lunar = lunar_arrays()
+    # Windows without exact masks are matched on raw tokens, which the
+    # signature does not capture, so fall back to grouping by full token sets.
+    exact = bool(solar.window_exact.all() and lunar.window_exact.all())
+
+    by_region: Dict[Hashable, Tuple[Optional[EclipseEvent], Optional[EclipseEvent]]] = {}
+    located: Dict[Hashable, LocationQuery] = {}
+    keys: List[Tuple[Hashable, Optional[Tuple[float, float]]]] = []
+    for location in locations:
+        signature = location.region_signature()
+        region_key: Hashable = signature if exact else (signature, location.tokens())
+        key = (region_key, location.coordinates)
+        keys.append(key)
+        if location.coordinates is not None:
+            located.setdefault(key, location)
+        elif region_key not in by_region:
+            by_region[region_key] = (
+                _first_visible_row(solar, location, reference_date, end_date),
+                _first_visible_row(lunar, location, reference_date, end_date),
+            )
+
+    by_position: Dict[Hashable, Tuple[Optional[EclipseEvent], Optional[EclipseEvent]]] = {}
+    if located:
+        positioned = list(located.values())
+        by_position = dict(
+            zip(
+                located,
+                zip(
+                    _first_visible_by_geometry(solar, positioned, reference_date, end_date),
+                    _first_visible_by_geometry(lunar, positioned, reference_date, end_date),
+                ),
+            )
+        )
+
+    return [by_region[key[0]] if key[1] is None else by_position[key] for key in keys]
+
+
+@dataclass(frozen=True, eq=False)
+class VisibilityTimeline:
+    """
+    Every catalog event visible from one location, in date order: rows of the
+    merged catalog (`eclipse_data.all_events()`), their date ordinals and kinds,
+    and the magnitude there. The magnitude is the local one from the solar geometry
+    when the location has coordinates and the event has elements, otherwise
+    the catalog's (NaN when it has none). Visibility is decided as in
+    `is_visible_from`: from the raster where one exists, else the geometry.
+    """
+
+    rows: "np.ndarray"  # int32
+    ordinals: "np.ndarray"  # int32 proleptic Gregorian ordinal of the date
+    kinds: "np.ndarray"  # uint8 index into KIND_CODES
+    magnitude: "np.ndarray"  # float32
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def events(self) -> Tuple[EclipseEvent, ...]:
+        from .catalog_arrays import all_arrays
+
+        return all_arrays().take(self.rows)
+
+
+def visibility_timeline(location: LocationQuery) -> VisibilityTimeline:
+    """
+    Every event in the catalog visible from `location`, found with one
+    vectorized pass over the NumPy catalog view. Events with solar or lunar
+    elements are decided by the geometry for located queries, as in
+    `is_visible_from`. Results are cached per resolved location.
+    """
+
+    return _visibility_timeline(replace(location, raw="", postal_code=None))
+
+
+@lru_cache(maxsize=256)
+def _visibility_timeline(location: LocationQuery) -> VisibilityTimeline:
+    import numpy as np
+
+    from .catalog_arrays import all_arrays
+
+    arrays = all_arrays()
+    visible = arrays.visible_mask(location)
+    magnitude = arrays.magnitude.copy()
+    if location.coordinates is not None:
+        _apply_geometry(arrays, location, visible, magnitude)
+    rows = np.flatnonzero(visible).astype(np.int32)
+    timeline = VisibilityTimeline(
+        rows=rows, ordinals=arrays.ordinals[rows], kinds=arrays.kinds[rows], magnitude=magnitude[rows]
+    )
+    for column in (timeline.rows, timeline.ordinals, timeline.kinds, timeline.magnitude):
+        column.setflags(write=False)
+    return timeline
+
+
+def _apply_geometry(
+    arrays: "EclipseCatalogArrays", location: LocationQuery, visible: "np.ndarray", magnitude: "np.ndarray"
+) -> None:
+    """Decide the events with elements from their rasters or the geometry, in place."""
+
+    import numpy as np
+
+    from . import besselian, lunar
+
+    latitude, longitude = location.coordinates
+    solar_rows, solar_elements, lunar_rows, lunar_elements = _geometry_rows()
+    solar_slots, lunar_slots = _raster_slots()
+    if solar_rows.size:
+        # The solar engine evaluates every eclipse for this observer in one
+        # call; that gives the local magnitude, and the visibility of events
+        # without a raster.
+        circumstances = besselian.event_circumstances(solar_elements, latitude, longitude)
+        visible[solar_rows] = circumstances.visible
+        magnitude[solar_rows] = circumstances.magnitude
+        _apply_rasters(solar_rows, solar_slots, location, visible)
+    if not lunar_rows.size:
+        return
+    # Lunar magnitudes are the catalog's, so only visibility depends on the
+    # location: from the raster where one exists, else from the Moon's altitude.
+    rastered = _apply_rasters(lunar_rows, lunar_slots, location, visible)
+    if not rastered.all():
+        computed = np.flatnonzero(~rastered)
+        visible[lunar_rows[computed]] = lunar.event_visibility(
+            [lunar_elements[index] for index in computed.tolist()], latitude, longitude
+        )
+
+
+def _apply_rasters(
+    rows: "np.ndarray", slots: "np.ndarray", location: LocationQuery, visible: "np.ndarray"
+) -> "np.ndarray":
+    """Set `visible` for the `rows` that have a raster slot; returns which rows did."""
+
+    from .visibility_raster import load_rasters
+
+    rastered = slots >= 0
+    if rastered.any():
+        rasters = load_rasters()
+        classes = rasters.classes(slots[rastered], rasters.cell_index(*location.coordinates))
+        visible[rows[rastered]] = classes != 0
+    return rastered
+
+
+@lru_cache(maxsize=None)
+def _geometry_rows() -> Tuple[
+    "np.ndarray", Tuple["BesselianElements", ...], "np.ndarray", Tuple["LunarElements", ...]
+]:
+    """Rows of the merged catalog with solar elements and those elements, then the same for lunar elements."""
+
+    import numpy as np
+
+    from . import besselian, lunar
+    from .catalog_arrays import all_arrays
+
+    solar_rows, solar_elements, lunar_rows, lunar_elements = [], [], [], []
+    for row, event in enumerate(all_arrays().events):
+        elements = besselian.elements_for(event)
+        if elements is not None:
+            solar_rows.append(row)
+            solar_elements.append(elements)
+            continue
+        elements = lunar.elements_for(event)
+        if elements is not None:
+            lunar_rows.append(row)
+            lunar_elements.append(elements)
+    return (
+        np.array(solar_rows, dtype=np.int64),
+        tuple(solar_elements),
+        np.array(lunar_rows, dtype=np.int64),
+        tuple(lunar_elements),
+    )
+
+
+@lru_cache(maxsize=None)
+def _raster_slots() -> Tuple["np.ndarray", "np.ndarray"]:
+    """Raster slot of each solar, then lunar, row of `_geometry_rows`; -1 for rows without a raster."""
+
+    import numpy as np
+
+    from .catalog_arrays import all_arrays
+    from .visibility_raster import load_rasters
+
+    rasters = load_rasters()
+    solar_rows, _, lunar_rows, _ = _geometry_rows()
+
+    def slots(rows: "np.ndarray") -> "np.ndarray":
+        if rasters is None:
+            return np.full(rows.size, -1, dtype=np.int64)
+        found = (rasters.slot(all_arrays().events[row]) for row in rows.tolist())
+        return np.array([-1 if slot is None else slot for slot in found], dtype=np.int64)
+
+    return slots(solar_rows), slots(lunar_rows)
+
+
+for _cached in (_visibility_timeline, _geometry_rows, _raster_slots):
+    eclipse_data.register_catalog_cache(_cached.cache_clear)
+
+
 def event_summary(event: EclipseEvent) -> str:
     return f"{event.occurs_on.isoformat()} - {event.subtype} {event.kind.title()} - {event.title}"
+
+
+def event_record(event: EclipseEvent, location: Optional[LocationQuery] = None) -> Dict[str, Any]:
+    """
+    JSON-serialisable summary of `event`. When `location` is given, includes
+    the visibility note of the window that matched it.
+    """
+
+    record: Dict[str, Any] = {
+        "date": event.occurs_on.isoformat(),
+        "kind": event.kind,
+        "subtype": event.subtype,
+        "title": event.title,
+        "peak_description": event.peak_description,
+    }
+    if location is not None:
+        window = matching_window(event, location)
+        note = None
+        if window and window.notes:
+            note = window.notes
+        elif window and window.regions:
+            note = ", ".join(sorted(set(window.regions)))
+        record["visibility_note"] = note
+        local = local_circumstances(event, location)
+        if local is not None:
+            record["local_circumstances"] = local
+    return record
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    text = str(value)
+    return None if text == "NaT" else f"{text}Z"
+
+
+def local_circumstances(event: EclipseEvent, location: LocationQuery) -> Optional[Dict[str, Any]]:
+    """
+    JSON-serialisable local circumstances of `event` at the location's
+    coordinates (contact times in UT, ISO 8601), or None when they cannot be
+    computed. Lunar events report which phases are visible instead of a
+    magnitude and obscuration.
+    """
+
+    if event.kind == "lunar":
+        return _lunar_circumstances(event, location)
+    circumstances = _circumstances(event, location)
+    if circumstances is None:
+        return None
+    return {
+        "visible": bool(circumstances.visible[0]),
+        "central": bool(circumstances.central[0]),
+        "magnitude": round(float(circumstances.magnitude[0]), 3),
+        "obscuration": round(float(circumstances.obscuration[0]), 3),
+        "sun_altitude": round(float(circumstances.sun_altitude[0]), 1),
+        "maximum": _timestamp(circumstances.maximum[0]),
+        "first_contact": _timestamp(circumstances.first_contact[0]),
+        "second_contact": _timestamp(circumstances.second_contact[0]),
+        "third_contact": _timestamp(circumstances.third_contact[0]),
+        "fourth_contact": _timestamp(circumstances.fourth_contact[0]),
+    }
+
+
+def _lunar_circumstances(event: EclipseEvent, location: LocationQuery) -> Optional[Dict[str, Any]]:
+    visibility = _lunar_visibility(event, location)
+    if visibility is None:
+        return None
+    from .lunar import lunar_elements
+
+    elements = lunar_elements()[event.occurs_on]
+    times = elements.timestamps(
+        [
+            elements.maximum,
+            elements.penumbral_start,
+            elements.partial_start,
+            elements.total_start,
+            elements.total_end,
+            elements.partial_end,
+            elements.penumbral_end,
+        ]
+    )
+    return {
+        "visible": bool(visibility.visible[0]),
+        "moon_altitude": round(float(visibility.moon_altitude[0]), 1),
+        "penumbral_visible": bool(visibility.penumbral[0]),
+        "partial_visible": bool(visibility.partial[0]),
+        "total_visible": bool(visibility.total[0]),
+        "maximum": _timestamp(times[0]),
+        "penumbral_start": _timestamp(times[1]),
+        "partial_start": _timestamp(times[2]),
+        "total_start": _timestamp(times[3]),
+        "total_end": _timestamp(times[4]),
+        "partial_end": _timestamp(times[5]),
+        "penumbral_end": _timestamp(times[6]),
+    }
+
+
+def _clock(start: Optional[str], end: Optional[str]) -> str:
+    return f"{start[11:19]}-{end[11:19]} UT" if start and end else "unknown"
+
+
+def _lunar_summary(local: Dict[str, Any]) -> str:
+    if not local["visible"]:
+        return "Moon below the horizon throughout the eclipse here."
+    if local["total_visible"]:
+        phase = "Total phase visible here"
+    elif local["partial_visible"]:
+        phase = "Only the partial phase visible here"
+    else:
+        phase = "Only the penumbral phase visible here"
+    parts = [phase]
+    if local["partial_start"]:
+        parts.append(f"umbral phase {_clock(local['partial_start'], local['partial_end'])}")
+    if local["total_start"]:
+        parts.append(f"total phase {_clock(local['total_start'], local['total_end'])}")
+    if local["moon_altitude"] > 0:
+        parts.append(f"Moon {local['moon_altitude']:.0f}° up at maximum")
+    else:
+        parts.append("Moon below the horizon at maximum")
+    return "; ".join(parts) + "."
+
+
+def local_summary(event: EclipseEvent, location: LocationQuery) -> Optional[str]:
+    """One-line description of `local_circumstances` for display, or None."""
+
+    local = local_circumstances(event, location)
+    if local is None:
+        return None
+    if event.kind == "lunar":
+        return _lunar_summary(local)
+    if not local["visible"]:
+        return "Not visible from these coordinates."
+
+    phase = f"{event.subtype} eclipse" if local["central"] else "Partial eclipse"
+    parts = [
+        f"{phase} here, magnitude {local['magnitude']:.3f} ({local['obscuration']:.0%} of the Sun covered)",
+        f"partial phase {_clock(local['first_contact'], local['fourth_contact'])}",
+    ]
+    if local["central"]:
+        parts.append(f"{event.subtype.lower()} phase {_clock(local['second_contact'], local['third_contact'])}")
+    if local["sun_altitude"] <= 0:
+        parts.append("Sun below the horizon at maximum")
+    return "; ".join(parts) + "."
@@ -0,0 +1,402 @@
+"""
+Ground polygons of solar eclipses and a packed R-tree over them.
+
+Each solar event with Besselian elements gets up to two zones:
+
+- ``central``: the path of totality or annularity, bounded by the northern
+  and southern limits of the umbra (or antumbra) swept across the Earth;
+- ``penumbra``: where any partial phase is visible with the Sun up, traced
+  from the local-circumstances engine on a one-degree grid.
+
+The polygons are generated offline from the bundled elements and stored in
+`solar_paths_1900_2100.json`:
+
+    python -m eclipse_app.eclipse_paths
+
+Rings use the even-odd rule, so holes need no separate orientation. Central
+rings keep their longitudes continuous and may extend past +/-180 degrees.
+Central paths are long and curved, so they are indexed as short runs of
+consecutive limit samples; together with the penumbra rings these pieces go
+into one Sort-Tile-Recursive packed R-tree, and a point query only tests the
+pieces whose bounding boxes contain it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.polynomial import polynomial
+
+from . import besselian, eclipse_data
+from .besselian import BesselianElements
+
+PATHS_JSON = "solar_paths_1900_2100.json"
+ZONES = ("central", "penumbra")
+
+# Time step along the central path, in hours, and penumbra grid cell size in degrees.
+_PATH_STEP_HOURS = 1.0 / 60.0
+_PENUMBRA_RESOLUTION = 1.0
+_NODE_CAPACITY = 8
+# Limit samples per indexed piece of a central path.
+_PIECE_STEPS = 16
+
+Box = Tuple[float, float, float, float]  # west, south, east, north
+
+
+@dataclass(frozen=True, eq=False)
+class EclipsePath:
+    """One zone of one eclipse: closed (lon, lat) rings under the even-odd rule."""
+
+    occurs_on: date
+    zone: str
+    rings: Tuple[np.ndarray, ...]
+
+    @cached_property
+    def bounds(self) -> Box:
+        return _bounds(self.rings)
+
+    def contains(self, latitude, longitude) -> np.ndarray:
+        """Whether each point lies inside the zone (arrays or scalars, degrees)."""
+
+        return _contains(self.rings, self.bounds, latitude, longitude)
+
+    def pieces(self) -> List[Tuple[np.ndarray, ...]]:
+        """
+        The zone split into pieces with tight bounding boxes whose union is the
+        zone: runs of `_PIECE_STEPS` limit samples for a central path (its ring
+        is the northern limit followed by the southern limit reversed), the
+        whole rings for a penumbra.
+        """
+
+        if self.zone != "central":
+            return [self.rings]
+        ring = self.rings[0]
+        half = len(ring) // 2
+        north, south = ring[:half], ring[half:][::-1]
+        return [
+            (np.concatenate((north[start : start + _PIECE_STEPS + 1], south[start : start + _PIECE_STEPS + 1][::-1])),)
+            for start in range(0, half - 1, _PIECE_STEPS)
+        ]
+
+
+def _bounds(rings: Sequence[np.ndarray]) -> Box:
+    points = np.concatenate(rings)
+    west, south = points.min(axis=0)
+    east, north = points.max(axis=0)
+    return float(west), float(south), float(east), float(north)
+
+
+def _contains(rings: Sequence[np.ndarray], bounds: Box, latitude, longitude) -> np.ndarray:
+    latitude = np.atleast_1d(np.asarray(latitude, dtype=np.float64))
+    longitude = np.atleast_1d(np.asarray(longitude, dtype=np.float64))
+    west, _, east, _ = bounds
+    # Central rings may run past the antimeridian; test the equivalent longitude too.
+    inside = np.zeros(latitude.shape, dtype=np.bool_)
+    for shift in (0.0, 360.0, -360.0):
+        shifted = longitude + shift
+        candidates = (shifted >= west) & (shifted <= east)
+        if candidates.any():
+            inside[candidates] |= _even_odd(rings, shifted[candidates], latitude[candidates])
+    return inside
+
+
+def _even_odd(rings: Sequence[np.ndarray], x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    inside = np.zeros(x.shape, dtype=np.bool_)
+    for ring in rings:
+        x1, y1 = ring[:, 0], ring[:, 1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+        # Bound the points-by-edges matrix so large point batches stay small in memory.
+        step = max(1, 1_000_000 // len(ring))
+        for start in range(0, x.size, step):
+            px = x[start : start + step, None]
+            py = y[start : start + step, None]
+            straddles = (y1 > py) != (y2 > py)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                crossing = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            inside[start : start + step] ^= np.count_nonzero(straddles & (px < crossing), axis=1) % 2 == 1
+    return inside
+
+
+# ---------------------------------------------------------------------------
+# Packed R-tree
+# ---------------------------------------------------------------------------
+
+
+def _union(boxes: Sequence[Box]) -> Box:
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+
+
+def _centre(entry: Tuple[Box, object], axis: int) -> float:
+    box = entry[0]
+    return box[axis] + box[axis + 2]
+
+
+def _str_groups(entries: List[Tuple[Box, object]], capacity: int) -> Iterator[List[Tuple[Box, object]]]:
+    """Sort-Tile-Recursive tiling: vertical slices by x, then runs of `capacity` by y."""
+
+    pages = math.ceil(len(entries) / capacity)
+    slice_size = math.ceil(math.sqrt(pages)) * capacity
+    by_x = sorted(entries, key=lambda entry: _centre(entry, 0))
+    for start in range(0, len(by_x), slice_size):
+        column = sorted(by_x[start : start + slice_size], key=lambda entry: _centre(entry, 1))
+        for offset in range(0, len(column), capacity):
+            yield column[offset : offset + capacity]
+
+
+class PackedRTree:
+    """
+    Static R-tree over bounding boxes, bulk-loaded with Sort-Tile-Recursive
+    packing. `query` returns the indices of every box containing a point.
+    """
+
+    def __init__(self, boxes: Sequence[Box], capacity: int = _NODE_CAPACITY) -> None:
+        # Each entry is (box, item index) at the leaves and (box, child entries) above.
+        level: List[Tuple[Box, object]] = [(box, index) for index, box in enumerate(boxes)]
+        self.height = 1
+        while len(level) > capacity:
+            level = [(_union([box for box, _ in group]), group) for group in _str_groups(level, capacity)]
+            self.height += 1
+        self._root = level
+
+    def query(self, x: float, y: float) -> List[int]:
+        found: List[int] = []
+        stack = list(self._root)
+        while stack:
+            (west, south, east, north), child = stack.pop()
+            if not (west <= x <= east and south <= y <= north):
+                continue
+            if isinstance(child, int):
+                found.append(child)
+            else:
+                stack.extend(child)
+        return found
+
+
+@dataclass(frozen=True, eq=False)
+class PathIndex:
+    paths: Tuple[EclipsePath, ...]
+    # (index into `paths`, rings, bounding box) of every indexed piece.
+    pieces: Tuple[Tuple[int, Tuple[np.ndarray, ...], Box], ...]
+    tree: PackedRTree
+
+    def candidates(self, latitude: float, longitude: float) -> List[int]:
+        """Pieces whose bounding box contains the point."""
+
+        indices = set()
+        for shift in (0.0, 360.0, -360.0):
+            indices.update(self.tree.query(longitude + shift, latitude))
+        return sorted(indices)
+
+    def containing(self, latitude: float, longitude: float, zone: Optional[str] = None) -> List[EclipsePath]:
+        """Paths (optionally of one `zone`) containing the point, in date order."""
+
+        found = set()
+        for piece in self.candidates(latitude, longitude):
+            slot, rings, bounds = self.pieces[piece]
+            if slot in found or (zone is not None and self.paths[slot].zone != zone):
+                continue
+            if _contains(rings, bounds, latitude, longitude)[0]:
+                found.add(slot)
+        return [self.paths[slot] for slot in sorted(found)]
+
+
+def build_index(paths: Sequence[EclipsePath]) -> PathIndex:
+    ordered = tuple(sorted(paths, key=lambda path: (path.occurs_on, ZONES.index(path.zone))))
+    pieces = tuple(
+        (slot, rings, _bounds(rings)) for slot, path in enumerate(ordered) for rings in path.pieces()
+    )
+    return PathIndex(ordered, pieces, PackedRTree([bounds for _, _, bounds in pieces]))
+
+
+# ---------------------------------------------------------------------------
+# Generation from Besselian elements
+# ---------------------------------------------------------------------------
+
+
+def central_path(elements: BesselianElements) -> Optional[EclipsePath]:
+    """
+    Path of the umbra or antumbra, from its northern and southern limits at
+    each time step; None for partial eclipses. The limits lie one shadow
+    radius either side of the axis, across the shadow's motion relative to
+    the ground.
+    """
+
+    t = np.arange(-besselian._FIT_HOURS, besselian._FIT_HOURS + 1e-9, _PATH_STEP_HOURS)
+    x, y = polynomial.polyval(t, elements.x), polynomial.polyval(t, elements.y)
+    latitude, longitude = besselian.surface_point(elements, t, x, y)
+    hits = np.flatnonzero(np.isfinite(latitude))
+    if hits.size < 2:
+        return None
+    t, x, y = t[hits], x[hits], y[hits]
+    shadow = besselian._shadow(elements, besselian._observers(latitude[hits], longitude[hits]), t)
+    speed = np.hypot(shadow.a, shadow.b)
+    radius = np.abs(shadow.l2)
+    across_x, across_y = -shadow.b / speed * radius, shadow.a / speed * radius
+
+    limits = [besselian.surface_point(elements, t, x + sign * across_x, y + sign * across_y) for sign in (1, -1)]
+    both = np.isfinite(limits[0][0]) & np.isfinite(limits[1][0])
+    if np.count_nonzero(both) < 2:
+        return None
+    (lat1, lon1), (lat2, lon2) = ((lat[both], lon[both]) for lat, lon in limits)
+    ring = np.column_stack(
+        (np.concatenate((lon1, lon2[::-1])), np.concatenate((lat1, lat2[::-1])))
+    )
+    # Keep longitudes continuous along the ring so it can cross the antimeridian.
+    ring[:, 0] = np.degrees(np.unwrap(np.radians(ring[:, 0])))
+    return EclipsePath(elements.occurs_on, "central", (ring,))
+
+
+def _trace_rings(mask: np.ndarray) -> List[List[Tuple[int, int]]]:
+    """
+    Boundary rings of the cells set in `mask`, as (column, row) grid vertices.
+    Every cell side facing an unset cell becomes a directed edge (clockwise
+    around the cell on screen), so shared sides cancel and the remaining edges
+    chain into closed rings.
+    """
+
+    padded = np.pad(mask, 1)
+    inner = padded[1:-1, 1:-1]
+    rows, columns = np.nonzero(inner)
+    outgoing: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    sides = (
+        (~padded[:-2, 1:-1], (0, 0), (0, 1)),  # top
+        (~padded[1:-1, 2:], (0, 1), (1, 1)),  # right
+        (~padded[2:, 1:-1], (1, 1), (1, 0)),  # bottom
+        (~padded[1:-1, :-2], (1, 0), (0, 0)),  # left
+    )
+    for open_side, start, end in sides:
+        selected = open_side[rows, columns]
+        for row, column in zip(rows[selected].tolist(), columns[selected].tolist()):
+            outgoing.setdefault((column + start[1], row + start[0]), []).append(
+                (column + end[1], row + end[0])
+            )
+
+    rings: List[List[Tuple[int, int]]] = []
+    while outgoing:
+        first = next(iter(outgoing))
+        ring = [first]
+        vertex = first
+        while True:
+            targets = outgoing[vertex]
+            following = targets.pop()
+            if not targets:
+                del outgoing[vertex]
+            if following == first:
+                break
+            ring.append(following)
+            vertex = following
+        # Drop vertices in the middle of straight runs.
+        corners = [
+            point
+            for index, point in enumerate(ring)
+            if (point[0] - ring[index - 1][0]) * (ring[(index + 1) % len(ring)][1] - point[1])
+            != (point[1] - ring[index - 1][1]) * (ring[(index + 1) % len(ring)][0] - point[0])
+        ]
+        rings.append(corners)
+    return rings
+
+
+def penumbra_zone(elements: BesselianElements, resolution: float = _PENUMBRA_RESOLUTION) -> Optional[EclipsePath]:
+    """Where the partial phase is visible, traced from cell centres of a global grid."""
+
+    rows, columns = round(180.0 / resolution), round(360.0 / resolution)
+    latitude = 90.0 - (np.arange(rows) + 0.5) * resolution
+    longitude = -180.0 + (np.arange(columns) + 0.5) * resolution
+    grid_latitude, grid_longitude = np.meshgrid(latitude, longitude, indexing="ij")
+    circumstances = besselian.local_circumstances(elements, grid_latitude.ravel(), grid_longitude.ravel())
+    mask = circumstances.visible.reshape(rows, columns)
+    if not mask.any():
+        return None
+    rings = tuple(
+        np.array([(-180.0 + column * resolution, 90.0 - row * resolution) for column, row in ring])
+        for ring in _trace_rings(mask)
+    )
+    return EclipsePath(elements.occurs_on, "penumbra", rings)
+
+
+def build_paths(elements: Sequence[BesselianElements]) -> List[EclipsePath]:
+    paths: List[EclipsePath] = []
+    for item in elements:
+        for path in (central_path(item), penumbra_zone(item)):
+            if path is not None:
+                paths.append(path)
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Bundled paths
+# ---------------------------------------------------------------------------
+
+
+def _path_record(path: EclipsePath) -> Dict[str, object]:
+    return {
+        "date": path.occurs_on.isoformat(),
+        "zone": path.zone,
+        "rings": [[[round(float(lon), 3), round(float(lat), 3)] for lon, lat in ring] for ring in path.rings],
+    }
+
+
+def _parse_record(record: Dict[str, object]) -> EclipsePath:
+    return EclipsePath(
+        occurs_on=date.fromisoformat(str(record["date"])),
+        zone=str(record["zone"]),
+        rings=tuple(np.array(ring, dtype=np.float64) for ring in record["rings"]),  # type: ignore[union-attr]
+    )
+
+
+@lru_cache(maxsize=None)
+def path_index() -> PathIndex:
+    """Index over the bundled paths; empty when the data directory has none."""
+
+    path = eclipse_data._data_dir() / PATHS_JSON
+    if not path.exists():
+        return build_index(())
+    with path.open(encoding="utf-8") as handle:
+        return build_index([_parse_record(record) for record in json.load(handle)["paths"]])
+
+
+eclipse_data.register_catalog_cache(path_index.cache_clear)
+
+
+def central_paths_containing(latitude: float, longitude: float) -> List[EclipsePath]:
+    """Central paths (totality or annularity) that cover the point, in date order."""
+
+    return path_index().containing(latitude, longitude, "central")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate central-path and penumbra polygons from the bundled Besselian elements."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=eclipse_data._data_dir() / PATHS_JSON,
+        help=f"JSON file to write (default: {PATHS_JSON} in the data directory).",
+    )
+    args = parser.parse_args()
+
+    elements = sorted(besselian.solar_elements().values(), key=lambda item: item.occurs_on)
+    paths = build_paths(elements)
+    with args.output.open("w", encoding="utf-8") as handle:
+        json.dump({"paths": [_path_record(path) for path in paths]}, handle, separators=(",", ":"))
+        handle.write("\n")
+    print(f"Wrote {len(paths)} path polygon(s) for {len(elements)} eclipse(s) to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Low-precision geocentric positions of the Sun and Moon.
+
+The series are the truncated ones from Meeus, *Astronomical Algorithms*
+(2nd ed.): chapter 25 for the Sun, chapter 47 (ELP-2000/82) for the Moon,
+chapter 22 for nutation and chapter 12 for sidereal time. Positions are good to
+about 10 arcseconds over 1900-2100, enough to derive eclipse elements for the
+bundled catalog. Every function accepts scalars or NumPy arrays of Julian
+(Ephemeris) Days.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6378.137
+AU_KM = 149597870.7
+J2000 = 2451545.0
+
+# Table 47.A: multiples of D, M, M', F and the sine (longitude, 1e-6 degree)
+# and cosine (distance, 1e-3 km) coefficients.
+_MOON_LR = np.array(
+    [
+        (0, 0, 1, 0, 6288774, -20905355),
+        (2, 0, -1, 0, 1274027, -3699111),
+        (2, 0, 0, 0, 658314, -2955968),
+        (0, 0, 2, 0, 213618, -569925),
+        (0, 1, 0, 0, -185116, 48888),
+        (0, 0, 0, 2, -114332, -3149),
+        (2, 0, -2, 0, 58793, 246158),
+        (2, -1, -1, 0, 57066, -152138),
+        (2, 0, 1, 0, 53322, -170733),
+        (2, -1, 0, 0, 45758, -204586),
+        (0, 1, -1, 0, -40923, -129620),
+        (1, 0, 0, 0, -34720, 108743),
+        (0, 1, 1, 0, -30383, 104755),
+        (2, 0, 0, -2, 15327, 10321),
+        (0, 0, 1, 2, -12528, 0),
+        (0, 0, 1, -2, 10980, 79661),
+        (4, 0, -1, 0, 10675, -34782),
+        (0, 0, 3, 0, 10034, -23210),
+        (4, 0, -2, 0, 8548, -21636),
+        (2, 1, -1, 0, -7888, 24208),
+        (2, 1, 0, 0, -6766, 30824),
+        (1, 0, -1, 0, -5163, -8379),
+        (1, 1, 0, 0, 4987, -16675),
+        (2, -1, 1, 0, 4036, -12831),
+        (2, 0, 2, 0, 3994, -10445),
+        (4, 0, 0, 0, 3861, -11650),
+        (2, 0, -3, 0, 3665, 14403),
+        (0, 1, -2, 0, -2689, -7003),
+        (2, 0, -1, 2, -2602, 0),
+        (2, -1, -2, 0, 2390, 10056),
+        (1, 0, 1, 0, -2348, 6322),
+        (2, -2, 0, 0, 2236, -9884),
+        (0, 1, 2, 0, -2120, 5751),
+        (0, 2, 0, 0, -2069, 0),
+        (2, -2, -1, 0, 2048, -4950),
+        (2, 0, 1, -2, -1773, 4130),
+        (2, 0, 0, 2, -1595, 0),
+        (4, -1, -1, 0, 1215, -3958),
+        (0, 0, 2, 2, -1110, 0),
+        (3, 0, -1, 0, -892, 3258),
+        (2, 1, 1, 0, -810, 2616),
+        (4, -1, -2, 0, 759, -1897),
+        (0, 2, -1, 0, -713, -2117),
+        (2, 2, -1, 0, -700, 2354),
+        (2, 1, -2, 0, 691, 0),
+        (2, -1, 0, -2, 596, 0),
+        (4, 0, 1, 0, 549, -1423),
+        (0, 0, 4, 0, 537, -1117),
+        (4, -1, 0, 0, 520, -1571),
+        (1, 0, -2, 0, -487, -1739),
+        (2, 1, 0, -2, -399, 0),
+        (0, 0, 2, -2, -381, -4421),
+        (1, 1, 1, 0, 351, 0),
+        (3, 0, -2, 0, -340, 0),
+        (4, 0, -3, 0, 330, 0),
+        (2, -1, 2, 0, 327, 0),
+        (0, 2, 1, 0, -323, 1165),
+        (1, 1, -1, 0, 299, 0),
+        (2, 0, 3, 0, 294, 0),
+        (2, 0, -1, -2, 0, 8752),
+    ],
+    dtype=np.float64,
+)
+
+# Table 47.B: multiples of D, M, M', F and the latitude coefficient (1e-6 degree).
+_MOON_B = np.array(
+    [
+        (0, 0, 0, 1, 5128122),
+        (0, 0, 1, 1, 280602),
+        (0, 0, 1, -1, 277693),
+        (2, 0, 0, -1, 173237),
+        (2, 0, -1, 1, 55413),
+        (2, 0, -1, -1, 46271),
+        (2, 0, 0, 1, 32573),
+        (0, 0, 2, 1, 17198),
+        (2, 0, 1, -1, 9266),
+        (0, 0, 2, -1, 8822),
+        (2, -1, 0, -1, 8216),
+        (2, 0, -2, -1, 4324),
+        (2, 0, 1, 1, 4200),
+        (2, 1, 0, -1, -3359),
+        (2, -1, -1, 1, 2463),
+        (2, -1, 0, 1, 2211),
+        (2, -1, -1, -1, 2065),
+        (0, 1, -1, -1, -1870),
+        (4, 0, -1, -1, 1828),
+        (0, 1, 0, 1, -1794),
+        (0, 0, 0, 3, -1749),
+        (0, 1, -1, 1, -1565),
+        (1, 0, 0, 1, -1491),
+        (0, 1, 1, 1, -1475),
+        (0, 1, 1, -1, -1410),
+        (0, 1, 0, -1, -1344),
+        (1, 0, 0, -1, -1335),
+        (0, 0, 3, 1, 1107),
+        (4, 0, 0, -1, 1021),
+        (4, 0, -1, 1, 833),
+        (0, 0, 1, -3, 777),
+        (4, 0, -2, 1, 671),
+        (2, 0, 0, -3, 607),
+        (2, 0, 2, -1, 596),
+        (2, -1, 1, -1, 491),
+        (2, 0, -2, 1, -451),
+        (0, 0, 3, -1, 439),
+        (2, 0, 2, 1, 422),
+        (2, 0, -3, -1, 421),
+        (2, 1, -1, 1, -366),
+        (2, 1, 0, 1, -351),
+        (4, 0, 0, 1, 331),
+        (2, -1, 1, 1, 315),
+        (2, -2, 0, -1, 302),
+        (0, 0, 1, 3, -283),
+        (2, 1, 1, -1, -229),
+        (1, 1, 0, -1, 223),
+        (1, 1, 0, 1, 223),
+        (0, 1, -2, -1, -220),
+        (2, 1, -1, -1, -220),
+        (1, 0, 1, 1, -185),
+        (2, -1, -2, -1, 181),
+        (0, 1, 2, 1, -177),
+        (4, 0, -2, -1, 176),
+        (4, -1, -1, -1, 166),
+        (1, 0, 1, -1, -164),
+        (4, 0, 1, -1, 132),
+        (1, 0, -1, -1, -119),
+        (4, -1, 0, -1, 115),
+        (2, -2, 0, 1, 107),
+    ],
+    dtype=np.float64,
+)
+
+
+def julian_day(moment: datetime) -> float:
+    """Julian Day of a naive datetime on the proleptic Gregorian calendar."""
+
+    midnight = datetime(moment.year, moment.month, moment.day)
+    fraction = (moment - midnight) / timedelta(days=1)
+    return moment.toordinal() + 1721424.5 + fraction
+
+
+def julian_day_of(day: date) -> float:
+    """Julian Day at 0h on `day`."""
+
+    return day.toordinal() + 1721424.5
+
+
+def delta_t(year: float) -> float:
+    """
+    TT - UT in seconds for a decimal year, from the Espenak & Meeus
+    polynomials. Outside 1900-2150 the long-term parabola is used.
+    """
+
+    if 1900 <= year < 1920:
+        t = year - 1900
+        return -2.79 + 1.494119 * t - 0.0598939 * t**2 + 0.0061966 * t**3 - 0.000197 * t**4
+    if 1920 <= year < 1941:
+        t = year - 1920
+        return 21.20 + 0.84493 * t - 0.076100 * t**2 + 0.0020936 * t**3
+    if 1941 <= year < 1961:
+        t = year - 1950
+        return 29.07 + 0.407 * t - t**2 / 233 + t**3 / 2547
+    if 1961 <= year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t**2 / 260 - t**3 / 718
+    if 1986 <= year < 2005:
+        t = year - 2000
+        return (
+            63.86
+            + 0.3345 * t
+            - 0.060374 * t**2
+            + 0.0017275 * t**3
+            + 0.000651814 * t**4
+            + 0.00002373599 * t**5
+        )
+    if 2005 <= year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t**2
+    if 2050 <= year < 2150:
+        return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+    return -20 + 32 * ((year - 1820) / 100) ** 2
+
+
+def _centuries(jde):
+    return (np.asarray(jde, dtype=np.float64) - J2000) / 36525.0
+
+
+def _nutation(t) -> Tuple[np.ndarray, np.ndarray]:
+    """Nutation in longitude and obliquity (radians), to about 0.5 arcsecond."""
+
+    omega = np.radians(125.04452 - 1934.136261 * t)
+    sun = np.radians(280.4665 + 36000.7698 * t)
+    moon = np.radians(218.3165 + 481267.8813 * t)
+    arcsec = np.pi / 648000.0
+    dpsi = (
+        -17.20 * np.sin(omega)
+        - 1.32 * np.sin(2 * sun)
+        - 0.23 * np.sin(2 * moon)
+        + 0.21 * np.sin(2 * omega)
+    )
+    deps = 9.20 * np.cos(omega) + 0.57 * np.cos(2 * sun) + 0.10 * np.cos(2 * moon) - 0.09 * np.cos(2 * omega)
+    return dpsi * arcsec, deps * arcsec
+
+
+def _mean_obliquity(t) -> np.ndarray:
+    seconds = 21.448 - 46.8150 * t - 0.00059 * t**2 + 0.001813 * t**3
+    return np.radians(23.0 + 26.0 / 60.0 + seconds / 3600.0)
+
+
+def _equatorial(longitude, latitude, obliquity) -> Tuple[np.ndarray, np.ndarray]:
+    ra = np.arctan2(
+        np.sin(longitude) * np.cos(obliquity) - np.tan(latitude) * np.sin(obliquity),
+        np.cos(longitude),
+    )
+    dec = np.arcsin(
+        np.sin(latitude) * np.cos(obliquity)
+        + np.cos(latitude) * np.sin(obliquity) * np.sin(longitude)
+    )
+    return np.mod(ra, 2 * np.pi), dec
+
+
+def sun_position(jde) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Apparent geocentric right ascension, declination (radians) and distance (km)."""
+
+    t = _centuries(jde)
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t**2
+    anomaly = np.radians(357.52911 + 35999.05029 * t - 0.0001537 * t**2)
+    eccentricity = 0.016708634 - 0.000042037 * t - 0.0000001267 * t**2
+    centre = (
+        (1.914602 - 0.004817 * t - 0.000014 * t**2) * np.sin(anomaly)
+        + (0.019993 - 0.000101 * t) * np.sin(2 * anomaly)
+        + 0.000289 * np.sin(3 * anomaly)
+    )
+    true_anomaly = anomaly + np.radians(centre)
+    radius = 1.000001018 * (1 - eccentricity**2) / (1 + eccentricity * np.cos(true_anomaly))
+
+    dpsi, deps = _nutation(t)
+    aberration = np.radians(-20.4898 / 3600.0) / radius
+    longitude = np.radians(mean_longitude + centre) + dpsi + aberration
+    ra, dec = _equatorial(longitude, np.zeros_like(longitude), _mean_obliquity(t) + deps)
+    return ra, dec, radius * AU_KM
+
+
+def moon_position(jde) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Apparent geocentric right ascension, declination (radians) and distance (km)."""
+
+    t = _centuries(jde)
+    mean_longitude = 218.3164477 + 481267.88123421 * t - 0.0015786 * t**2 + t**3 / 538841.0
+    elongation = 297.8501921 + 445267.1114034 * t - 0.0018819 * t**2 + t**3 / 545868.0
+    sun_anomaly = 357.5291092 + 35999.0502909 * t - 0.0001536 * t**2
+    moon_anomaly = 134.9633964 + 477198.8675055 * t + 0.0087414 * t**2 + t**3 / 69699.0
+    argument = 93.2720950 + 483202.0175233 * t - 0.0036539 * t**2 - t**3 / 3526000.0
+    a1 = np.radians(119.75 + 131.849 * t)
+    a2 = np.radians(53.09 + 479264.290 * t)
+    a3 = np.radians(313.45 + 481266.484 * t)
+    eccentricity = 1 - 0.002516 * t - 0.0000074 * t**2
+
+    fundamental = np.radians(
+        np.stack(np.broadcast_arrays(elongation, sun_anomaly, moon_anomaly, argument), axis=-1)
+    )
+    mean_longitude = np.radians(mean_longitude)
+    moon_anomaly = fundamental[..., 2]
+    argument = fundamental[..., 3]
+    # Terms in the Sun's anomaly shrink with the Earth's orbital eccentricity.
+    eccentricity = np.asarray(eccentricity)[..., None]
+
+    angles = fundamental @ _MOON_LR[:, :4].T
+    scale = eccentricity ** np.abs(_MOON_LR[:, 1])
+    sigma_l = (scale * _MOON_LR[:, 4] * np.sin(angles)).sum(axis=-1)
+    sigma_r = (scale * _MOON_LR[:, 5] * np.cos(angles)).sum(axis=-1)
+    angles = fundamental @ _MOON_B[:, :4].T
+    scale = eccentricity ** np.abs(_MOON_B[:, 1])
+    sigma_b = (scale * _MOON_B[:, 4] * np.sin(angles)).sum(axis=-1)
+
+    sigma_l = sigma_l + 3958 * np.sin(a1) + 1962 * np.sin(mean_longitude - argument) + 318 * np.sin(a2)
+    sigma_b = (
+        sigma_b
+        - 2235 * np.sin(mean_longitude)
+        + 382 * np.sin(a3)
+        + 175 * np.sin(a1 - argument)
+        + 175 * np.sin(a1 + argument)
+        + 127 * np.sin(mean_longitude - moon_anomaly)
+        - 115 * np.sin(mean_longitude + moon_anomaly)
+    )
+
+    dpsi, deps = _nutation(t)
+    longitude = mean_longitude + np.radians(sigma_l / 1e6) + dpsi
+    latitude = np.radians(sigma_b / 1e6)
+    distance = 385000.56 + sigma_r / 1000.0
+    ra, dec = _equatorial(longitude, latitude, _mean_obliquity(t) + deps)
+    return ra, dec, distance
+
+
+def greenwich_sidereal_time(jd_ut) -> np.ndarray:
+    """Apparent sidereal time at Greenwich in radians for Julian Days in UT."""
+
+    jd_ut = np.asarray(jd_ut, dtype=np.float64)
+    t = (jd_ut - J2000) / 36525.0
+    mean = 280.46061837 + 360.98564736629 * (jd_ut - J2000) + 0.000387933 * t**2 - t**3 / 38710000.0
+    dpsi, deps = _nutation(t)
+    equation = dpsi * np.cos(_mean_obliquity(t) + deps)
+    return np.mod(np.radians(mean) + equation, 2 * np.pi)
@@ -0,0 +1,229 @@
+"""
+Approximate name lookup for misspelled location input.
+
+`DeletionIndex` is a symmetric deletion index: two strings within k edits of
+each other become equal after deleting at most k characters from each (a
+substitution or a swap of two letters costs one deletion on both sides), so
+every name is indexed under itself and the strings left after deleting up to
+two of its characters. A query generates its own deletions, looks them up and
+checks the few names found with a bounded edit distance (Damerau's optimal
+string alignment, so "Texsa" is one edit from "Texas"). The variants are
+stored as 64-bit hashes in one sorted NumPy array, so the lookups are a single
+`searchsorted`.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import combinations
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Base of the polynomial hash of deletion variants, whose arithmetic wraps at
+# 64 bits. Collisions only add candidates, which the edit distance rejects.
+_HASH_BASE = 1_000_003
+
+# Most edits `allowed_distance` tolerates.
+_MAX_DISTANCE = 2
+
+
+def _variant_hashes(names: Sequence[str], depth: int) -> "np.ndarray":
+    """
+    Hashes of `names` (which all have the same length) and of every string
+    left after deleting up to `depth` of their characters, one row per name.
+    """
+
+    import numpy as np
+
+    size = len(names[0])
+    codes = np.array([[ord(char) + 1 for char in name] for name in names], dtype=np.uint64)
+    base = np.uint64(_HASH_BASE)
+    powers = np.ones(size + 1, dtype=np.uint64)
+    prefix = np.zeros((len(names), size + 1), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for position in range(size):
+            powers[position + 1] = powers[position] * base
+            prefix[:, position + 1] = prefix[:, position] * base + codes[:, position]
+    return _deletion_hashes(prefix, powers, depth)
+
+
+def _query_hashes(query: str, depth: int) -> "np.ndarray":
+    """The hashes `_variant_hashes` gives `query`, as a flat array."""
+
+    import numpy as np
+
+    # Plain arithmetic for the prefix hashes: NumPy's per-call overhead
+    # dominates a single name.
+    mask = (1 << 64) - 1
+    powers, prefix = [1], [0]
+    for char in query:
+        powers.append(powers[-1] * _HASH_BASE & mask)
+        prefix.append((prefix[-1] * _HASH_BASE + ord(char) + 1) & mask)
+    return _deletion_hashes(np.array([prefix], dtype=np.uint64), np.array(powers, dtype=np.uint64), depth).ravel()
+
+
+def _deletion_hashes(prefix: "np.ndarray", powers: "np.ndarray", depth: int) -> "np.ndarray":
+    """
+    Variant hashes from the prefix hashes of each name (one row per name) and
+    the powers of the base. Deleting characters joins the hashes of the
+    segments between them, so no variant is built as a string.
+    """
+
+    import numpy as np
+
+    size = prefix.shape[1] - 1
+
+    def segment(start: "np.ndarray", end: "np.ndarray") -> "np.ndarray":
+        # Hash of characters start to end - 1 of every name.
+        return prefix[:, end] - prefix[:, start] * powers[end - start]
+
+    columns = [prefix[:, size:]]
+    with np.errstate(over="ignore"):
+        if depth >= 1:
+            first = np.arange(size)
+            columns.append(prefix[:, first] * powers[size - first - 1] + segment(first + 1, np.full_like(first, size)))
+        if depth >= 2 and size >= 2:
+            first, second = _position_pairs(size)
+            head = prefix[:, first] * powers[second - first - 1] + segment(first + 1, second)
+            columns.append(head * powers[size - second - 1] + segment(second + 1, np.full_like(second, size)))
+    return np.concatenate(columns, axis=1)
+
+
+@lru_cache(maxsize=None)
+def _position_pairs(size: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+
+    first, second = zip(*combinations(range(size), 2))
+    return np.array(first), np.array(second)
+
+
+def edit_distance(left: str, right: str, limit: int) -> int:
+    """
+    Optimal string alignment distance between `left` and `right`, or
+    `limit + 1` once it is known to exceed `limit`.
+    """
+
+    # Typos leave most of a name intact: compare only the part that differs.
+    start, end = 0, min(len(left), len(right))
+    while start < end and left[start] == right[start]:
+        start += 1
+    end_left, end_right = len(left), len(right)
+    while end_left > start and end_right > start and left[end_left - 1] == right[end_right - 1]:
+        end_left -= 1
+        end_right -= 1
+    left, right = left[start:end_left], right[start:end_right]
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    if len(left) <= 1 and len(right) <= 1:
+        return max(len(left), len(right))
+    beyond = limit + 1
+    if limit == 1:
+        # One edit that is not a substitution or indel must be a transposition.
+        swapped = len(left) == len(right) == 2 and left[0] == right[1] and left[1] == right[0]
+        return 1 if swapped else beyond
+
+    # Only cells within `limit` of the diagonal can stay within `limit`.
+    before: List[int] = []
+    previous = [j if j < beyond else beyond for j in range(len(right) + 1)]
+    for i in range(1, len(left) + 1):
+        row = [beyond] * (len(right) + 1)
+        row[0] = i if i < beyond else beyond
+        left_char = left[i - 1]
+        best = row[0]
+        for j in range(max(1, i - limit), min(len(right), i + limit) + 1):
+            right_char = right[j - 1]
+            value = previous[j - 1] + (left_char != right_char)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if row[j - 1] + 1 < value:
+                value = row[j - 1] + 1
+            swapped = i > 1 and j > 1 and left_char == right[j - 2] and left[i - 2] == right_char
+            if swapped and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            row[j] = value if value < beyond else beyond
+            if value < best:
+                best = value
+        if best > limit:
+            return beyond
+        before, previous = previous, row
+    return previous[-1]
+
+
+class DeletionIndex:
+    """
+    Deletion index over a fixed list of names (already normalised), deep
+    enough for queries within `allowed_distance` of their own length.
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        import numpy as np
+
+        self.names: List[str] = list(names)
+        buckets: Dict[int, List[int]] = {}
+        for number, name in enumerate(self.names):
+            buckets.setdefault(len(name), []).append(number)
+        keys, numbers = [], []
+        for size, members in buckets.items():
+            # A name is within k edits only of queries at most k characters
+            # longer, which may tolerate more edits than its own length.
+            depth = max(_length_distance(size + extra) for extra in range(_MAX_DISTANCE + 1))
+            hashes = _variant_hashes([self.names[number] for number in members], depth)
+            keys.append(hashes.ravel())
+            numbers.append(np.repeat(np.array(members, dtype=np.uint32), hashes.shape[1]))
+        keys_array = np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint64)
+        numbers_array = np.concatenate(numbers) if numbers else np.zeros(0, dtype=np.uint32)
+        order = np.argsort(keys_array, kind="stable")
+        self._keys = keys_array[order]
+        self._numbers = numbers_array[order]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Every name within `max_distance` edits of `query` (at most
+        `allowed_distance(query)`) as (name number, distance) pairs, closest
+        first.
+        """
+
+        hashes = _query_hashes(query, max_distance)
+        starts, ends = self._keys.searchsorted(hashes, "left"), self._keys.searchsorted(hashes, "right")
+        found_any = starts < ends
+        candidates: Set[int] = set()
+        for start, end in zip(starts[found_any].tolist(), ends[found_any].tolist()):
+            candidates.update(self._numbers[start:end].tolist())
+
+        found = []
+        for number in candidates:
+            name = self.names[number]
+            if abs(len(name) - len(query)) > max_distance:
+                continue
+            distance = edit_distance(query, name, max_distance)
+            if distance <= max_distance:
+                found.append((distance, number))
+        found.sort()
+        return [(number, distance) for distance, number in found]
+
+
+
+def _length_distance(size: int) -> int:
+    if size < 4:
+        return 0
+    return 1 if size < 8 else _MAX_DISTANCE
+
+
+def allowed_distance(query: str) -> int:
+    """Edits tolerated for a query of this length: none below four characters."""
+
+    return _length_distance(len(query))
+
+
+def best_matches(index: DeletionIndex, query: str) -> Sequence[Tuple[str, int]]:
+    """Every name in `index` within `allowed_distance` of `query`, closest first, as (name, distance)."""
+
+    max_distance = allowed_distance(query)
+    if not max_distance:
+        return []
+    return [(index.names[number], distance) for number, distance in index.search(query, max_distance)]
@@ -0,0 +1,344 @@
+"""
+Offline gazetteer of cities, used to give parsed locations coordinates for the
+eclipse geometry.
+
+`cities_15000.csv` lists the GeoNames cities with at least 15,000 inhabitants
+(GeoNames, CC BY 4.0, https://www.geonames.org): name, country, first-level
+administrative code, coordinates, population and, for cities of a million or
+more, their common alternate names. `app.py compile-catalog` compiles it into
+`gazetteer.bin`: normalised search keys sorted for bisection, plus fixed-width
+place records. The file is memory-mapped, so worker processes share one copy
+instead of each holding a dict of every name. Without the compiled file the
+CSV is packed into the same layout in memory.
+
+Regenerate the CSV from a GeoNames dump (for example `cities15000.txt`) with
+
+    python -m eclipse_app.gazetteer cities15000.txt --countries countryInfo.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import eclipse_data
+from .catalog_artifact import CatalogArtifactError, map_artifact, write_artifact
+
+GAZETTEER_CSV = "cities_15000.csv"
+GAZETTEER_FILENAME = "gazetteer.bin"
+
+# Alternate names are kept only for large cities, where exonyms such as
+# "New York" or "Bombay" are what people type.
+_ALTERNATE_MIN_POPULATION = 1_000_000
+
+# latitude, longitude, population, country index, admin1 code, name offset, name length
+_PLACE = struct.Struct("<ffIH8sII")
+# Set on key entries that come from an alternate name rather than the place's own.
+_ALTERNATE_FLAG = 0x80000000
+
+
+class Place(NamedTuple):
+    name: str
+    country: str
+    admin1: str  # GeoNames first-level code, e.g. "TX" or "08"
+    latitude: float
+    longitude: float
+    population: int
+
+
+def normalize_name(value: str) -> str:
+    """Search key for a place name: accents removed, case-folded, punctuation as spaces."""
+
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(character for character in decomposed if not unicodedata.combining(character))
+    return re.sub(r"[\W_]+", " ", stripped.casefold()).strip()
+
+
+class _Keys:
+    """Sorted keys of the index as a sequence of bytes, for `bisect`."""
+
+    def __init__(self, data: memoryview, offsets: memoryview) -> None:
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return bytes(self._data[self._offsets[index] : self._offsets[index + 1]])
+
+
+class Gazetteer:
+    """Read-only view of packed gazetteer sections."""
+
+    def __init__(self, sections: Dict[str, memoryview]) -> None:
+        self._places = sections["places"]
+        self._names = sections["names"]
+        self._countries = bytes(sections["countries"]).decode("utf-8").split("\n")
+        self._keys = _Keys(sections["keys"], sections["key_offsets"].cast("I"))
+        self._key_places = sections["key_places"].cast("I")
+
+    def __len__(self) -> int:
+        return len(self._places) // _PLACE.size
+
+    def place(self, index: int) -> Place:
+        latitude, longitude, population, country, admin1, offset, length = _PLACE.unpack_from(
+            self._places, index * _PLACE.size
+        )
+        return Place(
+            name=bytes(self._names[offset : offset + length]).decode("utf-8"),
+            country=self._countries[country],
+            admin1=admin1.rstrip(b"\0").decode("ascii"),
+            latitude=round(latitude, 4),
+            longitude=round(longitude, 4),
+            population=population,
+        )
+
+    def names(self) -> Iterator[str]:
+        """Every distinct search key (normalised name or alternate name), in sorted order."""
+
+        previous = None
+        for position in range(len(self._keys)):
+            key = self._keys[position]
+            if key != previous:
+                yield key.decode("utf-8")
+                previous = key
+
+    def keyed_places(self) -> Iterator[Tuple[str, int, bool]]:
+        """(search key, place number, is an alternate name) for every key, in key order."""
+
+        for position in range(len(self._keys)):
+            entry = self._key_places[position]
+            yield self._keys[position].decode("utf-8"), entry & ~_ALTERNATE_FLAG, bool(entry & _ALTERNATE_FLAG)
+
+    def candidates(self, name: str) -> List[Place]:
+        """
+        Every place called `name`: places with it as their own name first, then
+        those with it as an alternate name, each most populous first.
+        """
+
+        key = normalize_name(name).encode("utf-8")
+        if not key:
+            return []
+        found: Dict[int, bool] = {}
+        position = bisect_left(self._keys, key, 0, len(self._keys))
+        while position < len(self._keys) and self._keys[position] == key:
+            entry = self._key_places[position]
+            index = entry & ~_ALTERNATE_FLAG
+            found[index] = found.get(index, True) and bool(entry & _ALTERNATE_FLAG)
+            position += 1
+        ranked = [(alternate, self.place(index)) for index, alternate in found.items()]
+        ranked.sort(key=lambda item: (item[0], -item[1].population))
+        return [place for _, place in ranked]
+
+    def lookup(self, name: str, country: Optional[str] = None, admin1: Optional[str] = None) -> Optional[Place]:
+        """
+        Best match for `name` in the order of `candidates`, restricted to
+        `country` (a GeoNames country name) and `admin1` when given.
+        """
+
+        for place in self.candidates(name):
+            if country and place.country != country:
+                continue
+            if admin1 and place.admin1 != admin1:
+                continue
+            return place
+        return None
+
+
+def _pack_gazetteer(places: Sequence[Place], alternates: Sequence[Sequence[str]]) -> Dict[str, bytes]:
+    countries = sorted({place.country for place in places})
+    country_index = {name: index for index, name in enumerate(countries)}
+    records = bytearray()
+    names = bytearray()
+    entries = set()
+    for index, place in enumerate(places):
+        encoded = place.name.encode("utf-8")
+        records += _PLACE.pack(
+            place.latitude,
+            place.longitude,
+            place.population,
+            country_index[place.country],
+            place.admin1.encode("ascii"),
+            len(names),
+            len(encoded),
+        )
+        names += encoded
+        keyed = [(place.name, 0)] + [(alternate, _ALTERNATE_FLAG) for alternate in alternates[index]]
+        for value, flag in keyed:
+            key = normalize_name(value)
+            if key:
+                entries.add((key.encode("utf-8"), index | flag))
+
+    keys = bytearray()
+    offsets = array("I", [0])
+    key_places = array("I")
+    for key, index in sorted(entries):
+        keys += key
+        offsets.append(len(keys))
+        key_places.append(index)
+    return {
+        "places": bytes(records),
+        "names": bytes(names),
+        "countries": "\n".join(countries).encode("utf-8"),
+        "keys": bytes(keys),
+        "key_offsets": offsets.tobytes(),
+        "key_places": key_places.tobytes(),
+    }
+
+
+def _csv_path() -> Path:
+    return eclipse_data._data_dir() / GAZETTEER_CSV
+
+
+def _artifact_path() -> Path:
+    return eclipse_data._data_dir() / GAZETTEER_FILENAME
+
+
+def _read_csv(path: Path) -> Dict[str, bytes]:
+    places: List[Place] = []
+    alternates: List[Sequence[str]] = []
+    with path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            places.append(
+                Place(
+                    name=row["Name"],
+                    country=row["Country"],
+                    admin1=row["Admin1"],
+                    latitude=float(row["Latitude"]),
+                    longitude=float(row["Longitude"]),
+                    population=int(row["Population"]),
+                )
+            )
+            alternates.append(tuple(filter(None, row["AlternateNames"].split(";"))))
+    return _pack_gazetteer(places, alternates)
+
+
+@lru_cache(maxsize=None)
+def gazetteer() -> Gazetteer:
+    """The compiled gazetteer, else the CSV packed in memory; empty when neither exists."""
+
+    try:
+        return Gazetteer(map_artifact(_artifact_path(), [_csv_path()]))
+    except CatalogArtifactError:
+        pass
+    path = _csv_path()
+    sections = _read_csv(path) if path.exists() else _pack_gazetteer((), ())
+    return Gazetteer({name: memoryview(data) for name, data in sections.items()})
+
+
+eclipse_data.register_catalog_cache(gazetteer.cache_clear)
+
+
+def compile_gazetteer() -> Path:
+    """Pack the gazetteer CSV into a memory-mappable artifact next to it."""
+
+    path = write_artifact(_artifact_path(), _read_csv(_csv_path()), [_csv_path()])
+    gazetteer.cache_clear()
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Import from GeoNames dumps
+# ---------------------------------------------------------------------------
+
+
+def alternate_names(name: str, alternates: Iterable[str], population: int) -> List[str]:
+    """ASCII alternate names worth indexing for a city of `population`."""
+
+    if population < _ALTERNATE_MIN_POPULATION:
+        return []
+    own = normalize_name(name)
+    kept = {}
+    for alternate in alternates:
+        # Keep capitalised Latin names: skips codes and abbreviations, other
+        # scripts and the lower-case romanisations of them.
+        if (
+            len(alternate) < 3
+            or not alternate.isascii()
+            or not alternate[0].isupper()
+            or alternate.isupper()
+            or any(character.isdigit() for character in alternate)
+        ):
+            continue
+        key = normalize_name(alternate)
+        if key and key != own:
+            kept.setdefault(key, alternate)
+    return sorted(kept.values())
+
+
+def write_csv(path: Path, rows: Iterable[Sequence[object]]) -> int:
+    count = 0
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(["Name", "Country", "Admin1", "Latitude", "Longitude", "Population", "AlternateNames"])
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _geonames_rows(cities: Path, countries: Dict[str, str], min_population: int) -> Iterable[Sequence[object]]:
+    # GeoNames dumps are tab-separated: see https://download.geonames.org/export/dump/readme.txt
+    with cities.open(encoding="utf-8") as handle:
+        for line in handle:
+            fields = line.rstrip("\n").split("\t")
+            population = int(fields[14] or 0)
+            if population < min_population or fields[8] not in countries:
+                continue
+            yield (
+                fields[1],
+                countries[fields[8]],
+                fields[10],
+                round(float(fields[4]), 4),
+                round(float(fields[5]), 4),
+                population,
+                ";".join(alternate_names(fields[1], fields[3].split(","), population)),
+            )
+
+
+def _country_names(path: Path) -> Dict[str, str]:
+    names: Dict[str, str] = {}
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            names[fields[0]] = fields[4]
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the gazetteer CSV from a GeoNames cities dump.")
+    parser.add_argument("cities", type=Path, help="GeoNames cities file, e.g. cities15000.txt.")
+    parser.add_argument(
+        "--countries", type=Path, required=True, help="GeoNames countryInfo.txt, for country names."
+    )
+    parser.add_argument("--min-population", type=int, default=15000, help="Smallest city to keep (default 15000).")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=eclipse_data._data_dir() / GAZETTEER_CSV,
+        help=f"CSV file to write (default: {GAZETTEER_CSV} in the data directory).",
+    )
+    args = parser.parse_args()
+
+    rows = sorted(
+        _geonames_rows(args.cities, _country_names(args.countries), args.min_population),
+        key=lambda row: (row[1], row[0]),
+    )
+    count = write_csv(args.output, rows)
+    print(f"Wrote {count} place(s) to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Precomputed "next visible event" tables for locations without coordinates.
+
+Without coordinates an event's visibility depends only on the location's
+`RegionSignature`, and the parser produces only a few hundred distinct ones:
+one per country and per region it knows. For each of them `app.py
+compile-catalog` stores, in the compiled catalog artifact, the dates and
+catalog positions of the solar and lunar events visible there. The next
+visible event on or after a date is then one bisect into that short list
+instead of a scan of the catalog.
+
+Tables are only built when every visibility window can be matched by bitmask,
+and are ignored when the resolver's token vocabulary differs from the one
+they were built with. Signatures outside the tables (for example a city whose
+name is also a region token) fall back to the scan.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+from . import eclipse_data
+from .eclipse_data import EclipseEvent
+from .location_resolver import RegionSignature, region_level_locations, token_vocabulary
+
+
+def _key_width(vocabulary: Sequence[str]) -> int:
+    return (len(vocabulary) + 7) // 8
+
+
+def _signature_key(signature: RegionSignature, width: int) -> bytes:
+    return (
+        signature.tokens.to_bytes(width, "little")
+        + signature.country.to_bytes(width, "little")
+        + bytes((signature.has_region,))
+    )
+
+
+def pack_jump_tables(solar: Sequence[EclipseEvent], lunar: Sequence[EclipseEvent]) -> Dict[str, bytes]:
+    """
+    Artifact sections holding the tables for the `solar` and `lunar` catalogs,
+    or none when some window names a token outside the vocabulary.
+    """
+
+    # Imported here: the matcher imports this module for lookups.
+    from .eclipse_matcher import masks_match, window_masks
+
+    catalogs = (solar, lunar)
+    event_masks = [[[window_masks(window) for window in event.visibility] for event in events] for events in catalogs]
+    if any(masks is None for kind in event_masks for windows in kind for masks in windows):
+        return {}
+
+    vocabulary = token_vocabulary()
+    width = _key_width(vocabulary)
+    signatures: Dict[bytes, RegionSignature] = {}
+    for location in region_level_locations():
+        signature = location.region_signature()
+        signatures[_signature_key(signature, width)] = signature
+
+    keys = bytearray()
+    # Row n's solar entries are offsets[2n]:offsets[2n + 1], its lunar ones
+    # offsets[2n + 1]:offsets[2n + 2].
+    offsets = array("I", [0])
+    dates = array("i")
+    positions = array("I")
+    for key in sorted(signatures):
+        signature = signatures[key]
+        keys += key
+        for events, masks in zip(catalogs, event_masks):
+            for position, (event, windows) in enumerate(zip(events, masks)):
+                if any(masks_match(countries, regions, signature) for countries, regions in windows):
+                    dates.append(event.occurs_on.toordinal())
+                    positions.append(position)
+            offsets.append(len(positions))
+    return {
+        "jump_vocabulary": "\n".join(vocabulary).encode("utf-8"),
+        "jump_keys": bytes(keys),
+        "jump_offsets": offsets.tobytes(),
+        "jump_dates": dates.tobytes(),
+        "jump_events": positions.tobytes(),
+    }
+
+
+class JumpTables:
+    """Read-only view of the packed tables."""
+
+    def __init__(self, sections: Mapping[str, memoryview], width: int) -> None:
+        self._width = width
+        step = 2 * width + 1
+        keys = bytes(sections["jump_keys"])
+        self._rows = {keys[start : start + step]: row for row, start in enumerate(range(0, len(keys), step))}
+        self._offsets = sections["jump_offsets"].cast("I")
+        self._dates = sections["jump_dates"].cast("i")
+        self._positions = sections["jump_events"].cast("I")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def next_events(
+        self, signature: RegionSignature, start_date: date, end_date: Optional[date] = None
+    ) -> Optional[Tuple[Optional[EclipseEvent], Optional[EclipseEvent]]]:
+        """
+        Next solar and lunar events visible with `signature` on or after
+        `start_date` and, if given, on or before `end_date`; None when the
+        signature has no table.
+        """
+
+        row = self._rows.get(_signature_key(signature, self._width))
+        if row is None:
+            return None
+        found = []
+        for column, events in enumerate((eclipse_data.solar_events(), eclipse_data.lunar_events())):
+            lower, upper = self._offsets[2 * row + column], self._offsets[2 * row + column + 1]
+            position = bisect_left(self._dates, start_date.toordinal(), lower, upper)
+            if position < upper and (end_date is None or self._dates[position] <= end_date.toordinal()):
+                found.append(events[self._positions[position]])
+            else:
+                found.append(None)
+        return found[0], found[1]
+
+
+@lru_cache(maxsize=None)
+def jump_tables() -> Optional[JumpTables]:
+    """The tables in the compiled catalog; None when it has none or they are out of date."""
+
+    sections = eclipse_data.compiled_sections()
+    if sections is None or "jump_keys" not in sections:
+        return None
+    vocabulary = token_vocabulary()
+    if bytes(sections["jump_vocabulary"]).decode("utf-8").split("\n") != list(vocabulary):
+        return None
+    return JumpTables(sections, _key_width(vocabulary))
+
+
+eclipse_data.register_catalog_cache(jump_tables.cache_clear)
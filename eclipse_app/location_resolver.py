@@ -6,9 +6,19 @@ windows.
 
 from __future__ import annotations
 
+import os
 import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+from functools import cached_property, lru_cache
+from heapq import nlargest
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from . import eclipse_data
+from .fuzzy_match import DeletionIndex, allowed_distance, best_matches
+from .gazetteer import Place, gazetteer, normalize_name
 
 # ---------------------------------------------------------------------------
 # Canonical country list and aliases
@@ -61,6 +71,17 @@ _COUNTRY_CANONICAL = {
 }
 
 
+def _build_country_aliases() -> Dict[str, Tuple[str, ...]]:
+    aliases: Dict[str, List[str]] = {}
+    for alias, canonical in _COUNTRY_CANONICAL.items():
+        aliases.setdefault(canonical, []).append(alias)
+    return {canonical: tuple(values) for canonical, values in aliases.items()}
+
+
+# Reverse index: canonical country name -> every alias that resolves to it
+_COUNTRY_ALIASES = _build_country_aliases()
+
+
 # Countries grouped into broader geographic tokens for fuzzy matching
 _COUNTRY_MACROREGIONS = {
     "United States": {"north america"},
@@ -250,69 +271,128 @@ def _build_region_aliases() -> Dict[str, Tuple[str, Optional[str]]]:
 
 _REGION_ALIAS_LOOKUP = _build_region_aliases()
 
+# GeoNames first-level administrative codes, used to narrow gazetteer lookups.
+# US codes are the postal abbreviations; Canada and Australia use numbers.
+_GEONAMES_ADMIN1 = {
+    "United States": {name: abbr for name, abbr in _US_STATES},
+    "Canada": {
+        "Alberta": "01",
+        "British Columbia": "02",
+        "Manitoba": "03",
+        "New Brunswick": "04",
+        "Newfoundland and Labrador": "05",
+        "Nova Scotia": "07",
+        "Ontario": "08",
+        "Prince Edward Island": "09",
+        "Quebec": "10",
+        "Saskatchewan": "11",
+        "Yukon": "12",
+        "Northwest Territories": "13",
+        "Nunavut": "14",
+    },
+    "Australia": {
+        "New South Wales": "02",
+        "Northern Territory": "03",
+        "Queensland": "04",
+        "South Australia": "05",
+        "Tasmania": "06",
+        "Victoria": "07",
+        "Western Australia": "08",
+    },
+}
+
+
+# ---------------------------------------------------------------------------
+# Token vocabulary for bitmask matching
+# ---------------------------------------------------------------------------
+
+
+def _build_token_vocabulary() -> Dict[str, int]:
+    """
+    Assign a bit position to every country, macro-region and region token the
+    resolver knows about, so sets of tokens can be compared as integers.
+    """
+
+    ordered = []
+    for alias, canonical in _COUNTRY_CANONICAL.items():
+        ordered.extend((alias, canonical.lower()))
+    for macroregions in _COUNTRY_MACROREGIONS.values():
+        ordered.extend(sorted(macroregions))
+    for alias, (name, _) in _REGION_ALIAS_LOOKUP.items():
+        ordered.extend((alias, name.lower()))
+
+    vocabulary: Dict[str, int] = {}
+    for token in ordered:
+        vocabulary.setdefault(token, len(vocabulary))
+    return vocabulary
+
+
+_TOKEN_BITS = _build_token_vocabulary()
+TOKEN_VOCABULARY_SIZE = len(_TOKEN_BITS)
+
+
+def token_vocabulary() -> Tuple[str, ...]:
+    """The vocabulary tokens in bit order, to check masks stored on disk still apply."""
+    return tuple(_TOKEN_BITS)
+
+
+def token_mask(tokens: Iterable[str]) -> Tuple[int, bool]:
+    """
+    Return the bitmask of the lowercase `tokens` that belong to the vocabulary,
+    and whether all of them did. Two token sets share a vocabulary token
+    exactly when their masks share a bit.
+    """
+
+    mask = 0
+    complete = True
+    for token in tokens:
+        bit = _TOKEN_BITS.get(token)
+        if bit is None:
+            complete = False
+        else:
+            mask |= 1 << bit
+    return mask, complete
+
+
+@dataclass(frozen=True)
+class RegionSignature:
+    """
+    Compact form of a location for visibility matching.
+
+    - tokens:     bitmask of the location's vocabulary tokens.
+    - country:    bit of the location's own country (0 when absent or unknown).
+    - has_region: whether the location names a region.
+    """
+
+    tokens: int
+    country: int
+    has_region: bool
+
 
 # ---------------------------------------------------------------------------
 # Postal code resolution (limited to U.S. ZIP codes and Canadian postal codes)
 # ---------------------------------------------------------------------------
 
-_ZIP_STATE_RANGES: Sequence[Tuple[int, int, str]] = (
-    (5, 9, "Puerto Rico"),
-    (10, 27, "Massachusetts"),
-    (28, 29, "Rhode Island"),
-    (30, 38, "New Hampshire"),
-    (39, 49, "Maine"),
-    (50, 59, "Vermont"),
-    (60, 69, "Connecticut"),
-    (70, 89, "New Jersey"),
-    (90, 98, "Armed Forces Europe"),
-    (100, 149, "New York"),
-    (150, 196, "Pennsylvania"),
-    (197, 199, "Delaware"),
-    (200, 205, "District of Columbia"),
-    (206, 219, "Maryland"),
-    (220, 246, "Virginia"),
-    (247, 268, "West Virginia"),
-    (270, 289, "North Carolina"),
-    (290, 299, "South Carolina"),
-    (300, 319, "Georgia"),
-    (320, 349, "Florida"),
-    (350, 369, "Alabama"),
-    (370, 385, "Tennessee"),
-    (386, 397, "Mississippi"),
-    (398, 399, "Georgia"),
-    (400, 427, "Kentucky"),
-    (430, 459, "Ohio"),
-    (460, 479, "Indiana"),
-    (480, 499, "Michigan"),
-    (500, 528, "Iowa"),
-    (530, 549, "Wisconsin"),
-    (550, 567, "Minnesota"),
-    (570, 577, "South Dakota"),
-    (580, 588, "North Dakota"),
-    (590, 599, "Montana"),
-    (600, 629, "Illinois"),
-    (630, 658, "Missouri"),
-    (660, 679, "Kansas"),
-    (680, 693, "Nebraska"),
-    (700, 715, "Louisiana"),
-    (716, 729, "Arkansas"),
-    (730, 749, "Oklahoma"),
-    (750, 799, "Texas"),
-    (800, 816, "Colorado"),
-    (820, 831, "Wyoming"),
-    (832, 838, "Idaho"),
-    (840, 847, "Utah"),
-    (850, 865, "Arizona"),
-    (870, 884, "New Mexico"),
-    (889, 898, "Nevada"),
-    (900, 961, "California"),
-    (962, 966, "Armed Forces Pacific"),
-    (967, 968, "Hawaii"),
-    (970, 979, "Oregon"),
-    (980, 994, "Washington"),
-    (995, 999, "Alaska"),
+# USPS state and territory abbreviations used in the ZIP table, as region names.
+_ZIP_STATE_NAMES = {abbr: name for name, abbr in _US_STATES}
+_ZIP_STATE_NAMES.update(
+    {
+        "AA": "Armed Forces Americas",
+        "AE": "Armed Forces Europe",
+        "AP": "Armed Forces Pacific",
+        "AS": "American Samoa",
+        "FM": "Micronesia",
+        "GU": "Guam",
+        "MH": "Marshall Islands",
+        "MP": "Northern Mariana Islands",
+        "PW": "Palau",
+        "VI": "U.S. Virgin Islands",
+    }
 )
 
+_ZIP_PATTERN = re.compile(r"\d{5}(?:-\d{4})?")
+_CANADA_POSTAL_PATTERN = re.compile(r"[A-Za-z]\d[A-Za-z](?:\s?\d[A-Za-z]\d)?")
+
 _CANADA_POSTAL_PREFIX = {
     "A": "Newfoundland and Labrador",
     "B": "Nova Scotia",
@@ -335,56 +415,81 @@ _CANADA_POSTAL_PREFIX = {
 }
 
 
-def _resolve_us_zip(zip_code: str) -> Optional[Tuple[str, str]]:
-    digits = re.sub(r"\D", "", zip_code)
-    if len(digits) < 3:
-        return None
-    try:
-        prefix = int(digits[:3])
-    except ValueError:
+# (region, country, centroid or None)
+_PostalLookup = Tuple[str, str, Optional[Tuple[float, float]]]
+
+
+def _zip_lookup(row: int, exact: bool) -> Optional[_PostalLookup]:
+    from .postal_codes import zip_table
+
+    if row < 0:
         return None
-    for lower, upper, state in _ZIP_STATE_RANGES:
-        if lower <= prefix <= upper:
-            country = "United States" if state not in {"Armed Forces Europe", "Armed Forces Pacific"} else "United States"
-            if state.startswith("Armed Forces"):
-                state = state
-            return state, country
-    return None
+    table = zip_table()
+    state = table.state(row)
+    return _ZIP_STATE_NAMES.get(state, state), "United States", table.centroid(row) if exact else None
+
 
+def _resolve_us_zip(zip_code: str) -> Optional[_PostalLookup]:
+    from .postal_codes import zip_table
+
+    return _zip_lookup(*zip_table().find(int(zip_code[:5])))
+
+
+def _resolve_canadian_postal(code: str) -> Optional[_PostalLookup]:
+    from .postal_codes import fsa_table
 
-def _resolve_canadian_postal(code: str) -> Optional[Tuple[str, str]]:
     cleaned = code.replace(" ", "").upper()
-    if len(cleaned) < 1:
-        return None
-    first = cleaned[0]
-    province = _CANADA_POSTAL_PREFIX.get(first)
+    table = fsa_table()
+    slot = table.find(cleaned)
+    if slot >= 0:
+        return table.province(slot), "Canada", table.centroid(slot)
+    # FSAs missing from the table still give the province by first letter.
+    province = _CANADA_POSTAL_PREFIX.get(cleaned[:1])
     if province:
-        return province, "Canada"
+        return province, "Canada", None
     return None
 
 
 def resolve_postal_code(code: str) -> Optional[Tuple[str, str]]:
     """
     Attempt to derive (region, country) from a postal code. Currently supports:
-    - United States ZIP codes (3-digit prefix mapping)
-    - Canadian postal codes (first-letter mapping)
+    - United States ZIP codes (full ZIP table; unlisted codes by 3-digit prefix)
+    - Canadian postal codes (forward sortation area table; unlisted areas by first letter)
     """
 
+    lookup = _postal_lookup(code)
+    return lookup[:2] if lookup else None
+
+
+def _postal_lookup(code: str) -> Optional[_PostalLookup]:
     code = code.strip()
     if not code:
         return None
 
     # U.S. ZIP codes are numeric (optionally with a hyphen)
-    if re.fullmatch(r"\d{5}(-\d{4})?", code):
+    if _ZIP_PATTERN.fullmatch(code):
         return _resolve_us_zip(code)
 
     # Canadian postal codes follow the A1A 1A1 pattern
-    if re.fullmatch(r"[A-Za-z]\d[A-Za-z](?:\s?\d[A-Za-z]\d)?", code):
+    if _CANADA_POSTAL_PATTERN.fullmatch(code):
         return _resolve_canadian_postal(code)
 
     return None
 
 
+def _postal_query(user_input: str, lookup: Optional[_PostalLookup]) -> LocationQuery:
+    region, country, centroid = lookup if lookup else (None, None, None)
+    latitude, longitude = centroid if centroid else (None, None)
+    return LocationQuery(
+        raw=user_input,
+        region=region,
+        country=country,
+        postal_code=user_input.strip(),
+        latitude=latitude,
+        longitude=longitude,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Location parsing
 # ---------------------------------------------------------------------------
@@ -394,15 +499,33 @@ def _normalise_token(value: str) -> str:
     return re.sub(r"\s+", " ", value.strip().lower())
 
 
-@dataclass
+@dataclass(frozen=True)
 class LocationQuery:
+    """
+    Immutable, hashable parsed location. Matching tokens and the region
+    signature are derived once per instance and cached.
+    """
+
     raw: str
     city: Optional[str] = None
     region: Optional[str] = None
     country: Optional[str] = None
     postal_code: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
-    def tokens(self) -> Set[str]:
+    @property
+    def coordinates(self) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) in degrees, east positive, when known."""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
+
+    def tokens(self) -> FrozenSet[str]:
+        return self._tokens
+
+    @cached_property
+    def _tokens(self) -> FrozenSet[str]:
         result: Set[str] = set()
         if self.city:
             result.update(word.lower() for word in self.city.split())
@@ -412,35 +535,184 @@ class LocationQuery:
             result.update(word.lower() for word in self.region.split())
         if self.country:
             result.add(self.country.lower())
-            for alias, canonical in _COUNTRY_CANONICAL.items():
-                if canonical == self.country:
-                    result.add(alias)
+            result.update(_COUNTRY_ALIASES.get(self.country, ()))
             result.update(_COUNTRY_MACROREGIONS.get(self.country, set()))
-        return result
+        return frozenset(result)
+
+    def region_signature(self) -> RegionSignature:
+        return self._region_signature
+
+    @cached_property
+    def _region_signature(self) -> RegionSignature:
+        tokens, _ = token_mask(self._tokens)
+        country = token_mask((self.country.lower(),))[0] if self.country else 0
+        return RegionSignature(tokens=tokens, country=country, has_region=self.region is not None)
 
     def formatted(self) -> str:
         components = [self.city, self.region, self.country]
-        return ", ".join(component for component in components if component)
+        text = ", ".join(component for component in components if component)
+        if not text and self.coordinates:
+            text = f"{self.latitude:.4f}, {self.longitude:.4f}"
+        return text
+
+
+def region_level_locations() -> List[LocationQuery]:
+    """One location per country and per region the parser knows, without a city."""
+
+    locations = [LocationQuery(raw="", country=country) for country in sorted(set(_COUNTRY_CANONICAL.values()))]
+    for region, country in sorted(set(_REGION_ALIAS_LOOKUP.values()), key=lambda entry: (entry[0], entry[1] or "")):
+        locations.append(LocationQuery(raw="", region=region, country=country))
+    return locations
+
+
+_COORDINATE_PATTERN = re.compile(r"([+-]?\d+(?:\.\d+)?)\s*[,\s]\s*([+-]?\d+(?:\.\d+)?)")
+
+
+def _parse_coordinates(value: str) -> Optional[Tuple[float, float]]:
+    match = _COORDINATE_PATTERN.fullmatch(value)
+    if not match:
+        return None
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError("Coordinates must be 'latitude, longitude' within +/-90 and +/-180 degrees.")
+    return latitude, longitude
+
+
+# Environment variable setting how many parsed locations are kept (0 disables the cache).
+LOCATION_CACHE_SIZE_ENV = "ECLIPSE_FINDER_LOCATION_CACHE_SIZE"
+DEFAULT_LOCATION_CACHE_SIZE = 4096
+
+
+class LocationCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _LocationCache:
+    """Bounded, thread-safe LRU mapping input strings to their `LocationQuery`."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._entries: "OrderedDict[str, LocationQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[LocationQuery]:
+        with self._lock:
+            location = self._entries.get(key)
+            if location is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            return location
+
+    def put(self, key: str, location: LocationQuery) -> None:
+        with self._lock:
+            if self._maxsize <= 0:
+                return
+            self._entries[key] = location
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def info(self) -> LocationCacheInfo:
+        with self._lock:
+            return LocationCacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+
+def _default_cache_size() -> int:
+    override = os.environ.get(LOCATION_CACHE_SIZE_ENV)
+    try:
+        return int(override) if override else DEFAULT_LOCATION_CACHE_SIZE
+    except ValueError:
+        return DEFAULT_LOCATION_CACHE_SIZE
+
+
+# One cache per process, shared by the CLI, batch mode, the service and the
+# Streamlit app. The gazetteer and postal tables behind it can change on a
+# catalog reload, so it is dropped then too.
+_LOCATION_CACHE = _LocationCache(_default_cache_size())
+eclipse_data.register_catalog_cache(_LOCATION_CACHE.clear)
+
+
+def configure_location_cache(maxsize: int) -> None:
+    """Keep at most `maxsize` parsed locations (0 disables caching), evicting the least recently used."""
+
+    _LOCATION_CACHE.resize(maxsize)
+
+
+def location_cache_info() -> LocationCacheInfo:
+    """Hit and miss counts and the size of the `parse_location_input` cache."""
+
+    return _LOCATION_CACHE.info()
 
 
 def parse_location_input(user_input: str) -> LocationQuery:
     """
     Parse a free-form location string into structured components. The parser is
     intentionally forgiving and is aimed at matching the eclipse catalog rather
-    than providing precise geocoding.
+    than providing precise geocoding. A decimal "latitude, longitude" pair is
+    kept as coordinates for the eclipse geometry instead.
+
+    Results are cached by the exact input, so repeated locations are parsed
+    once; see `location_cache_info`. Case and spacing can change how an input
+    parses, so differently typed inputs are never shared.
     """
 
+    location = _LOCATION_CACHE.get(user_input)
+    if location is None:
+        location = _parse_location_input(user_input)
+        _LOCATION_CACHE.put(user_input, location)
+    return location
+
+
+def _parse_location_input(user_input: str) -> LocationQuery:
     raw = user_input.strip()
     if not raw:
         raise ValueError("Location input cannot be empty.")
 
+    # Decimal "latitude, longitude" pair
+    coordinates = _parse_coordinates(raw)
+    if coordinates:
+        return LocationQuery(raw=user_input, latitude=coordinates[0], longitude=coordinates[1])
+
     # Postal code shortcut
-    if re.fullmatch(r"\d{5}(?:-\d{4})?", raw) or re.fullmatch(r"[A-Za-z]\d[A-Za-z](?:\s?\d[A-Za-z]\d)?", raw):
-        lookup = resolve_postal_code(raw)
-        region, country = (lookup if lookup else (None, None))
-        return LocationQuery(raw=user_input, region=region, country=country, postal_code=raw)
+    if _ZIP_PATTERN.fullmatch(raw) or _CANADA_POSTAL_PATTERN.fullmatch(raw):
+        return _postal_query(user_input, _postal_lookup(raw))
 
     components = [component.strip() for component in raw.split(",") if component.strip()]
+    location = _parse_components(user_input, components)
+    if location.coordinates is None:
+        # Exact lookups failed somewhere: retry once with misspelt components
+        # corrected, keeping the result only if it resolves more.
+        corrected = [_correct_spelling(component) for component in components]
+        if corrected != components:
+            retry = _parse_components(user_input, corrected)
+            if (
+                retry.coordinates is not None
+                or (retry.region and not location.region)
+                or (retry.country and not location.country)
+            ):
+                location = retry
+    return location
+
+
+def _parse_components(user_input: str, components: Sequence[str]) -> LocationQuery:
     city: Optional[str] = None
     region: Optional[str] = None
     country: Optional[str] = None
@@ -499,8 +771,291 @@ def parse_location_input(user_input: str) -> LocationQuery:
 
     country = normalize_country(country)
     region = normalize_region(region)
+    latitude, longitude = _locate_city(city, region, country) if city else (None, None)
+
+    return LocationQuery(
+        raw=user_input,
+        city=city,
+        region=region,
+        country=country,
+        postal_code=None,
+        latitude=latitude,
+        longitude=longitude,
+    )
+
+
+# Kinds of spelling-index entries, in order of preference.
+_COUNTRY, _REGION, _CITY = 0, 1, 2
+# Cities smaller than this are never the target of a correction.
+_CORRECTION_MIN_POPULATION = 100_000
+# A city tied with another at the same distance wins only when it is this many
+# times larger.
+_CORRECTION_POPULATION_RATIO = 10
+
+
+@lru_cache(maxsize=None)
+def _spelling_index() -> Tuple[DeletionIndex, Dict[str, Tuple[int, Optional[str]]]]:
+    """
+    Fuzzy index over country and region names and aliases and gazetteer city
+    names, with each name's kind (0 country, 1 region, 2 city) and canonical
+    spelling; cities take theirs from the gazetteer when corrected.
+    """
+
+    known: Dict[str, Tuple[int, Optional[str]]] = {}
+    for alias, country in _COUNTRY_CANONICAL.items():
+        known.setdefault(normalize_name(alias), (_COUNTRY, country))
+    for alias, (region, _) in _REGION_ALIAS_LOOKUP.items():
+        known.setdefault(normalize_name(alias), (_REGION, region))
+    for name in gazetteer().names():
+        known.setdefault(name, (_CITY, None))
+    # Abbreviations are too short to correct reliably.
+    return DeletionIndex(name for name in known if len(name) >= 4), known
+
+
+eclipse_data.register_catalog_cache(_spelling_index.cache_clear)
+
+
+@lru_cache(maxsize=None)
+def _exact_names() -> FrozenSet[str]:
+    """Normalised country and region names and aliases."""
+
+    return frozenset(normalize_name(alias) for alias in (*_COUNTRY_CANONICAL, *_REGION_ALIAS_LOOKUP))
+
+
+def _correct_spelling(component: str) -> str:
+    """
+    `component` with a misspelt place name replaced by the closest known one,
+    or unchanged when no correction is close, large enough and unambiguous.
+    """
+
+    key = normalize_name(component)
+    # Exact names and names too short to correct never need the fuzzy index,
+    # which takes about a second to build.
+    if not allowed_distance(key) or key in _exact_names() or gazetteer().candidates(key):
+        return component
+    index, known = _spelling_index()
+    options: Dict[str, Tuple[int, int, int]] = {}
+    for name, distance in best_matches(index, key):
+        kind, replacement = known[name]
+        population = 0
+        if replacement is None:
+            place = gazetteer().candidates(name)[0]
+            replacement, population = place.name, place.population
+            # A small town a letter away from an unknown word ("Gotham" and
+            # Gotha) is more likely a coincidence than the intended place.
+            if population < _CORRECTION_MIN_POPULATION:
+                continue
+        option = (distance, kind, -population)
+        options[replacement] = min(option, options.get(replacement, option))
+    if not options:
+        return component
+    ranked = sorted((option, replacement) for replacement, option in options.items())
+    (distance, kind, population), replacement = ranked[0]
+    if len(ranked) > 1:
+        (runner_distance, runner_kind, runner_population), _ = ranked[1]
+        # Only an unambiguous best guess replaces what the user typed: a tie
+        # between countries or regions, or between cities of similar size,
+        # is left for the normal "not found" handling.
+        if (runner_distance, runner_kind) == (distance, kind) and (
+            kind != _CITY or -population < _CORRECTION_POPULATION_RATIO * -runner_population
+        ):
+            return component
+    return replacement
+
+
+def _locate_city(
+    city: str, region: Optional[str], country: Optional[str]
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Coordinates of `city` from the offline gazetteer. A stated country or
+    state/province narrows the search and is never overridden by a larger
+    namesake elsewhere; other regions are not used.
+    """
+
+    admin1 = _GEONAMES_ADMIN1.get(country, {}).get(region) if region else None
+    place = gazetteer().lookup(city, country=country, admin1=admin1)
+    if place is None:
+        return None, None
+    return place.latitude, place.longitude
+
+
+def parse_postal_codes(values: Sequence[str]) -> Dict[int, LocationQuery]:
+    """
+    Parse the entries of `values` that are bare postal codes in bulk: all U.S.
+    ZIP codes with a single vectorized table search, Canadian codes by direct
+    FSA index. Results are keyed by position and equal what
+    `parse_location_input` returns; other entries are left out.
+    """
+
+    result: Dict[int, LocationQuery] = {}
+    zip_positions: List[int] = []
+    for index, value in enumerate(values):
+        code = value.strip()
+        if _ZIP_PATTERN.fullmatch(code):
+            zip_positions.append(index)
+        elif _CANADA_POSTAL_PATTERN.fullmatch(code):
+            result[index] = _postal_query(value, _resolve_canadian_postal(code))
+    if zip_positions:
+        from .postal_codes import zip_table
+
+        rows, exact = zip_table().find_many([int(values[index].strip()[:5]) for index in zip_positions])
+        for index, row, matched in zip(zip_positions, rows.tolist(), exact.tolist()):
+            result[index] = _postal_query(values[index], _zip_lookup(row, matched))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Autocomplete
+# ---------------------------------------------------------------------------
+
+# Prefixes matching more names than this have their best completions precomputed.
+_SCAN_LIMIT = 64
+_MAX_SUGGESTIONS = 20
+# Countries rank above regions, and regions above cities (scored by population).
+_COUNTRY_SCORE = 2_000_000_000
+_REGION_SCORE = 1_000_000_000
+
+
+class _PrefixIndex:
+    """Sorted search keys with labels and scores, for ranked prefix completion."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, int]]) -> None:
+        ordered = sorted(entries)
+        self._keys = [key for key, _, _ in ordered]
+        self._labels = [label for _, label, _ in ordered]
+        self._scores = [score for _, _, score in ordered]
+        self._best: Dict[str, List[int]] = {}
+        # Walk down from the root; only prefixes with long ranges need an entry.
+        pending = [("", 0, len(self._keys))]
+        while pending:
+            prefix, low, high = pending.pop()
+            depth = len(prefix) + 1
+            position = low
+            while position < high:
+                key = self._keys[position]
+                if len(key) < depth:
+                    position += 1
+                    continue
+                child = key[:depth]
+                end = bisect_left(self._keys, child + "\uffff", position, high)
+                if end - position > _SCAN_LIMIT:
+                    self._best[child] = self._ranked(position, end, _MAX_SUGGESTIONS)
+                    pending.append((child, position, end))
+                position = end
+
+    def _ranked(self, low: int, high: int, count: int) -> List[int]:
+        # Rank by score, then keep each label once (aliases share labels).
+        labels: Set[str] = set()
+        result = []
+        for row in nlargest(count * 2, range(low, high), key=self._scores.__getitem__):
+            if self._labels[row] not in labels:
+                labels.add(self._labels[row])
+                result.append(row)
+        return result[:count]
+
+    def complete(self, key: str, limit: int) -> List[str]:
+        rows = self._best.get(key)
+        if rows is None:
+            low = bisect_left(self._keys, key)
+            rows = self._ranked(low, bisect_left(self._keys, key + "\uffff", low), limit)
+        return [self._labels[row] for row in rows[:limit]]
+
+
+@lru_cache(maxsize=None)
+def _prefix_indexes() -> Tuple[_PrefixIndex, _PrefixIndex]:
+    """Completions over every country, region and gazetteer city, and over countries and regions only."""
+
+    areas: List[Tuple[str, str, int]] = []
+    for alias, country in _COUNTRY_CANONICAL.items():
+        areas.append((normalize_name(alias), country, _COUNTRY_SCORE))
+    for alias, (region, country) in _REGION_ALIAS_LOOKUP.items():
+        label = f"{region}, {country}" if country else region
+        areas.append((normalize_name(alias), label, _REGION_SCORE))
+
+    table = gazetteer()
+    cities: List[Tuple[str, str, int]] = []
+    # Alternate names are left out: too many of them are prefixes of unrelated names.
+    for key, number, alternate in table.keyed_places():
+        if not alternate:
+            place = table.place(number)
+            cities.append((key, f"{place.name}, {_place_area(place)}", place.population))
+    return _PrefixIndex(areas + cities), _PrefixIndex(areas)
+
+
+eclipse_data.register_catalog_cache(_prefix_indexes.cache_clear)
+
+
+def _place_area(place: Place) -> str:
+    """'Region, Country' for gazetteer places in countries with known region codes, else the country."""
+
+    for region, code in _GEONAMES_ADMIN1.get(place.country, {}).items():
+        if code == place.admin1:
+            return f"{region}, {place.country}"
+    return place.country
+
+
+def _postal_completions(prefix: str, limit: int) -> List[str]:
+    from .postal_codes import fsa_slot, fsa_table, zip_table
+
+    if prefix.isdigit() and len(prefix) <= 5:
+        codes = zip_table().codes
+        scale = 10 ** (5 - len(prefix))
+        low = bisect_left(codes, int(prefix) * scale)
+        high = bisect_left(codes, (int(prefix) + 1) * scale, low)
+        return [f"{code:05d}" for code in codes[low : min(high, low + limit)]]
+
+    # A letter and digit cover a run of 26 FSA slots; a full FSA is one slot.
+    code = prefix.upper().replace(" ", "")
+    if len(code) not in (2, 3):
+        return []
+    first = fsa_slot(code if len(code) == 3 else code + "A")
+    if first < 0:
+        return []
+    span = 1 if len(code) == 3 else 26
+    table = fsa_table()
+    result = []
+    for slot in range(first, first + span):
+        if table.provinces[slot]:
+            letter, rest = divmod(slot, 260)
+            digit, last = divmod(rest, 26)
+            result.append(f"{chr(65 + letter)}{digit}{chr(65 + last)}")
+            if len(result) == limit:
+                break
+    return result
+
+
+def autocomplete(prefix: str, limit: int = 8) -> List[str]:
+    """
+    Suggestions for partially typed location input. The last comma-separated
+    component is completed: from every country, region and gazetteer city when
+    it stands alone (cities, e.g. "Austin, Texas, United States", by
+    population after countries and regions), from countries and regions after
+    a comma, and from ZIP codes or Canadian FSAs for postal prefixes. Earlier
+    components are kept as typed.
+    """
 
-    return LocationQuery(raw=user_input, city=city, region=region, country=country, postal_code=None)
+    head, _, tail = prefix.rpartition(",")
+    tail = tail.strip()
+    limit = min(limit, _MAX_SUGGESTIONS)
+    if not tail or limit <= 0:
+        return []
+    if not head:
+        postal = _postal_completions(tail, limit)
+        if postal or tail[0].isdigit():
+            return postal
+    everything, areas = _prefix_indexes()
+    key = normalize_name(tail)
+    if not key:
+        return []
+    if not head:
+        return everything.complete(key, limit)
+    head = head.strip()
+    labels = areas.complete(key, _MAX_SUGGESTIONS)
+    # Areas that actually contain a city named like the head come first.
+    located = [_place_area(place) for place in gazetteer().candidates(head)]
+    ranked = [label for label in dict.fromkeys(located) if label in labels]
+    ranked += [label for label in labels if label not in ranked]
+    return [f"{head}, {label}" for label in ranked[:limit]]
 
 
 def normalize_country(name: Optional[str]) -> Optional[str]:
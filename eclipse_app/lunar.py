@@ -0,0 +1,432 @@
+"""
+Lunar eclipse elements and a vectorized visibility engine on top of them.
+
+A lunar eclipse looks the same from everywhere the Moon is up, so local
+visibility only depends on the Moon's altitude during each phase. The
+elements hold the UT contact times of the penumbral, partial (umbral) and
+total phases together with the Moon's apparent declination and Greenwich
+hour angle as polynomials in hours from `t0`. `local_visibility` evaluates
+them for arrays of observers at once: between two transits the Moon's
+altitude changes monotonically, so its highest altitude during a phase is
+either at an end of the phase or at the upper transit inside it.
+
+The bundled elements in `lunar_elements_1900_2100.csv` are derived from the
+low-precision ephemeris in `ephemeris` by running
+
+    python -m eclipse_app.lunar
+
+which skips catalog dates without a lunar eclipse and reports rows whose
+magnitude or total-phase duration disagrees with the geometry. Events
+without elements fall back to region matching.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.polynomial import polynomial
+
+from . import eclipse_data, ephemeris
+from .eclipse_data import EclipseEvent
+
+LUNAR_ELEMENTS_CSV = "lunar_elements_1900_2100.csv"
+
+_SUN_RADIUS_KM = 696000.0
+_MOON_RADIUS = 0.2724880  # Earth equatorial radii
+# Danjon's enlargement of the Earth's shadow by the atmosphere.
+_SHADOW_ENLARGEMENT = 1.02
+_POLAR_FLATTENING = 0.998340
+
+# Polynomials are fitted over t0 +/- _FIT_HOURS, which covers every penumbral phase.
+_FIT_HOURS = 4.0
+_SCAN_STEP_HOURS = 1.0 / 720.0
+_POLYNOMIALS = (("dec", 2), ("gha", 2))
+_CONTACTS = (
+    "penumbral_start",
+    "partial_start",
+    "total_start",
+    "total_end",
+    "partial_end",
+    "penumbral_end",
+)
+PHASES = (
+    ("penumbral", "penumbral_start", "penumbral_end"),
+    ("partial", "partial_start", "partial_end"),
+    ("total", "total_start", "total_end"),
+)
+
+
+@dataclass(frozen=True)
+class LunarElements:
+    """
+    Circumstances of one lunar eclipse. Times are UT hours after 0h on
+    `occurs_on`, NaN for phases that do not occur. `dec` and `gha` are
+    polynomial coefficients, lowest order first, for the Moon's apparent
+    declination and Greenwich hour angle in degrees, in hours from `t0`.
+    """
+
+    occurs_on: date
+    t0: float
+    maximum: float
+    penumbral_start: float
+    partial_start: float
+    total_start: float
+    total_end: float
+    partial_end: float
+    penumbral_end: float
+    magnitude: float  # umbral magnitude at maximum
+    parallax: float  # Moon's horizontal parallax, degrees
+    dec: Tuple[float, ...]
+    gha: Tuple[float, ...]
+
+    @property
+    def horizon(self) -> float:
+        """Geocentric altitude of the Moon's centre when it rises or sets, in degrees."""
+
+        return 0.7275 * self.parallax - 34.0 / 60.0
+
+    def timestamps(self, hours) -> np.ndarray:
+        """UT instants (datetime64[s]) of times in hours after 0h; NaN gives NaT."""
+
+        hours = np.atleast_1d(np.asarray(hours, dtype=np.float64))
+        result = np.full(hours.shape, np.datetime64("NaT"), dtype="datetime64[s]")
+        finite = np.isfinite(hours)
+        result[finite] = np.datetime64(self.occurs_on, "s") + np.rint(hours[finite] * 3600.0).astype(
+            "timedelta64[s]"
+        )
+        return result
+
+
+def _altitude(latitude: np.ndarray, declination, hour_angle) -> np.ndarray:
+    """Altitude in degrees from radians latitude and degrees declination/hour angle."""
+
+    declination = np.radians(declination)
+    sine = np.sin(latitude) * np.sin(declination) + np.cos(latitude) * np.cos(declination) * np.cos(
+        np.radians(hour_angle)
+    )
+    return np.degrees(np.arcsin(np.clip(sine, -1.0, 1.0)))
+
+
+def _highest_altitude(
+    t0, dec: np.ndarray, gha: np.ndarray, latitude: np.ndarray, longitude: np.ndarray, start, end
+) -> np.ndarray:
+    """
+    Highest altitude of the Moon between `start` and `end` for each observer,
+    or -90 when the phase does not occur. `dec` and `gha` hold one column of
+    coefficients per observer, so each observer may watch a different eclipse.
+    """
+
+    t_start, t_end = np.broadcast_arrays(start - t0, end - t0, latitude)[:2]
+    gha_start = polynomial.polyval(t_start, gha, tensor=False)
+    hour_start = gha_start + longitude
+    sweep = polynomial.polyval(t_end, gha, tensor=False) - gha_start
+    highest = np.maximum(
+        _altitude(latitude, polynomial.polyval(t_start, dec, tensor=False), hour_start),
+        _altitude(latitude, polynomial.polyval(t_end, dec, tensor=False), hour_start + sweep),
+    )
+    # Observers whose meridian the Moon crosses during the phase see it highest there.
+    transit = np.ceil(hour_start / 360.0) * 360.0 - hour_start
+    crossing = transit <= sweep
+    t_transit = t_start[crossing] + transit[crossing] / sweep[crossing] * (t_end - t_start)[crossing]
+    declination = polynomial.polyval(t_transit, dec[:, crossing], tensor=False)
+    highest[crossing] = 90.0 - np.abs(np.degrees(latitude[crossing]) - declination)
+    return np.where(np.isfinite(t_start) & np.isfinite(t_end), highest, -90.0)
+
+
+def _coefficients(values: Sequence[float], shape: Tuple[int, ...]) -> np.ndarray:
+    """Polynomial coefficients repeated for every observer in an array of `shape`."""
+
+    return np.broadcast_to(np.reshape(values, (-1,) + (1,) * len(shape)), (len(values),) + shape)
+
+
+@dataclass(frozen=True, eq=False)
+class LunarVisibility:
+    """
+    Per-observer visibility of one lunar eclipse, one array entry per
+    observer. A phase is visible when the Moon is up during some part of it;
+    the eclipse is `visible` when any umbral phase is (the penumbral phase
+    for penumbral eclipses).
+    """
+
+    moon_altitude: np.ndarray  # degrees, at maximum
+    penumbral: np.ndarray
+    partial: np.ndarray
+    total: np.ndarray
+    visible: np.ndarray
+
+
+def local_visibility(elements: LunarElements, latitude, longitude) -> LunarVisibility:
+    """
+    Visibility of each phase for observers at `latitude` and `longitude`
+    (degrees, east positive; scalars or equal-length arrays).
+    """
+
+    latitude, longitude = np.broadcast_arrays(np.atleast_1d(latitude), np.atleast_1d(longitude))
+    latitude = np.radians(np.asarray(latitude, dtype=np.float64))
+    longitude = np.asarray(longitude, dtype=np.float64)
+    dec, gha = _coefficients(elements.dec, latitude.shape), _coefficients(elements.gha, latitude.shape)
+    phases = {
+        name: _highest_altitude(
+            elements.t0, dec, gha, latitude, longitude, getattr(elements, start), getattr(elements, end)
+        )
+        > elements.horizon
+        for name, start, end in PHASES
+    }
+    t_max = elements.maximum - elements.t0
+    altitude = _altitude(
+        latitude, polynomial.polyval(t_max, elements.dec), polynomial.polyval(t_max, elements.gha) + longitude
+    )
+    umbral = np.isfinite(elements.partial_start)
+    return LunarVisibility(
+        moon_altitude=altitude,
+        penumbral=phases["penumbral"],
+        partial=phases["partial"],
+        total=phases["total"],
+        visible=phases["partial"] if umbral else phases["penumbral"],
+    )
+
+
+def event_visibility(elements: Sequence[LunarElements], latitude: float, longitude: float) -> np.ndarray:
+    """
+    `LunarVisibility.visible` of every eclipse in `elements` for one observer,
+    one array entry per eclipse, evaluated for all of them at once.
+    """
+
+    size = len(elements)
+    umbral = np.array([np.isfinite(item.partial_start) for item in elements], dtype=bool)
+
+    def column(name: str) -> np.ndarray:
+        return np.array([getattr(item, name) for item in elements], dtype=np.float64)
+
+    def coefficients(name: str) -> np.ndarray:
+        return np.array([getattr(item, name) for item in elements], dtype=np.float64).reshape(size, -1).T
+
+    # The umbral phase decides visibility, or the penumbral one for penumbral eclipses.
+    highest = _highest_altitude(
+        column("t0"),
+        coefficients("dec"),
+        coefficients("gha"),
+        np.full(size, np.radians(float(latitude))),
+        np.full(size, float(longitude)),
+        np.where(umbral, column("partial_start"), column("penumbral_start")),
+        np.where(umbral, column("partial_end"), column("penumbral_end")),
+    )
+    return highest > np.array([item.horizon for item in elements], dtype=np.float64)
+
+
+# ---------------------------------------------------------------------------
+# Derivation from the ephemeris
+# ---------------------------------------------------------------------------
+
+
+def _shadow_geometry(jd_ut: np.ndarray, delta_t: float) -> Dict[str, np.ndarray]:
+    """Moon-to-shadow-axis separation and shadow radii (radians), plus the Moon's place."""
+
+    jde = jd_ut + delta_t / 86400.0
+    sun_ra, sun_dec, sun_distance = ephemeris.sun_position(jde)
+    moon_ra, moon_dec, moon_distance = ephemeris.moon_position(jde)
+    cosine = -np.sin(moon_dec) * np.sin(sun_dec) - np.cos(moon_dec) * np.cos(sun_dec) * np.cos(moon_ra - sun_ra)
+    moon_parallax = np.arcsin(ephemeris.EARTH_RADIUS_KM / moon_distance)
+    sun_parallax = np.arcsin(ephemeris.EARTH_RADIUS_KM / sun_distance)
+    sun_radius = np.arcsin(_SUN_RADIUS_KM / sun_distance)
+    return {
+        "separation": np.arccos(np.clip(cosine, -1.0, 1.0)),
+        "umbra": _SHADOW_ENLARGEMENT * (_POLAR_FLATTENING * moon_parallax - sun_radius + sun_parallax),
+        "penumbra": _SHADOW_ENLARGEMENT * (_POLAR_FLATTENING * moon_parallax + sun_radius + sun_parallax),
+        "moon_radius": np.arcsin(_MOON_RADIUS * ephemeris.EARTH_RADIUS_KM / moon_distance),
+        "parallax": moon_parallax,
+        "dec": np.degrees(moon_dec),
+        "gha": np.degrees(np.unwrap(ephemeris.greenwich_sidereal_time(jd_ut) - moon_ra)),
+    }
+
+
+def _crossings(hours: np.ndarray, gap: np.ndarray, maximum: int) -> Tuple[float, float]:
+    """Hours at which `gap` turns negative before `maximum` and positive after it; NaN if never."""
+
+    if gap[maximum] >= 0:
+        return float("nan"), float("nan")
+    before = np.flatnonzero(gap[:maximum] >= 0)
+    after = np.flatnonzero(gap[maximum:] >= 0) + maximum
+    if not (before.size and after.size):
+        return float("nan"), float("nan")
+
+    def interpolate(index: int) -> float:
+        fraction = gap[index] / (gap[index] - gap[index + 1])
+        return float(hours[index] + fraction * (hours[index + 1] - hours[index]))
+
+    return interpolate(before[-1]), interpolate(after[0] - 1)
+
+
+def derive_elements(occurs_on: date) -> Optional[LunarElements]:
+    """
+    Lunar eclipse elements for `occurs_on` (UT date of greatest eclipse) from
+    the low-precision ephemeris, or None when the Moon misses the penumbra.
+    """
+
+    delta_t = ephemeris.delta_t(occurs_on.year + (occurs_on.timetuple().tm_yday - 0.5) / 365.25)
+    midnight = ephemeris.julian_day_of(occurs_on)
+    coarse = np.arange(0.0, 24.0, 1.0 / 60.0)
+    scan = _shadow_geometry(midnight + coarse / 24.0, delta_t)
+    centre = float(coarse[np.argmin(scan["separation"])])
+
+    hours = np.arange(centre - 1.5 * _FIT_HOURS, centre + 1.5 * _FIT_HOURS, _SCAN_STEP_HOURS)
+    geometry = _shadow_geometry(midnight + hours / 24.0, delta_t)
+    separation, moon_radius = geometry["separation"], geometry["moon_radius"]
+    maximum = int(np.argmin(separation))
+    penumbral = _crossings(hours, separation - geometry["penumbra"] - moon_radius, maximum)
+    if not np.isfinite(penumbral[0]):
+        return None
+    partial = _crossings(hours, separation - geometry["umbra"] - moon_radius, maximum)
+    total = _crossings(hours, separation - geometry["umbra"] + moon_radius, maximum)
+
+    t0 = float(np.round(hours[maximum]))
+    window = np.abs(hours - t0) <= _FIT_HOURS
+    offsets = hours[window] - t0
+    fitted = {
+        name: tuple(float(value) for value in polynomial.polyfit(offsets, geometry[name][window], degree))
+        for name, degree in _POLYNOMIALS
+    }
+    gha = list(fitted["gha"])
+    gha[0] %= 360.0
+    fitted["gha"] = tuple(gha)
+    umbra = geometry["umbra"][maximum]
+    return LunarElements(
+        occurs_on=occurs_on,
+        t0=t0,
+        maximum=float(hours[maximum]),
+        penumbral_start=penumbral[0],
+        partial_start=partial[0],
+        total_start=total[0],
+        total_end=total[1],
+        partial_end=partial[1],
+        penumbral_end=penumbral[1],
+        magnitude=float((umbra + moon_radius[maximum] - separation[maximum]) / (2 * moon_radius[maximum])),
+        parallax=float(np.degrees(geometry["parallax"][window].mean())),
+        **fitted,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Bundled elements
+# ---------------------------------------------------------------------------
+
+_SCALARS = (("T0", "t0"), ("Maximum", "maximum")) + tuple(
+    ("".join(part.title() for part in name.split("_")), name) for name in _CONTACTS
+) + (("Magnitude", "magnitude"), ("Parallax", "parallax"))
+
+
+def _columns() -> List[str]:
+    columns = ["Date"] + [column for column, _ in _SCALARS]
+    for name, degree in _POLYNOMIALS:
+        columns.extend(f"{name.upper()}{power}" for power in range(degree + 1))
+    return columns
+
+
+def _elements_row(elements: LunarElements) -> List[str]:
+    row = [elements.occurs_on.isoformat()]
+    row.extend(f"{getattr(elements, name):.6g}" for _, name in _SCALARS)
+    for name, _ in _POLYNOMIALS:
+        row.extend(f"{value:.9g}" for value in getattr(elements, name))
+    return row
+
+
+def _parse_row(row: Dict[str, str]) -> LunarElements:
+    fields = {
+        name: tuple(float(row[f"{name.upper()}{power}"]) for power in range(degree + 1))
+        for name, degree in _POLYNOMIALS
+    }
+    return LunarElements(
+        occurs_on=date.fromisoformat(row["Date"]),
+        **{name: float(row[column]) for column, name in _SCALARS},
+        **fields,
+    )
+
+
+@lru_cache(maxsize=None)
+def lunar_elements() -> Dict[date, LunarElements]:
+    """Bundled elements keyed by date; empty when the data directory has none."""
+
+    path = eclipse_data._data_dir() / LUNAR_ELEMENTS_CSV
+    if not path.exists():
+        return {}
+    with path.open(newline="", encoding="utf-8") as handle:
+        return {elements.occurs_on: elements for elements in map(_parse_row, csv.DictReader(handle))}
+
+
+eclipse_data.register_catalog_cache(lunar_elements.cache_clear)
+
+
+def elements_for(event: EclipseEvent) -> Optional[LunarElements]:
+    if event.kind != "lunar":
+        return None
+    return lunar_elements().get(event.occurs_on)
+
+
+def build_elements(
+    events: Sequence[EclipseEvent], tolerance: float = 5.0
+) -> Tuple[List[LunarElements], List[str]]:
+    """
+    Derive elements for `events`, skipping dates without a lunar eclipse.
+    Returns the elements and messages for skipped events and for total
+    phases more than `tolerance` minutes from the catalog's duration.
+    """
+
+    kept: List[LunarElements] = []
+    messages: List[str] = []
+    for event in events:
+        elements = derive_elements(event.occurs_on)
+        if elements is None:
+            messages.append(f"Skipped {event.occurs_on}: no lunar eclipse on this date")
+            continue
+        kept.append(elements)
+        if event.duration_seconds is None:
+            continue
+        totality = (elements.total_end - elements.total_start) * 60.0
+        if not np.isfinite(totality):
+            messages.append(f"Note {event.occurs_on}: no total phase, the catalog lists {event.subtype}")
+        elif abs(totality - event.duration_seconds / 60.0) > tolerance:
+            messages.append(
+                f"Note {event.occurs_on}: total phase lasts {totality:.0f} min, "
+                f"the catalog's duration is {event.duration_seconds / 60.0:.0f} min"
+            )
+    return kept, messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Derive lunar eclipse elements for the lunar catalog from the built-in ephemeris."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=eclipse_data._data_dir() / LUNAR_ELEMENTS_CSV,
+        help=f"CSV file to write (default: {LUNAR_ELEMENTS_CSV} in the data directory).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=5.0,
+        help="Report total phases further than this many minutes from the catalog duration (default 5).",
+    )
+    args = parser.parse_args()
+
+    kept, messages = build_elements(eclipse_data.lunar_events(), args.tolerance)
+    with args.output.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(_columns())
+        writer.writerows(_elements_row(elements) for elements in kept)
+    for message in messages:
+        print(message, file=sys.stderr)
+    print(f"Wrote elements for {len(kept)} eclipse(s) to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Postal code centroids, so postal-code queries carry coordinates for the
+eclipse geometry and not just a state or province.
+
+`us_zip_centroids.csv` lists every U.S. ZIP code with its state (USPS
+abbreviation) and centroid; military and a few other ZIPs have no centroid.
+It is loaded into sorted numeric arrays and searched with `bisect`, or with a
+single NumPy `searchsorted` for whole lists of codes.
+
+`ca_fsa_centroids.csv` lists the Canadian forward sortation areas (the first
+three characters of a postal code, e.g. "M5V") with province and centroid.
+An FSA is always letter, digit, letter, so it maps arithmetically onto a
+26 x 10 x 26 slot array and a lookup is a single index.
+
+`app.py compile-catalog` packs both tables into `postal_codes.bin`, which is
+memory-mapped at start-up instead of parsing the CSVs; without it (or when it
+is older than either CSV) the CSVs are parsed on first use.
+
+Regenerate them from the `zips.json.bz2` of the MIT-licensed `zipcodes`
+package (https://github.com/seanpianka/zipcodes) and the `postalcodes.db` of
+`pypostalcode` (GeoNames data, CC BY 4.0) with
+
+    python -m eclipse_app.postal_codes --zips zips.json.bz2 --fsa postalcodes.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import csv
+import json
+import math
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from . import eclipse_data
+from .catalog_artifact import CatalogArtifactError, map_artifact, write_artifact
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ZIP_CSV = "us_zip_centroids.csv"
+FSA_CSV = "ca_fsa_centroids.csv"
+POSTAL_FILENAME = "postal_codes.bin"
+
+_FSA_SLOTS = 26 * 10 * 26
+
+# pypostalcode names that differ from the resolver's province names.
+_FSA_PROVINCE_NAMES = {"Northwest Territory": "Northwest Territories", "Nunavut Territory": "Nunavut"}
+
+
+@dataclass(frozen=True, eq=False)
+class ZipTable:
+    """ZIP codes as parallel arrays sorted by code."""
+
+    codes: memoryview  # "I": the ZIP code as an integer
+    states: memoryview  # "B": index into `state_codes`
+    latitudes: memoryview  # "d": NaN when the ZIP has no centroid
+    longitudes: memoryview  # "d"
+    state_codes: Tuple[str, ...]
+
+    def find(self, code: int) -> Tuple[int, bool]:
+        """
+        Row of ZIP `code` and whether it matched exactly. An unlisted code
+        falls back to a neighbouring row with the same 3-digit prefix, which
+        still gives the state; the row is -1 when there is none.
+        """
+
+        position = bisect_left(self.codes, code)
+        if position < len(self.codes) and self.codes[position] == code:
+            return position, True
+        for neighbour in (position - 1, position):
+            if 0 <= neighbour < len(self.codes) and self.codes[neighbour] // 100 == code // 100:
+                return neighbour, False
+        return -1, False
+
+    def find_many(self, codes: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized `find`: rows (-1 when absent) and exact-match flags for every code."""
+
+        import numpy as np
+
+        table = np.frombuffer(self.codes, dtype=np.uint32)
+        query = np.asarray(codes, dtype=np.int64)
+        if not table.size:
+            return np.full(query.shape, -1, dtype=np.int64), np.zeros(query.shape, dtype=bool)
+        position = np.searchsorted(table, query)
+        following = np.minimum(position, table.size - 1)
+        previous = np.maximum(position - 1, 0)
+        prefix = query // 100
+        exact = table[following] == query
+        before = (position > 0) & (table[previous] // 100 == prefix)
+        after = table[following] // 100 == prefix
+        rows = np.where(exact, following, np.where(before, previous, np.where(after, following, -1)))
+        return rows, exact
+
+    def state(self, row: int) -> str:
+        return self.state_codes[self.states[row]]
+
+    def centroid(self, row: int) -> Optional[Tuple[float, float]]:
+        latitude = self.latitudes[row]
+        if math.isnan(latitude):
+            return None
+        return latitude, self.longitudes[row]
+
+
+def fsa_slot(code: str) -> int:
+    """Slot of the FSA that upper-case `code` starts with, or -1 when it is not letter, digit, letter."""
+
+    if len(code) < 3:
+        return -1
+    letter, digit, last = ord(code[0]) - 65, ord(code[1]) - 48, ord(code[2]) - 65
+    if not (0 <= letter < 26 and 0 <= digit < 10 and 0 <= last < 26):
+        return -1
+    return (letter * 10 + digit) * 26 + last
+
+
+@dataclass(frozen=True, eq=False)
+class FsaTable:
+    """Canadian forward sortation areas in a directly indexed slot array."""
+
+    provinces: memoryview  # "B": index into `province_names`, 0 for unused slots
+    latitudes: memoryview  # "d": NaN for unused slots
+    longitudes: memoryview  # "d"
+    province_names: Tuple[str, ...]  # starts with "" for unused slots
+
+    def find(self, code: str) -> int:
+        """Slot of the FSA of postal code `code` (upper case, no spaces), or -1 when unlisted."""
+
+        slot = fsa_slot(code)
+        if slot < 0 or not self.provinces[slot]:
+            return -1
+        return slot
+
+    def province(self, slot: int) -> str:
+        return self.province_names[self.provinces[slot]]
+
+    def centroid(self, slot: int) -> Tuple[float, float]:
+        return self.latitudes[slot], self.longitudes[slot]
+
+
+def _read_zip_csv(path: Path) -> ZipTable:
+    codes, states = array("I"), array("B")
+    latitudes, longitudes = array("d"), array("d")
+    state_index: Dict[str, int] = {}
+    with path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            codes.append(int(row["ZIP"]))
+            states.append(state_index.setdefault(row["State"], len(state_index)))
+            latitudes.append(float(row["Latitude"]) if row["Latitude"] else math.nan)
+            longitudes.append(float(row["Longitude"]) if row["Longitude"] else math.nan)
+    return ZipTable(*map(memoryview, (codes, states, latitudes, longitudes)), tuple(state_index))
+
+
+@lru_cache(maxsize=None)
+def zip_table() -> ZipTable:
+    """The compiled ZIP table, else the bundled CSV; empty when neither exists."""
+
+    sections = _compiled_sections()
+    if sections is not None:
+        return ZipTable(
+            sections["zip_codes"].cast("I"),
+            sections["zip_states"],
+            sections["zip_latitudes"].cast("d"),
+            sections["zip_longitudes"].cast("d"),
+            _unpack_names(sections["zip_state_names"]),
+        )
+    path = _zip_csv_path()
+    if not path.exists():
+        return ZipTable(*map(memoryview, (array("I"), array("B"), array("d"), array("d"))), ())
+    return _read_zip_csv(path)
+
+
+eclipse_data.register_catalog_cache(zip_table.cache_clear)
+
+
+def _read_fsa_csv(path: Path) -> FsaTable:
+    provinces = array("B", bytes(_FSA_SLOTS))
+    latitudes = array("d", [math.nan]) * _FSA_SLOTS
+    longitudes = array("d", [math.nan]) * _FSA_SLOTS
+    province_index: Dict[str, int] = {"": 0}
+    with path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            slot = fsa_slot(row["FSA"])
+            provinces[slot] = province_index.setdefault(row["Province"], len(province_index))
+            latitudes[slot] = float(row["Latitude"])
+            longitudes[slot] = float(row["Longitude"])
+    return FsaTable(*map(memoryview, (provinces, latitudes, longitudes)), tuple(province_index))
+
+
+@lru_cache(maxsize=None)
+def fsa_table() -> FsaTable:
+    """The compiled FSA table, else the bundled CSV; every slot unused when neither exists."""
+
+    sections = _compiled_sections()
+    if sections is not None:
+        return FsaTable(
+            sections["fsa_provinces"],
+            sections["fsa_latitudes"].cast("d"),
+            sections["fsa_longitudes"].cast("d"),
+            _unpack_names(sections["fsa_names"]),
+        )
+    path = _fsa_csv_path()
+    if not path.exists():
+        return FsaTable(*map(memoryview, (array("B", bytes(_FSA_SLOTS)), array("d"), array("d"))), ("",))
+    return _read_fsa_csv(path)
+
+
+eclipse_data.register_catalog_cache(fsa_table.cache_clear)
+
+
+# ---------------------------------------------------------------------------
+# Compiled artifact
+# ---------------------------------------------------------------------------
+
+
+def _zip_csv_path() -> Path:
+    return eclipse_data._data_dir() / ZIP_CSV
+
+
+def _fsa_csv_path() -> Path:
+    return eclipse_data._data_dir() / FSA_CSV
+
+
+def _artifact_path() -> Path:
+    return eclipse_data._data_dir() / POSTAL_FILENAME
+
+
+def _unpack_names(data: memoryview) -> Tuple[str, ...]:
+    return tuple(bytes(data).decode("utf-8").split("\n"))
+
+
+@lru_cache(maxsize=None)
+def _compiled_sections() -> Optional[Dict[str, memoryview]]:
+    """Sections of `postal_codes.bin`; None when it is missing or stale."""
+
+    try:
+        return map_artifact(_artifact_path(), [_zip_csv_path(), _fsa_csv_path()])
+    except CatalogArtifactError:
+        return None
+
+
+eclipse_data.register_catalog_cache(_compiled_sections.cache_clear)
+
+
+def compile_postal_codes() -> Path:
+    """Pack the ZIP and FSA CSVs into a memory-mappable artifact next to them."""
+
+    zips, fsas = _read_zip_csv(_zip_csv_path()), _read_fsa_csv(_fsa_csv_path())
+    sections = {
+        "zip_codes": zips.codes.tobytes(),
+        "zip_states": zips.states.tobytes(),
+        "zip_latitudes": zips.latitudes.tobytes(),
+        "zip_longitudes": zips.longitudes.tobytes(),
+        "zip_state_names": "\n".join(zips.state_codes).encode("utf-8"),
+        "fsa_provinces": fsas.provinces.tobytes(),
+        "fsa_latitudes": fsas.latitudes.tobytes(),
+        "fsa_longitudes": fsas.longitudes.tobytes(),
+        "fsa_names": "\n".join(fsas.province_names).encode("utf-8"),
+    }
+    path = write_artifact(_artifact_path(), sections, [_zip_csv_path(), _fsa_csv_path()])
+    for cache in (_compiled_sections, zip_table, fsa_table):
+        cache.cache_clear()
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Import from the zipcodes and pypostalcode packages
+# ---------------------------------------------------------------------------
+
+
+def _zipcodes_rows(path: Path) -> List[Tuple[str, str, str, str]]:
+    rows = []
+    with bz2.open(path, "rt", encoding="utf-8") as handle:
+        for entry in json.load(handle):
+            latitude, longitude = float(entry["lat"]), float(entry["long"])
+            # Military and some unique ZIPs are recorded at 0, 0.
+            located = latitude != 0.0 or longitude != 0.0
+            rows.append(
+                (
+                    entry["zip_code"],
+                    entry["state"],
+                    f"{latitude:.4f}" if located else "",
+                    f"{longitude:.4f}" if located else "",
+                )
+            )
+    return sorted(rows)
+
+
+def _pypostalcode_rows(path: Path) -> List[Tuple[str, str, str, str]]:
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        entries = connection.execute("SELECT fsa, province, latitude, longitude FROM PostalCodes").fetchall()
+    finally:
+        connection.close()
+    return sorted(
+        (fsa, _FSA_PROVINCE_NAMES.get(province, province), f"{latitude:.4f}", f"{longitude:.4f}")
+        for fsa, province, latitude, longitude in entries
+    )
+
+
+def _write_csv(path: Path, header: Sequence[str], rows: Sequence[Sequence[str]]) -> None:
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the postal code centroid CSVs.")
+    parser.add_argument("--zips", type=Path, help=f"zips.json.bz2 from the zipcodes package; writes {ZIP_CSV}.")
+    parser.add_argument("--fsa", type=Path, help=f"postalcodes.db from pypostalcode; writes {FSA_CSV}.")
+    args = parser.parse_args()
+    if not (args.zips or args.fsa):
+        parser.error("nothing to do: give --zips and/or --fsa")
+
+    data_dir = eclipse_data._data_dir()
+    if args.zips:
+        rows = _zipcodes_rows(args.zips)
+        _write_csv(data_dir / ZIP_CSV, ["ZIP", "State", "Latitude", "Longitude"], rows)
+        print(f"Wrote {len(rows)} ZIP code(s) to {data_dir / ZIP_CSV}", file=sys.stderr)
+    if args.fsa:
+        rows = _pypostalcode_rows(args.fsa)
+        _write_csv(data_dir / FSA_CSV, ["FSA", "Province", "Latitude", "Longitude"], rows)
+        print(f"Wrote {len(rows)} forward sortation area(s) to {data_dir / FSA_CSV}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
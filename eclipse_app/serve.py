@@ -0,0 +1,253 @@
+"""
+Small offline HTTP/1.1 JSON service around the eclipse matcher.
+
+Run with `python -m eclipse_app.serve --port 8080`. The catalogs are loaded
+once at start-up and connections are kept alive between requests.
+
+Endpoints:
+
+- `GET /next?location=...&date=YYYY-MM-DD` - next solar and lunar eclipses for
+  one location (`date` defaults to today).
+- `POST /batch` - JSON body `{"locations": [...], "reference_date": "..."}`
+  where each location is a string or an object with "location" and optional
+  "id"/"reference_date"; returns `{"results": [...]}` in input order.
+- `GET /healthz` - liveness probe with catalog sizes and location cache counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from . import batch, eclipse_data
+from .location_resolver import location_cache_info
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH_LOCATIONS = 100_000
+KEEP_ALIVE_TIMEOUT = 15.0
+
+logger = logging.getLogger(__name__)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _lookup(query: Dict[str, List[str]]) -> Dict[str, Any]:
+    location = (query.get("location") or [""])[0]
+    record = {"location": location, "reference_date": (query.get("date") or [None])[0]}
+    result = batch.resolve_record(record)
+    if "error" in result:
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, result["error"])
+    return result
+
+
+def _batch(body: bytes) -> Dict[str, Any]:
+    try:
+        payload = json.loads(body or b"null")
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {exc}") from exc
+    if not isinstance(payload, dict) or not isinstance(payload.get("locations"), list):
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, 'Expected a JSON object with a "locations" list.')
+
+    locations = payload["locations"]
+    if len(locations) > MAX_BATCH_LOCATIONS:
+        raise _HTTPError(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            f"At most {MAX_BATCH_LOCATIONS} locations per request.",
+        )
+    try:
+        default_date = batch.parse_date(payload.get("reference_date"))
+    except ValueError as exc:
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+
+    records = []
+    for item in locations:
+        if isinstance(item, str):
+            records.append({"location": item})
+        elif isinstance(item, dict):
+            records.append(item)
+        else:
+            records.append({"location": None, "error": "Expected a string or object."})
+    return {"results": batch.resolve_records(records, default_date)}
+
+
+async def _route(method: str, target: str, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    parts = urlsplit(target)
+    if parts.path == "/next":
+        if method != "GET":
+            raise _HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET for /next.")
+        # Lookups are CPU-bound (a cache miss may compute local
+        # circumstances), so like batches they run off the event loop.
+        loop = asyncio.get_running_loop()
+        return HTTPStatus.OK, await loop.run_in_executor(None, _lookup, parse_qs(parts.query))
+    if parts.path == "/batch":
+        if method != "POST":
+            raise _HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST for /batch.")
+        # Large batches are CPU-bound; resolve them off the event loop so
+        # single lookups on other connections are not held up behind them.
+        loop = asyncio.get_running_loop()
+        return HTTPStatus.OK, await loop.run_in_executor(None, _batch, body)
+    if parts.path == "/healthz":
+        return HTTPStatus.OK, {
+            "status": "ok",
+            "solar_events": len(eclipse_data.solar_events()),
+            "lunar_events": len(eclipse_data.lunar_events()),
+            "location_cache": location_cache_info()._asdict(),
+        }
+    raise _HTTPError(HTTPStatus.NOT_FOUND, f"No route for {parts.path}")
+
+
+async def _read_request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial.strip():
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "Incomplete request.") from exc
+        return None
+    except asyncio.LimitOverrunError as exc:
+        raise _HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large.") from exc
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError as exc:
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from exc
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise _HTTPError(HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported.")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError as exc:
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.") from exc
+    if length < 0:
+        raise _HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise _HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+    expect = headers.get("expect", "").lower()
+    if expect == "100-continue":
+        # The client waits for this before sending the body; the checks above
+        # have already turned away any body we would not read.
+        if length and version.upper() != "HTTP/1.0":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+    elif expect:
+        raise _HTTPError(HTTPStatus.EXPECTATION_FAILED, "Unsupported expectation.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version.upper(), headers, body
+
+
+def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _response(status: HTTPStatus, payload: Dict[str, Any], keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(_read_request(reader, writer), KEEP_ALIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            except _HTTPError as exc:
+                writer.write(_response(exc.status, {"error": exc.message}, keep_alive=False))
+                await writer.drain()
+                break
+            if request is None:
+                break
+
+            method, target, version, headers, body = request
+            keep_alive = _keep_alive(version, headers)
+            try:
+                status, payload = await _route(method, target, body)
+            except _HTTPError as exc:
+                status, payload = exc.status, {"error": exc.message}
+            except Exception:
+                logger.exception("Unhandled error serving %s %s", method, target)
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def preload() -> None:
+    """
+    Load the catalogs, the batch matcher's array views, the gazetteer, the
+    spelling index and any rasters before serving.
+    """
+    from .catalog_arrays import lunar_arrays, solar_arrays
+    from .gazetteer import gazetteer
+    from .location_resolver import _spelling_index
+    from .visibility_raster import load_rasters
+
+    eclipse_data.all_events()
+    solar_arrays()
+    lunar_arrays()
+    gazetteer()
+    _spelling_index()
+    load_rasters()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080) -> None:
+    preload()
+    server = await asyncio.start_server(_handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Eclipse finder service listening on {addresses}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve eclipse lookups over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default 8080).")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Precomputed visibility rasters: the local circumstances of each eclipse with
+solar or lunar elements, evaluated once on a global latitude/longitude grid
+and stored as 2-bit classes, so a coordinate query costs one array index per
+event instead of a run of the geometry engines.
+
+Build them with
+
+    python3 app.py build-rasters --resolution 0.25 --workers 4
+
+which writes `eclipse_rasters.bin` to the data directory. The file uses the
+catalog artifact container and is memory-mapped, so every worker process
+shares one copy through the page cache. It records fingerprints of the
+catalogs and of the elements it was built from; once any of them changes the
+file is ignored and lookups fall back to the engines.
+
+Each cell holds the class at its centre, so answers within half a cell of a
+path or visibility edge may differ from the exact geometry.
+"""
+
+from __future__ import annotations
+
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from . import besselian, eclipse_data, lunar
+from .besselian import BesselianElements, LocalCircumstances
+from .lunar import LunarElements, LunarVisibility
+from .catalog_artifact import CatalogArtifactError, map_artifact, write_artifact
+from .eclipse_data import KIND_CODES, EclipseEvent
+
+RASTER_FILENAME = "eclipse_rasters.bin"
+DEFAULT_RESOLUTION = 0.25
+
+# Cell classes, two bits each, four cells per byte. For lunar eclipses TOTAL
+# means the total phase is visible and PARTIAL that only earlier or later
+# phases are.
+NOT_VISIBLE, PARTIAL, TOTAL, ANNULAR = range(4)
+CLASS_NAMES = ("not visible", "partial", "total", "annular")
+
+# resolution in degrees, grid rows, grid columns, event count
+_GRID = struct.Struct("<dIII")
+_EVENT = np.dtype([("ordinal", "<i4"), ("kind", "u1")])
+# Grid rows evaluated per call to the geometry engine while building.
+_BAND_ROWS = 32
+
+
+def _raster_path() -> Path:
+    return eclipse_data._data_dir() / RASTER_FILENAME
+
+
+def _raster_sources() -> List[Path]:
+    data_dir = eclipse_data._data_dir()
+    return [
+        data_dir / eclipse_data._SOLAR_CSV,
+        data_dir / besselian.BESSELIAN_CSV,
+        data_dir / eclipse_data._LUNAR_CSV,
+        data_dir / lunar.LUNAR_ELEMENTS_CSV,
+    ]
+
+
+def grid_shape(resolution: float) -> Tuple[int, int]:
+    """Rows and columns of the global grid; `resolution` must divide 180 degrees."""
+
+    rows = round(180.0 / resolution)
+    if resolution <= 0 or abs(rows * resolution - 180.0) > 1e-9:
+        raise ValueError(f"Raster resolution must divide 180 degrees, got {resolution}")
+    return rows, 2 * rows
+
+
+def classify(circumstances: Union[LocalCircumstances, LunarVisibility]) -> np.ndarray:
+    """Raster class of every observer in solar or lunar `circumstances`."""
+
+    if isinstance(circumstances, LunarVisibility):
+        return np.where(
+            circumstances.total, TOTAL, np.where(circumstances.visible, PARTIAL, NOT_VISIBLE)
+        ).astype(np.uint8)
+    classes = np.where(circumstances.visible, PARTIAL, NOT_VISIBLE).astype(np.uint8)
+    central = np.flatnonzero(circumstances.central)
+    # Inside the path the magnitude is the Moon/Sun diameter ratio.
+    classes[central] = np.where(circumstances.magnitude[central] >= 1.0, TOTAL, ANNULAR)
+    return classes
+
+
+def _pack(classes: np.ndarray) -> bytes:
+    padded = np.zeros(-(-classes.size // 4) * 4, dtype=np.uint8)
+    padded[: classes.size] = classes
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6).tobytes()
+
+
+def _rasterize(elements: Union[BesselianElements, LunarElements], resolution: float) -> bytes:
+    rows, columns = grid_shape(resolution)
+    longitude = -180.0 + (np.arange(columns) + 0.5) * resolution
+    classes = np.empty(rows * columns, dtype=np.uint8)
+    for start in range(0, rows, _BAND_ROWS):
+        band = np.arange(start, min(start + _BAND_ROWS, rows))
+        latitude = 90.0 - (band + 0.5) * resolution
+        grid_latitude, grid_longitude = np.meshgrid(latitude, longitude, indexing="ij")
+        if isinstance(elements, LunarElements):
+            circumstances = lunar.local_visibility(elements, grid_latitude.ravel(), grid_longitude.ravel())
+        else:
+            circumstances = besselian.local_circumstances(elements, grid_latitude.ravel(), grid_longitude.ravel())
+        classes[start * columns : (band[-1] + 1) * columns] = classify(circumstances)
+    return _pack(classes)
+
+
+@dataclass(frozen=True, eq=False)
+class VisibilityRasters:
+    """Memory-mapped rasters for every event that has one."""
+
+    resolution: float
+    rows: int
+    columns: int
+    slots: Dict[Tuple[str, date], int]
+    cells: np.ndarray  # uint8, one row of packed classes per slot
+
+    def slot(self, event: EclipseEvent) -> Optional[int]:
+        return self.slots.get((event.kind, event.occurs_on))
+
+    def cell_index(self, latitude, longitude) -> np.ndarray:
+        """Flat grid index of the cells containing the given coordinates."""
+
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        row = np.clip(np.floor((90.0 - latitude) / self.resolution), 0, self.rows - 1).astype(np.int64)
+        column = np.floor((longitude + 180.0) / self.resolution).astype(np.int64) % self.columns
+        return row * self.columns + column
+
+    def classes(self, slot: int, cells: np.ndarray) -> np.ndarray:
+        """Classes of raster `slot` at the flat indices `cells`; either may be an array of them."""
+
+        packed = self.cells[slot, cells >> 2]
+        return (packed >> ((cells & 3) << 1).astype(np.uint8)) & 3
+
+    def lookup(self, event: EclipseEvent, latitude: float, longitude: float) -> Optional[int]:
+        """Class of `event` at one location, or None when it has no raster."""
+
+        slot = self.slot(event)
+        if slot is None:
+            return None
+        # Plain arithmetic: NumPy's per-call overhead dominates a single lookup.
+        row = min(max(int((90.0 - latitude) // self.resolution), 0), self.rows - 1)
+        column = int((longitude + 180.0) // self.resolution) % self.columns
+        cell = row * self.columns + column
+        return int(self.cells[slot, cell >> 2]) >> ((cell & 3) << 1) & 3
+
+
+@lru_cache(maxsize=None)
+def load_rasters() -> Optional[VisibilityRasters]:
+    """The rasters in the data directory, or None when absent or stale."""
+
+    try:
+        sections = map_artifact(_raster_path(), _raster_sources())
+        resolution, rows, columns, count = _GRID.unpack(sections["grid"])
+        events = np.frombuffer(sections["events"], dtype=_EVENT)
+        cells = np.frombuffer(sections["classes"], dtype=np.uint8).reshape(count, -1)
+    except (CatalogArtifactError, KeyError, struct.error, ValueError):
+        return None
+    slots = {
+        (KIND_CODES[kind], date.fromordinal(ordinal)): slot
+        for slot, (ordinal, kind) in enumerate(events.tolist())
+    }
+    return VisibilityRasters(resolution, rows, columns, slots, cells)
+
+
+eclipse_data.register_catalog_cache(load_rasters.cache_clear)
+
+
+def build_rasters(resolution: float = DEFAULT_RESOLUTION, workers: Optional[int] = None) -> Path:
+    """
+    Rasterize every event that has solar or lunar elements, one event per
+    worker process, and write the result to the data directory.
+    """
+
+    rows, columns = grid_shape(resolution)
+    located: List[Tuple[EclipseEvent, Union[BesselianElements, LunarElements]]] = []
+    for event in eclipse_data.all_events():
+        found = besselian.elements_for(event) or lunar.elements_for(event)
+        if found is not None:
+            located.append((event, found))
+    elements = [item for _, item in located]
+    if workers == 1:
+        rasters = list(map(_rasterize, elements, repeat(resolution)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rasters = list(executor.map(_rasterize, elements, repeat(resolution)))
+
+    events = np.array(
+        [(event.occurs_on.toordinal(), KIND_CODES.index(event.kind)) for event, _ in located], dtype=_EVENT
+    )
+    sections = {
+        "grid": _GRID.pack(resolution, rows, columns, len(located)),
+        "events": events.tobytes(),
+        "classes": b"".join(rasters),
+    }
+    path = write_artifact(_raster_path(), sections, _raster_sources())
+    load_rasters.cache_clear()
+    return path
@@ -5,7 +5,7 @@ from datetime import date
 import streamlit as st
 
 from eclipse_app import eclipse_matcher
-from eclipse_app.location_resolver import LocationQuery, parse_location_input
+from eclipse_app.location_resolver import LocationQuery, autocomplete, parse_location_input
 
 
 EVENT_CARD_CSS = """
@@ -130,6 +130,10 @@ def _render_event_card(
             regions = ", ".join(sorted(set(window.regions)))
             visibility_note = f"Regions: {regions}"
 
+    local = eclipse_matcher.local_summary(event, location)
+    if local:
+        visibility_note = f"{local} {visibility_note}".strip()
+
     card_class = "event-card event-card--solar" if event.kind.lower() == "solar" else "event-card event-card--lunar"
     card_html = f"""
     <div class="{card_class}">
@@ -154,6 +158,39 @@ def _render_no_match(kind: str) -> None:
     )
 
 
+def _render_timeline(location: LocationQuery) -> None:
+    import numpy as np
+
+    from eclipse_app.eclipse_data import KIND_CODES
+
+    timeline = eclipse_matcher.visibility_timeline(location)
+    if not len(timeline):
+        return
+    with st.expander(f"Every eclipse visible here in the catalog ({len(timeline)})"):
+        epoch = date(1970, 1, 1).toordinal()
+        st.scatter_chart(
+            {
+                "Date": (timeline.ordinals - epoch).astype("datetime64[D]"),
+                "Magnitude": timeline.magnitude,
+                "Kind": np.array([kind.title() for kind in KIND_CODES])[timeline.kinds],
+            },
+            x="Date",
+            y="Magnitude",
+            color="Kind",
+        )
+
+
+def _use_suggestion() -> None:
+    # Runs before the next rerun renders the text box, so its value can still change.
+    suggestion = st.session_state.get("location_suggestion")
+    if suggestion:
+        st.session_state["location"] = suggestion
+        # Picking a suggestion searches for it straight away, from the last
+        # submitted reference date.
+        st.session_state["query"] = (suggestion, st.session_state.get("reference_date", date.today()))
+    st.session_state["location_suggestion"] = None
+
+
 def main() -> None:
     st.set_page_config(page_title="Eclipse Finder", layout="centered")
     st.markdown(EVENT_CARD_CSS, unsafe_allow_html=True)
@@ -178,23 +215,44 @@ def main() -> None:
         "Enter a city/state/country combination or a supported postal code."
     )
 
-    with st.form("location-form"):
-        location_input = st.text_input(
-            "Location",
-            placeholder="Austin, TX, USA or 78701",
-            help="Use 'City, State, Country' or provide a ZIP/postal code (US ZIP and Canadian postal supported).",
+    # Outside the form so each entry reruns the script and refreshes the suggestions.
+    location_input = st.text_input(
+        "Location",
+        key="location",
+        placeholder="Austin, TX, USA or 78701",
+        help="Use 'City, State, Country', a ZIP/postal code (US ZIP and Canadian postal supported) or 'latitude, longitude'.",
+    )
+    suggestions = [
+        suggestion for suggestion in autocomplete(location_input, limit=6) if suggestion != location_input.strip()
+    ]
+    if suggestions:
+        st.pills(
+            "Suggestions",
+            suggestions,
+            key="location_suggestion",
+            on_change=_use_suggestion,
+            label_visibility="collapsed",
         )
+
+    with st.form("location-form"):
         reference_date = st.date_input(
             "Reference date",
             value=date.today(),
+            key="reference_date",
             help="Forecast from this date forward. Defaults to today.",
         )
         submitted = st.form_submit_button("Find eclipses")
 
-    if not submitted:
+    # Typing in the location box reruns the script without submitting the
+    # form, so results are rendered from the last submitted query.
+    if submitted:
+        st.session_state["query"] = (location_input, reference_date)
+    query = st.session_state.get("query")
+    if query is None:
         st.info("Submit the form to see upcoming eclipses.")
         return
 
+    location_input, reference_date = query
     location_input = location_input.strip()
     if not location_input:
         st.error("Please provide a location.")
@@ -206,7 +264,7 @@ def main() -> None:
         st.error(str(exc))
         return
 
-    if not any([location.city, location.region, location.country, location.postal_code]):
+    if not any([location.city, location.region, location.country, location.postal_code, location.coordinates]):
         st.error("Could not interpret the provided location. Try including a country name.")
         return
 
@@ -228,6 +286,8 @@ def main() -> None:
         else:
             _render_no_match("lunar")
 
+    _render_timeline(location)
+
 
 if __name__ == "__main__":
     main()